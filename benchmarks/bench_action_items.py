@@ -0,0 +1,108 @@
+"""Action item extraction: serial vs. process-pool over a synthetic import.
+
+Writes `--notes` meeting notes spread over a few folders (most tasks need
+dateparser, like a years-old backlog) into a temporary tree and times a
+cold ActionItemCache.update() inline and with `--workers` processes.
+Both runs start with an empty due-date memo. The pool's spawn start-up
+is timed on its own and used to estimate how many notes it takes before
+the pool pays off, to compare with ActionItemCache.PARALLEL_MIN_FILES.
+
+    python benchmarks/bench_action_items.py --notes 2000 --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                "..")))
+
+from services.action_items.action_item_cache import (  # noqa: E402
+    ActionItemCache
+)
+from services.action_items.due_date_parser import DueDateParser  # noqa: E402
+
+FOLDERS = ["personal", "org", "archive/2023", "archive/2024"]
+PHRASES = ["by tomorrow", "by end of month", "after the offsite",
+           "next week", "in 3 days", "by 2025-06-30", "when possible"]
+
+
+def write_notes(root, n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        folder = os.path.join(root, FOLDERS[i % len(FOLDERS)])
+        os.makedirs(folder, exist_ok=True)
+        tasks = "\n".join(
+            f"- [{rng.choice(' x')}] Task {i}-{j} {rng.choice(PHRASES)}"
+            for j in range(8)
+        )
+        with open(os.path.join(folder, f"note_{i:05d}.md"), "w",
+                  encoding="utf-8") as f:
+            f.write(f"# Meeting {i}\n*Date*: 2025-0{i % 9 + 1}-1{i % 9}\n\n"
+                    f"## Action Items\n{tasks}\n\n## Notes\nNothing else\n")
+
+
+def timed_update(root, workers):
+    # Spawned workers start with empty memos; so must the inline run
+    DueDateParser.shared().clear()
+    cache = ActionItemCache(root, cache_path=os.path.join(
+        root, f".cache_{workers}.json"), output_path=None)
+    start = time.perf_counter()
+    cache.update(workers=workers)
+    return time.perf_counter() - start, cache
+
+
+def spawn_startup(workers):
+    """Seconds until every spawned worker has imported the parser."""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(ActionItemCache._parse_notes, [[]] * workers,
+                      [datetime.now()] * workers))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--workers", type=int,
+                        default=max(2, os.cpu_count() or 1))
+    args = parser.parse_args()
+    if args.workers < 2:
+        parser.error("--workers must be at least 2 to use the pool")
+
+    with tempfile.TemporaryDirectory() as root:
+        write_notes(root, args.notes)
+        serial_s, serial = timed_update(root, 1)
+        parallel_s, parallel = timed_update(root, args.workers)
+        startup_s = spawn_startup(args.workers)
+        per_note_s = serial_s / args.notes
+        # startup + n * t / w < n * t, with at most cpu_count useful workers
+        useful = min(args.workers, os.cpu_count() or 1)
+        saved_per_note = per_note_s * (1 - 1 / useful)
+        print(json.dumps({
+            "notes": args.notes,
+            "workers": args.workers,
+            "cpus": os.cpu_count(),
+            "serial_s": round(serial_s, 2),
+            "parallel_s": round(parallel_s, 2),
+            "speedup": round(serial_s / parallel_s, 2),
+            "spawn_startup_s": round(startup_s, 2),
+            "parallel_without_startup_s": round(parallel_s - startup_s, 2),
+            "serial_ms_per_note": round(per_note_s * 1000, 2),
+            "break_even_notes": (round(startup_s / saved_per_note)
+                                 if saved_per_note else None),
+            "parallel_min_files": ActionItemCache.PARALLEL_MIN_FILES,
+            "identical": serial.refresh() == parallel.refresh(),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Due-date parsing: fast path + memo vs. the original dateparser loop.
+
+Generates synthetic action items in the forms our meeting notes use
+(plus some free text that still needs dateparser) and reports tasks per
+second for both parsers, the speedup, and how often they agree.
+
+    python benchmarks/bench_due_dates.py --tasks 3000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                "..")))
+
+import dateparser  # type: ignore  # noqa: E402
+from services.action_items.due_date_parser import DueDateParser  # noqa: E402
+
+VERBS = ["Prepare deck", "Send minutes", "Review budget", "Update forecast",
+         "Book room", "Sync with vendor", "Close audit finding"]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+MONTHS = ["Jan", "Feb", "March", "April", "May", "June", "Sept", "Oct"]
+
+
+def legacy_parse(task_text, base):
+    """`parse_due_date` as it was before the fast path."""
+    settings = {**DueDateParser.DATEPARSER_SETTINGS, "RELATIVE_BASE": base}
+    lowered = task_text.lower()
+    for kw in DueDateParser.TRIGGER_KEYWORDS:
+        if f" {kw} " in lowered:
+            parsed = dateparser.parse(lowered.split(f" {kw} ", 1)[1],
+                                      settings=settings)
+            if parsed:
+                return parsed
+    return dateparser.parse(lowered, settings=settings)
+
+
+def synthetic_tasks(n, seed=0):
+    rng = random.Random(seed)
+    forms = [
+        lambda: "by " + (datetime(2025, 1, 1)
+                         + timedelta(rng.randrange(365))).strftime("%Y-%m-%d"),
+        lambda: f"in {rng.randint(1, 14)} days",
+        lambda: f"next {rng.choice(WEEKDAYS)}",
+        lambda: f"by {rng.choice(MONTHS)} {rng.randint(1, 28)}",
+        lambda: f"before W{rng.randint(1, 52):02d}-2025",
+        lambda: "by tomorrow",
+        lambda: "when possible",
+    ]
+    tasks = []
+    for _ in range(n):
+        base = datetime(2025, rng.randint(1, 12), rng.randint(1, 28))
+        tasks.append((f"{rng.choice(VERBS)} {rng.choice(forms)()}", base))
+    return tasks
+
+
+def timed(parse, tasks):
+    start = time.perf_counter()
+    results = [parse(text, base) for text, base in tasks]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=3000)
+    parser.add_argument("--legacy-sample", type=int, default=500,
+                        help="tasks timed with the slow original parser")
+    args = parser.parse_args()
+
+    tasks = synthetic_tasks(args.tasks)
+    sample = tasks[:args.legacy_sample]
+    legacy_s, legacy = timed(legacy_parse, sample)
+    fast = DueDateParser()
+    cold_s, results = timed(fast.parse, tasks)
+    warm_s, _ = timed(fast.parse, tasks)
+
+    # dateparser reads W22-2025 as a calendar date; leave those out
+    comparable = [(old, new) for (text, _), old, new
+                  in zip(sample, legacy, results)
+                  if not DueDateParser.FISCAL_WEEK_PATTERN.search(text.lower())]
+    agree = sum(old == new for old, new in comparable)
+    legacy_rate = len(sample) / legacy_s
+    print(json.dumps({
+        "tasks": len(tasks),
+        "legacy_tasks_per_s": round(legacy_rate, 1),
+        "fast_tasks_per_s": round(len(tasks) / cold_s, 1),
+        "memoized_tasks_per_s": round(len(tasks) / warm_s, 1),
+        "speedup": round(len(tasks) / cold_s / legacy_rate, 1),
+        "fast_path_hits": fast.fast_hits,
+        "dateparser_calls": fast.dateparser_calls,
+        "agreement_with_legacy": round(agree / len(comparable), 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
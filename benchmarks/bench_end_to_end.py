@@ -0,0 +1,265 @@
+"""Offline end-to-end latency of the chat pipeline, stage by stage.
+
+Generates synthetic note corpora and org charts of growing size in a
+temporary directory, then answers a fixed mix of questions through the
+real RAG page code (router, org graph, link index, retriever, packer)
+with a StubBackend in place of Gemini. Reports p50/p95 milliseconds per
+stage (load, direct, route, retrieve, build, llm, filter) as JSON.
+
+    python benchmarks/bench_end_to_end.py --sizes 10,100,1000
+    python benchmarks/bench_end_to_end.py --output new.json \\
+        --baseline old.json --tolerance 0.25
+
+With --baseline the run exits 1 when any stage p95 grows by more than
+`tolerance` (and by more than --min-delta-ms) over the baseline file.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import streamlit as st  # type: ignore  # noqa: E402
+from services.chat.llm_backend import StubBackend  # noqa: E402
+from utils.llm_setup import LLMSetup  # noqa: E402
+
+STAGES = ("load", "direct", "route", "retrieve", "build", "llm", "filter",
+          "total")
+WORDS = ("yield wafer lot probe test dashboard schedule review budget "
+         "forecast capacity tool recipe defect excursion report metric "
+         "owner plan audit training onboarding vendor shipment release "
+         "roadmap backlog incident").split()
+ALIASES = ("STIM", "OMTLE", "peoplenow", "yieldhub", "fabwiki", "toolmon")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def write_corpus(root, n_files, seed=0):
+    """`n_files` notes plus about n/10 org charts; returns person names."""
+    rng = random.Random(seed)
+    personal = os.path.join(root, "uploaded_docs", "personal")
+    org = os.path.join(root, "uploaded_docs", "org")
+    os.makedirs(personal)
+    os.makedirs(org)
+    for i in range(n_files):
+        sections = []
+        for j in range(4):
+            body = " ".join(rng.choice(WORDS) for _ in range(60))
+            sections.append(
+                f"## Topic {i}-{j}\n\n{body}\n\n"
+                f"- dashboard https://example.com/{i}/{j}\n"
+                f"- see `{rng.choice(ALIASES)}/` for details\n"
+            )
+        with open(os.path.join(personal, f"note_{i:05d}.md"), "w",
+                  encoding="utf-8") as f:
+            f.write(f"# Note {i}\n\n" + "\n".join(sections))
+
+    people = [f"Person{i:05d}" for i in range(max(n_files, 10))]
+    charts = max(1, n_files // 10)
+    per_chart = max(2, len(people) // charts)
+    for c in range(charts):
+        members = people[c * per_chart:(c + 1) * per_chart] or people[:2]
+        # Each chart's root reports to a member of the previous chart, so
+        # reporting paths cross files as in real org exports
+        lines = ["```mermaid", "graph TD"]
+        if c:
+            lines.append(f"    {people[(c - 1) * per_chart]} --> "
+                         f"{members[0]}")
+        for k, person in enumerate(members[1:], start=1):
+            manager = members[(k - 1) // 3]
+            lines.append(f"    {manager}[\"{manager}<br>Manager\"] --> "
+                         f"{person}[\"{person}<br>Engineer\"]")
+        lines.append("```")
+        with open(os.path.join(org, f"org_{c:04d}.md"), "w",
+                  encoding="utf-8") as f:
+            f.write(f"# Org chart {c}\n\n" + "\n".join(lines) + "\n")
+    return people
+
+
+def questions(people, n, seed=1):
+    """Mix of link lookups, note questions and org questions."""
+    rng = random.Random(seed)
+    templates = [
+        lambda: f"Where is the {rng.choice(WORDS)} dashboard link?",
+        lambda: f"Summarize my notes about {rng.choice(WORDS)} "
+                f"{rng.choice(WORDS)}",
+        lambda: f"What did I write on {rng.choice(WORDS)} planning?",
+        lambda: f"Who is the manager of {rng.choice(people)}?",
+        lambda: f"Describe the team structure around {rng.choice(people)}",
+    ]
+    return [templates[i % len(templates)]() for i in range(n)]
+
+
+@contextmanager
+def timed(sample, stage):
+    start = time.perf_counter()
+    yield
+    sample[stage] = sample.get(stage, 0.0) + (time.perf_counter() - start) \
+        * 1000
+
+
+def answer(page, manager, backend, prompt):
+    """One question through the same stages as ChatManager.answer_job."""
+    sample = {}
+    start = time.perf_counter()
+    with timed(sample, "load"):
+        docs = page.DocumentLoader.load_documents()
+        engine = page.ChatManager.org_engine(docs)
+    with timed(sample, "direct"):
+        direct = manager.direct_answer(prompt)
+    if direct is None:
+        with timed(sample, "route"):
+            kind = manager.route(prompt, engine).route
+        with timed(sample, "retrieve"):
+            candidates = page.ChatManager.retrieve_context(kind, prompt, docs,
+                                                           engine)
+        with timed(sample, "build"):
+            final_prompt = page.ChatManager.compose_prompt(kind, prompt,
+                                                           candidates)
+        with timed(sample, "llm"):
+            with manager.pool.lease(kind) as lease:
+                content = "".join(manager.token_stream(lease, final_prompt))
+        with timed(sample, "filter"):
+            history = page.ResponsePipeline.filter_history(
+                [{"role": "assistant", "content": content}]
+            )
+        assert history, "pipeline returned no answer"
+    sample["total"] = (time.perf_counter() - start) * 1000
+    return sample
+
+
+def warm_up(page, manager, people):
+    """Build every cache and index before sampling; returns ms taken.
+
+    A link question is answered by `direct_answer` and never reaches the
+    retriever, so both routes' retrieval is run directly as well.
+    """
+    start = time.perf_counter()
+    manager.direct_answer("Where is the yield dashboard link?")
+    docs = page.DocumentLoader.load_documents()
+    engine = page.ChatManager.org_engine(docs)
+    for kind, prompt in [
+        (page.QueryRouter.NOTES_ROUTE, "What did I write on yield?"),
+        (page.QueryRouter.ORG_ROUTE, f"Who is the manager of {people[1]}?"),
+    ]:
+        manager.route(prompt, engine)
+        page.ChatManager.retrieve_context(kind, prompt, docs, engine)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_size(page, n_files, args):
+    with tempfile.TemporaryDirectory() as root:
+        people = write_corpus(root, n_files)
+        os.chdir(root)
+        try:
+            st.cache_resource.clear()
+            backend = StubBackend(args.base_latency, args.tokens_per_second,
+                                  reply="See https://example.com/yield " * 8)
+            manager = page.ChatManager(backend=backend)
+            warmup = warm_up(page, manager, people)
+            samples = [answer(page, manager, backend, q)
+                       for q in questions(people, args.questions)]
+        finally:
+            os.chdir(ROOT)
+    stages = {}
+    for stage in STAGES:
+        values = [s[stage] for s in samples if stage in s]
+        stages[stage] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "mean_ms": round(statistics.mean(values), 3) if values else 0.0,
+        }
+    return {
+        "files": n_files,
+        "questions": len(samples),
+        "warmup_ms": round(warmup, 3),
+        "llm_calls": backend.calls,
+        "prompt_tokens_per_call": (backend.prompt_tokens / backend.calls
+                                   if backend.calls else 0),
+        "stages": stages,
+    }
+
+
+def regressions(results, baseline, tolerance, min_delta_ms):
+    """(files, stage, old p95, new p95) for every p95 that grew too much."""
+    previous = {r["files"]: r for r in baseline.get("results", [])}
+    found = []
+    for result in results:
+        old = previous.get(result["files"])
+        if old is None:
+            continue
+        for stage, stats in result["stages"].items():
+            before = old["stages"].get(stage, {}).get("p95_ms")
+            after = stats["p95_ms"]
+            if before is None:
+                continue
+            if (after > before * (1 + tolerance)
+                    and after - before > min_delta_ms):
+                found.append((result["files"], stage, before, after))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000",
+                        help="comma-separated note counts (up to 10000)")
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--base-latency", type=float, default=0.0,
+                        help="seconds of fixed latency per stub LLM call")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p95 growth per stage")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore p95 growth smaller than this")
+    args = parser.parse_args()
+
+    # Config reads the Gemini keys at import time; none are needed here
+    LLMSetup.load_api_keys = staticmethod(lambda: ("stub", "stub"))
+    import pages.rag_agents as page  # noqa: E402
+    page.Config.BACKGROUND_JOBS = False
+
+    results = [run_size(page, int(size), args)
+               for size in args.sizes.split(",")]
+    report = {
+        "generated_at": time.time(),
+        "python": sys.version.split()[0],
+        "backend": {"base_latency_s": args.base_latency,
+                    "tokens_per_second": args.tokens_per_second},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.tolerance,
+                                args.min_delta_ms)
+        for files, stage, before, after in found:
+            print(f"REGRESSION files={files} {stage}: p95 {before:.2f}ms "
+                  f"-> {after:.2f}ms", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare LLM calls, tokens and latency of the two response modes.
+
+Real autogen agents are used; only their LLM client is replaced by a
+StubBackend that sleeps per call and per generated token, so the
+numbers reflect the call pattern of each mode, not Gemini itself.
+
+    python benchmarks/bench_response_pipeline.py --questions 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                "..")))
+
+from autogen import ConversableAgent, UserProxyAgent  # type: ignore  # noqa: E402
+from services.chat.llm_backend import StubBackend  # noqa: E402
+from services.chat.response_pipeline import ResponsePipeline  # noqa: E402
+
+
+def run_mode(mode, questions, args):
+    client = StubBackend(args.base_latency, args.tokens_per_second,
+                         "Yield dashboard: https://example.com/yield " * 5)
+    agent = ConversableAgent(name="TextRAG_Agent", llm_config=False,
+                             human_input_mode="NEVER")
+    agent.client = client
+    user_proxy = UserProxyAgent(name="user_proxy", human_input_mode="NEVER",
+                                code_execution_config=False)
+    pipeline = ResponsePipeline(user_proxy, mode=mode)
+
+    latencies = []
+    for question in questions:
+        prompt = ("Use the following personal notes to answer the user's "
+                  "question:\n\n" + "note text " * 400
+                  + f"\n\nUser's question: {question}")
+        # autogen prints every turn; keep the JSON report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            history = pipeline.run(agent, prompt)
+            latencies.append(time.perf_counter() - start)
+        assert history, "pipeline returned no answer"
+
+    return {
+        "mode": mode,
+        "questions": len(questions),
+        "llm_calls_per_question": client.calls / len(questions),
+        "prompt_tokens_per_question": client.prompt_tokens / len(questions),
+        "completion_tokens_per_question":
+            client.completion_tokens / len(questions),
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_max_s": max(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--base-latency", type=float, default=0.05,
+                        help="seconds of fixed latency per LLM call")
+    parser.add_argument("--tokens-per-second", type=float, default=2000)
+    args = parser.parse_args()
+
+    questions = [f"Where is link number {i}?" for i in range(args.questions)]
+    results = [run_mode(mode, questions, args)
+               for mode in ResponsePipeline.MODES]
+    baseline = next(r for r in results if r["mode"] == "reflection")
+    for result in results:
+        result["latency_saving_vs_reflection"] = (
+            1 - result["latency_mean_s"] / baseline["latency_mean_s"]
+        )
+        result["token_saving_vs_reflection"] = 1 - (
+            (result["prompt_tokens_per_question"]
+             + result["completion_tokens_per_question"])
+            / (baseline["prompt_tokens_per_question"]
+               + baseline["completion_tokens_per_question"])
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,152 +1,122 @@
 import streamlit as st  # type: ignore
 import os
-import re
-import json
-from datetime import datetime
-from dateutil.parser import parse
+from services.action_items.action_item_cache import ActionItemCache
+from services.action_items.action_item_editor import (
+    ActionItemEdit, ActionItemEditor, EditConflict
+)
+from services.action_items.action_item_store import ActionItemStore
 from utils.ui_helper import UIHelper
-import dateparser  # type: ignore
 
-UPLOAD_FOLDER = "uploaded_docs/personal"
-ACTION_ITEMS_FILE = "action_items.json"
-CURRENT_DATE = datetime.now()
-
-
-def parse_due_date(task_text, base_date):
-    """
-    Extract due date from natural language phrases within task text.
-    Examples: "next Wednesday", "this afternoon", "in 3 days", etc.
-    """
-    base = base_date or CURRENT_DATE
-    lowered = task_text.lower()
-
-    # Common keywords after which a due phrase usually follows
-    trigger_keywords = ["by", "on", "before", "due", "around", "this", "next",
-                        "in", "within", "after", "at", "until"]
-
-    # Look for a phrase following a keyword
-    for kw in trigger_keywords:
-        if f" {kw} " in lowered:
-            phrase = lowered.split(f" {kw} ", 1)[1]
-            parsed = dateparser.parse(
-                phrase,
-                settings={
-                    "RELATIVE_BASE": base,
-                    "PREFER_DATES_FROM": "future",
-                    "RETURN_AS_TIMEZONE_AWARE": False,
-                    "PARSERS": ["relative-time",
-                                "absolute-time", "custom-formats"]
-                }
-            )
-            if parsed:
-                return parsed
-
-    # Fallback: try parsing the whole task string
-    parsed = dateparser.parse(
-        lowered,
-        settings={
-            "RELATIVE_BASE": base,
-            "PREFER_DATES_FROM": "future",
-            "RETURN_AS_TIMEZONE_AWARE": False,
-            "PARSERS": ["relative-time", "absolute-time", "custom-formats"]
-        }
-    )
-    return parsed
+# Notes are read from every folder below this one
+UPLOAD_FOLDER = "uploaded_docs"
+PAGE_SIZE = 20
+# Stale notes it takes before extraction shows a progress bar
+PROGRESS_MIN_FILES = 256
+STATUS_LABELS = {"all": "All", "open": "Open", "done": "Done"}
+DUE_LABELS = {"all": "Any time", "overdue": "Overdue",
+              "this_week": "Due this week", "no_date": "No due date"}
 
 
 def load_action_items():
-    items = []
-    for filename in os.listdir(UPLOAD_FOLDER):
-        if not filename.endswith(".md"):
-            continue
-        with open(os.path.join
-                  (UPLOAD_FOLDER, filename), "r", encoding="utf-8") as f:
-            content = f.read()
-        date_match = re.search(r"\*Date\*: (\d{4}-\d{2}-\d{2})", content)
-        doc_date = parse(date_match.group(1)) if date_match else None
-        section = re.search(r"## Action Items\n([\s\S]*?)(\n## |\Z)", content)
-        if not section:
-            continue
-
-        action_text = section.group(1)
-        matches = re.findall(r"^- \[( |x)\] (.+)$", action_text, re.MULTILINE)
-        for i, (checked, full_text) in enumerate(matches):
-            task = full_text.strip()
-            due_date = parse_due_date(task, doc_date)
-            items.append({
-                "id": f"{filename}_{i}",
-                "task": task,
-                "completed": checked == "x",
-                "due_date": due_date.isoformat() if due_date else None,
-                "filename": filename,
-                "markdown": task
-            })
-    items.sort(key=lambda x: x["due_date"] or "9999-12-31")
-    with open(ACTION_ITEMS_FILE, "w") as f:
-        json.dump(items, f, indent=2)
-    return items
-
-
-def get_file_hash():
-    return sum(os.path.getmtime(os.path.join(UPLOAD_FOLDER, f))
-               for f in os.listdir(UPLOAD_FOLDER) if f.endswith(".md"))
-
-
-def update_markdown_file(item_id, new_task, new_completed,
+    """Sync the item store with the notes and return it.
+
+    Only notes added or changed since the last call are re-parsed, and
+    only their rows are rewritten. Bulk imports show a progress bar and
+    are extracted in parallel once large enough to pay for the workers.
+    """
+    cache = ActionItemCache.shared(UPLOAD_FOLDER)
+    bar = None
+
+    def report(done, total):
+        nonlocal bar
+        if total < PROGRESS_MIN_FILES:
+            return
+        bar = bar or st.progress(0.0)
+        bar.progress(done / total,
+                     text=f"Extracting action items: {done}/{total} notes")
+
+    cache.update(progress=report)
+    if bar:
+        bar.empty()
+    store = ActionItemStore.shared()
+    store.sync(cache.entries())
+    return store
+
+
+def action_item_filters(store):
+    """Filter widgets; returns (status, due, filename or None)."""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        status = st.selectbox("Status", list(STATUS_LABELS),
+                              format_func=STATUS_LABELS.get,
+                              key="ai_status")
+    with col2:
+        due = st.selectbox("Due", list(DUE_LABELS),
+                           format_func=DUE_LABELS.get, key="ai_due")
+    with col3:
+        filename = st.selectbox("Source", ["All files"] + store.filenames(),
+                                key="ai_file")
+    return status, due, None if filename == "All files" else filename
+
+
+def update_markdown_file(item, new_task, new_completed,
                          new_due, new_filename):
-    old_filename, index = item_id.rsplit("_", 1)
-    index = int(index)
+    """Write one edited item back to its note, renaming the note if
+    `new_filename` differs. `new_due` of None keeps the due phrase."""
+    old_filename = item['filename']
     file_path = os.path.join(UPLOAD_FOLDER, old_filename)
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-    except FileNotFoundError:
-        return False
-
-    match = re.search(r"(## Action Items\n)([\s\S]*?)(\n## |\Z)", content)
-    if not match:
-        return False
-
-    section = match.group(2)
-    matches = re.findall(r"(- \[( |x)\] (.*?)(?: by ([^\n]+))?\n?)", section)
-    if index >= len(matches):
-        return False
-
-    full_line, _, _, _ = matches[index]
-    new_line = f"- [{'x' if new_completed else ' '}] {new_task}"
-    if new_due:
-        new_line += f" by {new_due}"
-    new_line += "\n"
-    new_section = section.replace(full_line, new_line)
-    updated = (
-        content[:match.start(1)]
-        + match.group(1)
-        + new_section
-        + content[match.end(2):]
-    )
-
     new_path = os.path.join(UPLOAD_FOLDER, new_filename)
     if new_filename != old_filename and os.path.exists(new_path):
         return False
-    elif new_filename != old_filename:
+    edit = ActionItemEdit(item['ordinal'], task=new_task,
+                          completed=new_completed, due=new_due)
+    if not apply_edits(old_filename, [edit], item['digest']):
+        return False
+    if new_filename != old_filename:
         os.rename(file_path, new_path)
+    return True
+
 
-    with open(new_path, "w", encoding="utf-8") as f:
-        f.write(updated)
+def apply_edits(filename, edits, digest):
+    """Apply `edits` to one note in a single write; False on failure."""
+    try:
+        ActionItemEditor.apply(os.path.join(UPLOAD_FOLDER, filename),
+                               edits, digest)
+    except EditConflict as e:
+        st.warning(f"{e}")
+        return False
+    except (FileNotFoundError, IndexError):
+        return False
     return True
 
 
-def display_action_items():
-    for item in st.session_state.action_items:
+def save_completion_changes(items):
+    """Write the ticked/unticked checkboxes, one write per note;
+    returns the number of items saved."""
+    pending = {}
+    for item in items:
+        done = st.session_state.get(f"done_{item['id']}", item['completed'])
+        if done != item['completed']:
+            pending.setdefault((item['filename'], item['digest']), []).append(
+                ActionItemEdit(item['ordinal'], completed=done)
+            )
+    saved = 0
+    for (filename, digest), edits in pending.items():
+        if apply_edits(filename, edits, digest):
+            saved += len(edits)
+    return saved
+
+
+def display_action_items(items):
+    for item in items:
         with st.container():
             st.markdown(f"**Task**: {item['task']}")
             due_str = (
                 item['due_date'][:10] if item['due_date'] else 'No due date'
             )
             st.markdown(f"**Due Date**: {due_str}")
-            st.markdown(
-                f"**Completed**: {'Yes' if item['completed'] else 'No'}"
-            )
+            st.checkbox("Completed", value=item['completed'],
+                        key=f"done_{item['id']}")
             st.markdown(f"**Source**: {item['filename']}")
             if st.button("Edit", key=f"edit_{item['id']}"):
                 st.session_state[f"editing_{item['id']}"] = True
@@ -157,9 +127,10 @@ def display_action_items():
                     value=item['task'],
                     key=f"task_{item['id']}"
                 )
+                old_due = item['due_date'][:10] if item['due_date'] else ""
                 new_due = st.text_input(
                     "Edit Due Date",
-                    value=item['due_date'][:10] if item['due_date'] else "",
+                    value=old_due,
                     key=f"due_{item['id']}"
                 )
                 new_completed = st.checkbox(
@@ -177,10 +148,10 @@ def display_action_items():
                 with col1:
                     if st.button("Save", key=f"save_{item['id']}"):
                         if update_markdown_file(
-                            item['id'],
+                            item,
                             new_task,
                             new_completed,
-                            new_due,
+                            new_due if new_due != old_due else None,
                             new_filename
                         ):
                             st.session_state[f"editing_{item['id']}"] = False
@@ -190,20 +161,37 @@ def display_action_items():
                         st.session_state[f"editing_{item['id']}"] = False
                         st.rerun()
             st.markdown("---")
+    if st.button("Save completed changes", key="ai_save_done"):
+        if save_completion_changes(items):
+            st.rerun()
 
 
 def main():
     UIHelper.config_page()
     UIHelper.setup_sidebar()
-    if "file_hash" not in st.session_state:
-        st.session_state.file_hash = get_file_hash()
-        st.session_state.action_items = load_action_items()
-    elif get_file_hash() != st.session_state.file_hash:
-        st.session_state.file_hash = get_file_hash()
-        st.session_state.action_items = load_action_items()
-    display_action_items()
+    store = load_action_items()
+    status, due, filename = action_item_filters(store)
+    # Only the current page is loaded and rendered; the page count comes
+    # from the same query, so the selector is drawn after it
+    page = st.session_state.get("ai_page", 1)
+    items, total = store.query(status, due, filename, limit=PAGE_SIZE,
+                               offset=(page - 1) * PAGE_SIZE)
+    pages = max(1, -(-total // PAGE_SIZE))
+    if page > pages:
+        # The filters shrank the result; show the last page instead
+        page = st.session_state.ai_page = pages
+        items, total = store.query(status, due, filename, limit=PAGE_SIZE,
+                                   offset=(page - 1) * PAGE_SIZE)
+    if not total:
+        st.info("No action items match these filters.")
+        return
+    first = (page - 1) * PAGE_SIZE + 1
+    st.caption(f"Showing {first}–{first + len(items) - 1} of {total}")
+    display_action_items(items)
+    if pages > 1:
+        st.number_input("Page", min_value=1, max_value=pages, key="ai_page")
 
 
 if __name__ == "__main__":
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(os.path.join(UPLOAD_FOLDER, "personal"), exist_ok=True)
     main()
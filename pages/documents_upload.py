@@ -4,6 +4,7 @@ from typing import List
 from utils.ui_helper import UIHelper
 from services.document_processor.document_crud import CRUDProcessor
 from services.document_processor.document_mermaid import MermaidProcessor
+from services.document_processor.mermaid_index import MermaidIndex
 
 
 class MermaidBlockExtractionError(Exception):
@@ -127,7 +128,11 @@ class DocumentUploader:
                     if content:
                         with st.container():
                             mermaid_processor = MermaidProcessor()
-                            mermaid_processor.render_mermaid_blocks(content)
+                            mermaid_processor.render_mermaid_blocks(
+                                content,
+                                MermaidIndex.shared().blocks(file_path,
+                                                             content)
+                            )
                 except Exception as e:
                     st.error(f"Error previewing `{fname}`: {str(e)}")
 
@@ -13,6 +13,7 @@ from datetime import datetime
 
 import streamlit as st
 
+from utils.tracing import Tracer
 from utils.ui_helper import UIHelper
 
 # --------------------------------------------------------------------------------------
@@ -148,6 +149,7 @@ def color_for(series: str, fallback_idx: int) -> str:
 # I/O & caching
 # --------------------------------------------------------------------------------------
 
+@Tracer.traced("read_excel_sheet")
 @st.cache_data(show_spinner=False)
 def read_excel_sheet(file, sheet_name: str) -> pd.DataFrame:
     return pd.read_excel(file, sheet_name=sheet_name, engine="openpyxl")
@@ -157,6 +159,7 @@ def read_excel_sheet(file, sheet_name: str) -> pd.DataFrame:
 # Core transforms
 # --------------------------------------------------------------------------------------
 
+@Tracer.traced()
 def prepare_line_plot_data(
     df: pd.DataFrame,
     r: RangeRef,
@@ -198,6 +201,7 @@ def prepare_line_plot_data(
     )
 
 
+@Tracer.traced()
 def aggregate_process_share_by_quarter(
     table: pd.DataFrame,
     headers: HeaderInfo,
@@ -231,6 +235,7 @@ def aggregate_process_share_by_quarter(
 
 
 
+@Tracer.traced()
 def build_week_options(headers: HeaderInfo) -> List[Tuple[str, str]]:
     """
     Returns list of (display_label_with_quarter, original_week_label) for week-like columns.
@@ -248,6 +253,7 @@ def build_week_options(headers: HeaderInfo) -> List[Tuple[str, str]]:
     return options
 
 
+@Tracer.traced()
 def compute_hbm_nonhbm_summary(
     table: pd.DataFrame,
     headers: HeaderInfo,
@@ -344,6 +350,7 @@ def compute_hbm_nonhbm_summary(
 # Plotting
 # --------------------------------------------------------------------------------------
 
+@Tracer.traced()
 def create_line_plot(melted: pd.DataFrame, headers: HeaderInfo) -> go.Figure:
     """
     Build a multi-series line chart with a secondary x-axis for non-repeating quarter labels.
@@ -411,6 +418,7 @@ def create_line_plot(melted: pd.DataFrame, headers: HeaderInfo) -> go.Figure:
         height=420,
     )
     return fig
+@Tracer.traced()
 def create_hbm_nonhbm_figure(
     totals: pd.DataFrame,
     summary_with_overall: pd.DataFrame,
@@ -638,6 +646,7 @@ def render_current_bc_section(df: pd.DataFrame, headers_from_delta: Optional[Hea
 # Main
 # --------------------------------------------------------------------------------------
 
+@Tracer.traced("loading_visualization")
 def main():
     page_header()
     UIHelper.setup_sidebar()
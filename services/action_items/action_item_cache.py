@@ -0,0 +1,299 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+import streamlit as st  # type: ignore
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.action_items.action_item_parser import ActionItemParser
+
+
+@dataclass
+class _ParsedFile:
+    stamp: Tuple[int, int]
+    digest: str
+    # Day relative dates were resolved against when the note has no
+    # `*Date*:` line; such notes are re-parsed on the next day
+    undated_day: Optional[str] = None
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ActionItemCache:
+    """Per-file parse cache for the action items of a notes folder tree.
+
+    Notes are keyed by their path relative to `folder` ("personal/a.md").
+    A note is only re-parsed when its content hash changes ((size,
+    mtime_ns) is checked first so unchanged files are not even read);
+    deleted notes are pruned. The cache and the merged `output_path`
+    are written atomically, and only when their contents change.
+
+    With `rescan_seconds`, the tree is only walked again when one of the
+    folders seen by the last walk changed (a note was added, removed,
+    renamed or saved by replacing it, as ActionItemEditor does), on a
+    new day, or once that many seconds have passed; edits written in
+    place are picked up by that periodic walk.
+    """
+    CACHE_PATH = "data/action_items_cache.json"
+    OUTPUT_PATH = "action_items.json"
+    # Bumped whenever parsing changes, so older caches are rebuilt
+    FORMAT = 3
+    # Notes per worker task, and how many stale notes it takes before
+    # update() starts a process pool by default. Spawning workers costs
+    # ~1.5-3 s against ~7.5 ms per cold note, so the pool only pays off
+    # from several hundred notes (see benchmarks/bench_action_items.py)
+    CHUNK_SIZE = 64
+    PARALLEL_MIN_FILES = 1024
+    # Longest time between full walks for the shared (page) cache
+    RESCAN_SECONDS = 30.0
+
+    def __init__(self, folder: str, cache_path: str = CACHE_PATH,
+                 output_path: Optional[str] = OUTPUT_PATH,
+                 rescan_seconds: float = 0.0):
+        self.folder = folder
+        self.cache_path = cache_path
+        self.output_path = output_path
+        self.rescan_seconds = rescan_seconds
+        # Folder -> mtime_ns as of the last walk, and when/which day it ran
+        self._dirs: Dict[str, int] = {}
+        self._scanned_at = 0.0
+        self._scanned_day: Optional[str] = None
+        self._lock = threading.Lock()
+        self._files: Dict[str, _ParsedFile] = self._read_cache()
+        self._merged: Optional[List[Dict[str, Any]]] = None
+        self.parsed = 0
+
+    @staticmethod
+    @st.cache_resource
+    def shared(folder: str) -> "ActionItemCache":
+        return ActionItemCache(
+            folder, rescan_seconds=ActionItemCache.RESCAN_SECONDS
+        )
+
+    @staticmethod
+    def _digest(content: str) -> str:
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def refresh(self, now: Optional[datetime] = None
+                ) -> List[Dict[str, Any]]:
+        """All items of the folder sorted by due date, re-parsing only
+        new or changed notes."""
+        self.update(now)
+        with self._lock:
+            return [dict(item) for item in self._merged]
+
+    def entries(self) -> Dict[str, Tuple[str, str, List[Dict[str, Any]]]]:
+        """{filename: (version, digest, items)}; the version changes
+        whenever the file's items may have changed."""
+        with self._lock:
+            return {name: (f"{ActionItemCache.FORMAT}:{parsed.digest}:"
+                           f"{parsed.undated_day or ''}",
+                           parsed.digest, parsed.items)
+                    for name, parsed in self._files.items()}
+
+    def update(self, now: Optional[datetime] = None,
+               workers: Optional[int] = None,
+               progress: Optional[Callable[[int, int], None]] = None
+               ) -> bool:
+        """Re-parse new or changed notes; True if anything changed.
+
+        `workers` processes extract the notes in chunks (default: all
+        cores once PARALLEL_MIN_FILES notes need parsing, else inline);
+        `progress(done, total)` is called as chunks of them finish.
+        """
+        now = now or datetime.now()
+        today = now.date().isoformat()
+        with self._lock:
+            if self._merged is not None and self._unchanged(today):
+                return False
+            found = self._scan(today)
+            stale, stamps = [], {}
+            for name, path, stamp in found:
+                cached = self._files.get(name)
+                fresh = (cached is not None
+                         and cached.undated_day in (None, today))
+                if fresh and cached.stamp == stamp:
+                    continue
+                stamps[name] = stamp
+                # Known digest lets a touched but unedited note skip parsing
+                stale.append((name, path, cached.digest if fresh else None))
+            changed = False
+            for name, digest, undated_day, items in self._extract(
+                    stale, now, workers, progress):
+                if items is None:
+                    # Touched but not edited: remember the new stamp only
+                    self._files[name].stamp = stamps[name]
+                else:
+                    self._files[name] = _ParsedFile(
+                        stamp=stamps[name], digest=digest,
+                        undated_day=undated_day, items=items
+                    )
+                    self.parsed += 1
+                changed = True
+            present = {name for name, _, _ in found}
+            for name in set(self._files) - present:
+                del self._files[name]
+                changed = True
+            if changed:
+                self._write_json(self.cache_path, {
+                    "format": ActionItemCache.FORMAT,
+                    "files": {name: asdict(parsed)
+                              for name, parsed in self._files.items()}
+                })
+
+            if changed or self._merged is None:
+                # Built from the sorted names, so the order does not
+                # depend on which worker finished first
+                merged = [item for name in sorted(self._files)
+                          for item in self._files[name].items]
+                merged.sort(key=ActionItemParser.sort_key)
+                if self.output_path and merged != (self._merged
+                                                   or self._read_output()):
+                    self._write_json(self.output_path, merged, indent=2)
+                self._merged = merged
+            return changed
+
+    def _unchanged(self, today: str) -> bool:
+        """True if the last walk is recent enough to skip this one: same
+        day, within `rescan_seconds`, and none of its folders changed."""
+        if (not self.rescan_seconds or self._scanned_day != today
+                or time.monotonic() - self._scanned_at
+                >= self.rescan_seconds):
+            return False
+        for path, mtime_ns in self._dirs.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def _scan(self, today: str) -> List[Tuple[str, str, Tuple[int, int]]]:
+        """(name relative to the folder, path, (size, mtime_ns)) of every
+        note under the folder, sorted by name."""
+        found = []
+        self._dirs = {}
+        self._scanned_at, self._scanned_day = time.monotonic(), today
+        for dirpath, dirnames, filenames in os.walk(self.folder):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            try:
+                self._dirs[dirpath] = os.stat(dirpath).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            for filename in filenames:
+                if not filename.endswith(".md"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                name = os.path.relpath(path, self.folder).replace(os.sep, "/")
+                found.append((name, path, (stat.st_size, stat.st_mtime_ns)))
+        return sorted(found)
+
+    def _extract(self, stale: List[Tuple[str, str, Optional[str]]],
+                 now: datetime, workers: Optional[int],
+                 progress: Optional[Callable[[int, int], None]]
+                 ) -> Iterator[Tuple[str, str, Optional[str],
+                                     Optional[List[Dict[str, Any]]]]]:
+        chunks = [stale[i:i + ActionItemCache.CHUNK_SIZE]
+                  for i in range(0, len(stale), ActionItemCache.CHUNK_SIZE)]
+        if workers is None:
+            workers = (os.cpu_count() or 1
+                       if len(stale) >= ActionItemCache.PARALLEL_MIN_FILES
+                       else 1)
+        done = 0
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                yield from ActionItemCache._parse_notes(chunk, now)
+                done += len(chunk)
+                if progress:
+                    progress(done, len(stale))
+            return
+        # Spawned rather than forked: the Streamlit server is threaded.
+        # Workers read the notes themselves and at most two chunks per
+        # worker are in flight, so memory stays bounded by the results.
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")) as pool:
+            queued = iter(chunks)
+            pending = {}
+            for chunk in itertools.islice(queued, 2 * workers):
+                pending[pool.submit(ActionItemCache._parse_notes, chunk,
+                                    now)] = len(chunk)
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += pending.pop(future)
+                    yield from future.result()
+                    chunk = next(queued, None)
+                    if chunk:
+                        pending[pool.submit(ActionItemCache._parse_notes,
+                                            chunk, now)] = len(chunk)
+                if progress:
+                    progress(done, len(stale))
+
+    @staticmethod
+    def _parse_notes(chunk: List[Tuple[str, str, Optional[str]]],
+                     now: datetime
+                     ) -> List[Tuple[str, str, Optional[str],
+                                     Optional[List[Dict[str, Any]]]]]:
+        """(name, digest, undated_day, items) per readable note of
+        `chunk`; items is None when the digest matches the known one.
+        Runs in the worker processes."""
+        today = now.date().isoformat()
+        results = []
+        for name, path, known_digest in chunk:
+            try:
+                # Untranslated newlines, so item offsets and the digest
+                # match what ActionItemEditor reads
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    content = f.read()
+            except (FileNotFoundError, UnicodeDecodeError):
+                continue
+            digest = ActionItemCache._digest(content)
+            if digest == known_digest:
+                results.append((name, digest, None, None))
+                continue
+            undated = ActionItemParser.document_date(content) is None
+            results.append((name, digest, today if undated else None,
+                            ActionItemParser.parse(name, content, now)))
+        return results
+
+    def _read_cache(self) -> Dict[str, _ParsedFile]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if raw.get("format") != ActionItemCache.FORMAT:
+                return {}
+            return {name: _ParsedFile(stamp=tuple(entry["stamp"]),
+                                      digest=entry["digest"],
+                                      undated_day=entry["undated_day"],
+                                      items=entry["items"])
+                    for name, entry in raw.get("files", {}).items()}
+        except (FileNotFoundError, ValueError, KeyError, TypeError,
+                AttributeError):
+            # Missing or written by an incompatible version; rebuild
+            return {}
+
+    def _read_output(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            with open(self.output_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path: str, payload: Any,
+                    indent: Optional[int] = None) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from services.action_items.action_item_parser import ActionItemParser
+
+
+class EditConflict(RuntimeError):
+    """The note changed since the edited items were read."""
+
+
+@dataclass
+class ActionItemEdit:
+    """Change to checkbox `ordinal`; None leaves a field unchanged.
+    `due` replaces the task's trailing "by ..." phrase ("" removes it)."""
+    ordinal: int
+    task: Optional[str] = None
+    completed: Optional[bool] = None
+    due: Optional[str] = None
+
+
+class ActionItemEditor:
+    """Applies action item edits to a note in one atomic write.
+
+    Items are located by their line offsets, so only the edited lines
+    change even when several tasks share the same text. The note's
+    content hash must still match the one the edits were based on;
+    otherwise another session changed it and EditConflict is raised.
+    """
+    DUE_SUFFIX = re.compile(r"\s+by\s+[^\n]*$")
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_lock = threading.Lock()
+
+    @staticmethod
+    def digest(content: str) -> str:
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _lock(path: str) -> threading.Lock:
+        with ActionItemEditor._locks_lock:
+            return ActionItemEditor._locks.setdefault(os.path.abspath(path),
+                                                      threading.Lock())
+
+    @staticmethod
+    def render_line(text: str, completed: bool,
+                    due: Optional[str] = None) -> str:
+        if due is not None:
+            text = ActionItemEditor.DUE_SUFFIX.sub("", text)
+            if due:
+                text += f" by {due}"
+        return f"- [{'x' if completed else ' '}] {text}"
+
+    @staticmethod
+    def apply(path: str, edits: Sequence[ActionItemEdit],
+              expected_digest: str) -> str:
+        """Apply `edits` to the note at `path`; returns its new digest.
+
+        Raises EditConflict if the note no longer hashes to
+        `expected_digest`, IndexError for an unknown ordinal.
+        """
+        with ActionItemEditor._lock(path):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                content = f.read()
+            if ActionItemEditor.digest(content) != expected_digest:
+                raise EditConflict(f"{os.path.basename(path)} was changed "
+                                   "by someone else; reload and retry")
+            located = ActionItemParser.locate(content)
+            merged: Dict[int, ActionItemEdit] = {}
+            for edit in edits:
+                if not 0 <= edit.ordinal < len(located):
+                    raise IndexError(f"No action item #{edit.ordinal} in "
+                                     f"{os.path.basename(path)}")
+                previous = merged.get(edit.ordinal, ActionItemEdit(edit.ordinal))
+                merged[edit.ordinal] = ActionItemEdit(
+                    edit.ordinal,
+                    task=edit.task if edit.task is not None
+                    else previous.task,
+                    completed=edit.completed if edit.completed is not None
+                    else previous.completed,
+                    due=edit.due if edit.due is not None else previous.due,
+                )
+            # Splice from the end so earlier offsets stay valid
+            for ordinal in sorted(merged, reverse=True):
+                edit, item = merged[ordinal], located[ordinal]
+                line = ActionItemEditor.render_line(
+                    edit.task if edit.task is not None else item.text,
+                    edit.completed if edit.completed is not None
+                    else item.completed,
+                    edit.due
+                )
+                content = content[:item.start] + line + content[item.end:]
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            return ActionItemEditor.digest(content)
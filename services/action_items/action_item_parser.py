@@ -0,0 +1,91 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from dateutil.parser import parse
+
+from services.action_items.due_date_parser import DueDateParser
+
+
+@dataclass
+class ItemLine:
+    """Where checkbox `ordinal` sits in a note: `start`/`end` are
+    character offsets of the line (without its newline), `line` is
+    1-based."""
+    ordinal: int
+    start: int
+    end: int
+    line: int
+    completed: bool
+    text: str
+
+
+class ActionItemParser:
+    """Extracts the `## Action Items` checkboxes of one meeting note."""
+    DATE_PATTERN = re.compile(r"\*Date\*: (\d{4}-\d{2}-\d{2})")
+    SECTION_PATTERN = re.compile(r"## Action Items\r?\n([\s\S]*?)"
+                                 r"(\r?\n## |\Z)")
+    ITEM_PATTERN = re.compile(r"^- \[( |x)\] (.+)$", re.MULTILINE)
+
+    @staticmethod
+    def parse_due_date(task_text: str,
+                       base_date: Optional[datetime]) -> Optional[datetime]:
+        return DueDateParser.shared().parse(task_text, base_date)
+
+    @staticmethod
+    def document_date(content: str) -> Optional[datetime]:
+        match = ActionItemParser.DATE_PATTERN.search(content)
+        return parse(match.group(1)) if match else None
+
+    @staticmethod
+    def locate(content: str) -> List[ItemLine]:
+        """Checkbox lines of the `## Action Items` section, in order."""
+        section = ActionItemParser.SECTION_PATTERN.search(content)
+        if not section:
+            return []
+        lines, line, last = [], 1, 0
+        matches = ActionItemParser.ITEM_PATTERN.finditer(
+            content, section.start(1), section.end(1)
+        )
+        for i, match in enumerate(matches):
+            line += content.count("\n", last, match.start())
+            last = match.start()
+            end = match.end()
+            if content[end - 1] == "\r":
+                end -= 1
+            lines.append(ItemLine(ordinal=i, start=match.start(), end=end,
+                                  line=line, completed=match.group(1) == "x",
+                                  text=match.group(2).strip()))
+        return lines
+
+    @staticmethod
+    def parse(filename: str, content: str,
+              now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Items of one note. Notes without a `*Date*:` line resolve
+        relative due dates against the start of `now`'s day."""
+        located = ActionItemParser.locate(content)
+        if not located:
+            return []
+        doc_date = ActionItemParser.document_date(content) or (
+            now or datetime.now()
+        ).replace(hour=0, minute=0, second=0, microsecond=0)
+        items = []
+        for item in located:
+            due_date = ActionItemParser.parse_due_date(item.text, doc_date)
+            items.append({
+                "id": f"{filename}_{item.ordinal}",
+                "task": item.text,
+                "completed": item.completed,
+                "due_date": due_date.isoformat() if due_date else None,
+                "filename": filename,
+                "markdown": item.text,
+                "line": item.line,
+                "start": item.start,
+                "end": item.end
+            })
+        return items
+
+    @staticmethod
+    def sort_key(item: Dict[str, Any]):
+        return item["due_date"] or "9999-12-31"
@@ -0,0 +1,191 @@
+import os
+import streamlit as st  # type: ignore
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.sqlite_pool import SQLitePool
+
+
+class ActionItemStore:
+    """SQLite copy of the parsed action items for filtered, paged reads.
+
+    `sync` takes ActionItemCache.entries() and rewrites only the files
+    whose version changed, so a rerun with no edits costs one small
+    SELECT. Queries filter and paginate in SQL using the indexes on
+    due_date, completed and filename. Each row keeps its line offsets
+    and the note's content hash for ActionItemEditor write-backs.
+    """
+    DB_PATH = "data/action_items.db"
+    STATUSES = ("all", "open", "done")
+    DUE_FILTERS = ("all", "overdue", "this_week", "no_date")
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self.pool().transaction(write=True) as cursor:
+            ActionItemStore._create_schema(cursor)
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "ActionItemStore":
+        return ActionItemStore()
+
+    def pool(self) -> SQLitePool:
+        return SQLitePool.for_path(self.db_path)
+
+    @staticmethod
+    def _create_schema(cursor) -> None:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS action_items (
+                filename TEXT NOT NULL,
+                ordinal INTEGER NOT NULL,
+                task TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                due_date TEXT,
+                markdown TEXT,
+                PRIMARY KEY (filename, ordinal)
+            )
+        """)
+        ActionItemStore._add_columns(cursor, "action_items", [
+            ("line", "INTEGER"), ("start_offset", "INTEGER"),
+            ("end_offset", "INTEGER"),
+        ])
+        for column in ("due_date", "completed", "filename"):
+            cursor.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_action_items_{column}
+                ON action_items ({column})
+            """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS action_item_files (
+                filename TEXT PRIMARY KEY,
+                version TEXT NOT NULL
+            )
+        """)
+        ActionItemStore._add_columns(cursor, "action_item_files",
+                                     [("digest", "TEXT")])
+
+    @staticmethod
+    def _add_columns(cursor, table: str, columns) -> None:
+        # Columns added after the original schema; older rows are
+        # rewritten on the next sync since their version is stale
+        existing = {row[1] for row in
+                    cursor.execute(f"PRAGMA table_info({table})")}
+        for name, ddl in columns:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+    def sync(self, entries: Dict[str, Tuple[str, str, List[Dict[str, Any]]]]
+             ) -> int:
+        """Match the table to `entries` ({filename: (version, digest,
+        items)}); returns the files rewritten."""
+        with self.pool().transaction() as cursor:
+            stored = dict(cursor.execute(
+                "SELECT filename, version FROM action_item_files"
+            ).fetchall())
+        changed = {name: entry for name, entry in entries.items()
+                   if stored.get(name) != entry[0]}
+        removed = set(stored) - set(entries)
+        if not changed and not removed:
+            return 0
+        with self.pool().transaction(write=True) as cursor:
+            for name in removed | set(changed):
+                cursor.execute("DELETE FROM action_items WHERE filename = ?",
+                               (name,))
+                cursor.execute(
+                    "DELETE FROM action_item_files WHERE filename = ?",
+                    (name,)
+                )
+            for name, (version, digest, items) in changed.items():
+                cursor.executemany("""
+                    INSERT INTO action_items
+                        (filename, ordinal, task, completed, due_date,
+                         markdown, line, start_offset, end_offset)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(name, ordinal, item["task"], int(item["completed"]),
+                       item["due_date"], item.get("markdown"),
+                       item.get("line"), item.get("start"), item.get("end"))
+                      for ordinal, item in enumerate(items)])
+                cursor.execute(
+                    "INSERT INTO action_item_files (filename, version, digest)"
+                    " VALUES (?, ?, ?)", (name, version, digest)
+                )
+        return len(changed) + len(removed)
+
+    @staticmethod
+    def _where(status: str, due: str, filename: Optional[str],
+               today: date) -> Tuple[str, list]:
+        if status not in ActionItemStore.STATUSES:
+            raise ValueError(f"Unknown status filter: {status}")
+        if due not in ActionItemStore.DUE_FILTERS:
+            raise ValueError(f"Unknown due filter: {due}")
+        clauses, params = [], []
+        if status != "all":
+            clauses.append("completed = ?")
+            params.append(int(status == "done"))
+        if due == "overdue":
+            # ISO strings compare chronologically; "2025-04-14T00:00"
+            # sorts after "2025-04-14", so this is "before today"
+            clauses.append("due_date < ? AND completed = 0")
+            params.append(today.isoformat())
+        elif due == "this_week":
+            monday = today - timedelta(days=today.weekday())
+            clauses.append("due_date >= ? AND due_date < ?")
+            params += [monday.isoformat(),
+                       (monday + timedelta(days=7)).isoformat()]
+        elif due == "no_date":
+            clauses.append("due_date IS NULL")
+        if filename:
+            clauses.append("filename = ?")
+            params.append(filename)
+        return " AND ".join(clauses) or "1", params
+
+    def count(self, status: str = "all", due: str = "all",
+              filename: Optional[str] = None,
+              today: Optional[date] = None) -> int:
+        where, params = ActionItemStore._where(status, due, filename,
+                                               today or date.today())
+        with self.pool().transaction() as cursor:
+            return cursor.execute(
+                f"SELECT COUNT(*) FROM action_items WHERE {where}", params
+            ).fetchone()[0]
+
+    def query(self, status: str = "all", due: str = "all",
+              filename: Optional[str] = None, limit: int = 20,
+              offset: int = 0, today: Optional[date] = None
+              ) -> Tuple[List[Dict[str, Any]], int]:
+        """(one page of items ordered by due date, total matches)."""
+        where, params = ActionItemStore._where(status, due, filename,
+                                               today or date.today())
+        with self.pool().transaction() as cursor:
+            total = cursor.execute(
+                f"SELECT COUNT(*) FROM action_items WHERE {where}", params
+            ).fetchone()[0]
+            rows = cursor.execute(f"""
+                SELECT filename, ordinal, task, completed, due_date, markdown,
+                       line, start_offset, end_offset,
+                       (SELECT digest FROM action_item_files AS f
+                        WHERE f.filename = action_items.filename)
+                FROM action_items WHERE {where}
+                ORDER BY due_date IS NULL, due_date, filename, ordinal
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset]).fetchall()
+        return [{
+            "id": f"{filename}_{ordinal}",
+            "task": task,
+            "completed": bool(completed),
+            "due_date": due_date,
+            "filename": filename,
+            "markdown": markdown,
+            "ordinal": ordinal,
+            "line": line,
+            "start": start,
+            "end": end,
+            "digest": digest,
+        } for (filename, ordinal, task, completed, due_date, markdown,
+               line, start, end, digest) in rows], total
+
+    def filenames(self) -> List[str]:
+        with self.pool().transaction() as cursor:
+            return [row[0] for row in cursor.execute(
+                "SELECT filename FROM action_item_files ORDER BY filename"
+            )]
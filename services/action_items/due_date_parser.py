@@ -0,0 +1,188 @@
+import re
+import threading
+import streamlit as st  # type: ignore
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+import dateparser  # type: ignore
+from dateutil.relativedelta import relativedelta  # type: ignore
+
+from utils.lru_cache import LRUCache
+
+
+class DueDateParser:
+    """Due dates from task text, with a regex fast path ahead of dateparser.
+
+    The forms our notes use (ISO dates, fiscal weeks like `W22-2025`,
+    "by <month> <day>", "next <weekday>", "in N days") are recognized by
+    compiled patterns, most specific first. Anything else goes through
+    the original keyword-then-whole-text dateparser search, restricted to
+    `languages` so dateparser skips language detection. Results are
+    memoized on (text, base date).
+    """
+    LANGUAGES = ("en",)
+    # Common keywords after which a due phrase usually follows
+    TRIGGER_KEYWORDS = ["by", "on", "before", "due", "around", "this",
+                        "next", "in", "within", "after", "at", "until"]
+    DATEPARSER_SETTINGS = {
+        "PREFER_DATES_FROM": "future",
+        "RETURN_AS_TIMEZONE_AWARE": False,
+        "PARSERS": ["relative-time", "absolute-time", "custom-formats"]
+    }
+    WEEKDAYS = {name: i for i, names in enumerate([
+        ("monday", "mon"), ("tuesday", "tue", "tues"),
+        ("wednesday", "wed"), ("thursday", "thu", "thur", "thurs"),
+        ("friday", "fri"), ("saturday", "sat"), ("sunday", "sun"),
+    ]) for name in names}
+    MONTHS = {name: i + 1 for i, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"),
+        ("april", "apr"), ("may",), ("june", "jun"), ("july", "jul"),
+        ("august", "aug"), ("september", "sep", "sept"),
+        ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ]) for name in names}
+    NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4,
+               "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+               "ten": 10}
+
+    ISO_PATTERN = re.compile(r"(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)")
+    FISCAL_WEEK_PATTERN = re.compile(r"\b(?:fy)?w(?:w)?(\d{1,2})-(\d{4})\b")
+    MONTH_DAY_PATTERN = re.compile(
+        r"\b(?:by|on|before|due|until)\s+("
+        + "|".join(sorted(MONTHS, key=len, reverse=True))
+        + r")\.?\s+(\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(\d{4})\b)?"
+    )
+    NEXT_WEEKDAY_PATTERN = re.compile(
+        r"\bnext\s+(" + "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+        + r")\b"
+    )
+    IN_N_PATTERN = re.compile(
+        r"\b(?:in|within)\s+(\d{1,3}|" + "|".join(NUMBERS)
+        + r")\s+(day|week|month)s?\b"
+    )
+
+    def __init__(self, languages: Sequence[str] = LANGUAGES,
+                 memo_size: int = 4096):
+        self.languages = list(languages)
+        self.memo = LRUCache(memo_size)
+        self._phrases = LRUCache(memo_size)
+        self._stats_lock = threading.Lock()
+        self.fast_hits = 0
+        self.dateparser_calls = 0
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "DueDateParser":
+        return DueDateParser()
+
+    def clear(self) -> None:
+        """Forget memoized results and reset the counters."""
+        self.memo.clear()
+        self._phrases.clear()
+        with self._stats_lock:
+            self.fast_hits = 0
+            self.dateparser_calls = 0
+
+    @staticmethod
+    def fiscal_year_start(fiscal_year: int) -> datetime:
+        """FY N starts on the Friday nearest Sept 1 of year N-1 (Micron's
+        fiscal year ends on the Thursday closest to Aug 31)."""
+        sept_first = datetime(fiscal_year - 1, 9, 1)
+        # Friday is weekday 4; shift by at most three days either way
+        offset = (4 - sept_first.weekday() + 3) % 7 - 3
+        return sept_first + timedelta(days=offset)
+
+    @staticmethod
+    def fiscal_week_end(week: int, fiscal_year: int) -> datetime:
+        """Thursday closing work week `week` (1-based) of `fiscal_year`."""
+        return (DueDateParser.fiscal_year_start(fiscal_year)
+                + timedelta(weeks=week - 1, days=6))
+
+    @staticmethod
+    def fast_path(text: str, base: datetime) -> Optional[datetime]:
+        """Date from a recognized form in lowercased `text`, else None."""
+        match = DueDateParser.ISO_PATTERN.search(text)
+        if match:
+            try:
+                return datetime(*map(int, match.groups()))
+            except ValueError:
+                pass
+        match = DueDateParser.FISCAL_WEEK_PATTERN.search(text)
+        if match and 1 <= int(match.group(1)) <= 53:
+            return DueDateParser.fiscal_week_end(int(match.group(1)),
+                                                 int(match.group(2)))
+        match = DueDateParser.MONTH_DAY_PATTERN.search(text)
+        if match:
+            month = DueDateParser.MONTHS[match.group(1)]
+            day, year = int(match.group(2)), match.group(3)
+            try:
+                due = datetime(int(year or base.year), month, day)
+                if year is None and due.date() < base.date():
+                    # Like dateparser's PREFER_DATES_FROM="future"
+                    due = due.replace(year=base.year + 1)
+                return due
+            except ValueError:
+                pass
+        match = DueDateParser.NEXT_WEEKDAY_PATTERN.search(text)
+        if match:
+            days = (DueDateParser.WEEKDAYS[match.group(1)]
+                    - base.weekday() - 1) % 7 + 1
+            return datetime.combine(base.date() + timedelta(days=days),
+                                    datetime.min.time())
+        match = DueDateParser.IN_N_PATTERN.search(text)
+        if match:
+            count = match.group(1)
+            n = int(count) if count.isdigit() else DueDateParser.NUMBERS[count]
+            unit = match.group(2)
+            if unit == "month":
+                return base + relativedelta(months=n)
+            return base + timedelta(days=n * (7 if unit == "week" else 1))
+        return None
+
+    def parse(self, task_text: str,
+              base_date: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Extract due date from natural language phrases within task text.
+        Examples: "next Wednesday", "by Apr 14", "in 3 days", "W22-2025".
+        """
+        base = base_date or datetime.now()
+        lowered = task_text.lower()
+        key = (lowered, base)
+        cached = self.memo.get(key, self.memo)
+        if cached is not self.memo:
+            return cached
+        due = DueDateParser.fast_path(lowered, base)
+        if due is not None:
+            with self._stats_lock:
+                self.fast_hits += 1
+        else:
+            due = self._dateparser_search(lowered, base)
+        self.memo.put(key, due)
+        return due
+
+    def _dateparser_search(self, lowered: str,
+                           base: datetime) -> Optional[datetime]:
+        # Look for a phrase following a keyword
+        for kw in DueDateParser.TRIGGER_KEYWORDS:
+            if f" {kw} " in lowered:
+                parsed = self._dateparser(lowered.split(f" {kw} ", 1)[1],
+                                          base)
+                if parsed:
+                    return parsed
+        # Fallback: try parsing the whole task string
+        return self._dateparser(lowered, base)
+
+    def _dateparser(self, phrase: str,
+                    base: datetime) -> Optional[datetime]:
+        key = (phrase, base)
+        cached = self._phrases.get(key, self._phrases)
+        if cached is not self._phrases:
+            return cached
+        with self._stats_lock:
+            self.dateparser_calls += 1
+        parsed = dateparser.parse(
+            phrase, languages=self.languages,
+            settings={**DueDateParser.DATEPARSER_SETTINGS,
+                      "RELATIVE_BASE": base}
+        )
+        self._phrases.put(key, parsed)
+        return parsed
@@ -0,0 +1,140 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+import streamlit as st  # type: ignore
+
+
+@dataclass
+class AgentLease:
+    """An agent checked out of the pool together with the key it uses."""
+    agent: Any
+    api_key: str
+
+
+class _KeyState:
+    def __init__(self):
+        self.in_flight = 0
+        self.leases = 0
+        self.rate_limited = 0
+        self.cooldown_until = 0.0
+
+
+class AgentPool:
+    """Process-wide pool of autogen agents spread over several API keys.
+
+    Agents are built once per (kind, api_key) and leased exclusively, so
+    concurrent sessions never share an agent's chat state; a reused agent
+    is reset before it is handed out. Each lease goes
+    to the key with the fewest requests in flight; a key that returned a
+    429 is skipped for `COOLDOWN_SECONDS` unless every key is cooling down.
+    """
+    COOLDOWN_SECONDS = 30.0
+    RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "resource exhausted",
+                          "quota", "rate limit")
+
+    def __init__(self, api_keys: Sequence[str]):
+        if not api_keys:
+            raise ValueError("AgentPool needs at least one API key")
+        # dict.fromkeys drops duplicates while keeping the order
+        self.api_keys: List[str] = list(dict.fromkeys(api_keys))
+        self._factories: Dict[str, Callable[[str], Any]] = {}
+        self._idle: Dict[Tuple[str, str], List[Any]] = {}
+        self._keys = {key: _KeyState() for key in self.api_keys}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    @st.cache_resource
+    def shared(api_keys: Tuple[str, ...]) -> "AgentPool":
+        return AgentPool(api_keys)
+
+    def register(self, kind: str, factory: Callable[[str], Any]) -> None:
+        """Make `kind` leasable; `factory(api_key)` builds one agent.
+        The first registration wins so every page shares the same agents."""
+        with self._lock:
+            self._factories.setdefault(kind, factory)
+
+    @contextmanager
+    def lease(self, kind: str) -> Iterator[AgentLease]:
+        """Check out an agent of `kind` on the least busy healthy key."""
+        with self._lock:
+            if kind not in self._factories:
+                raise KeyError(f"No agent factory registered for {kind!r}")
+            api_key = self._pick_key()
+            state = self._keys[api_key]
+            state.in_flight += 1
+            state.leases += 1
+            idle = self._idle.setdefault((kind, api_key), [])
+            agent = idle.pop() if idle else None
+        try:
+            if agent is None:
+                agent = self._factories[kind](api_key)
+            else:
+                AgentPool._reset(agent)
+            yield AgentLease(agent, api_key)
+        except Exception as exc:
+            if self.is_rate_limit(exc):
+                self.mark_rate_limited(api_key)
+            raise
+        finally:
+            with self._lock:
+                state.in_flight -= 1
+                if agent is not None:
+                    self._idle[(kind, api_key)].append(agent)
+
+    @staticmethod
+    def _reset(agent: Any) -> None:
+        # autogen counts consecutive auto-replies per sender and stops
+        # answering (or asks for human input) after 100; a reused agent
+        # starts every lease with a clean counter and history
+        reset = getattr(agent, "reset", None)
+        if callable(reset):
+            reset()
+
+    def _pick_key(self) -> str:
+        now = time.monotonic()
+        healthy = [key for key in self.api_keys
+                   if self._keys[key].cooldown_until <= now]
+        if not healthy:
+            # Everything is throttled: use the key that recovers first
+            return min(self.api_keys,
+                       key=lambda k: self._keys[k].cooldown_until)
+        return min(healthy, key=lambda k: (self._keys[k].in_flight,
+                                           self._keys[k].leases))
+
+    def mark_rate_limited(self, api_key: str) -> None:
+        with self._lock:
+            state = self._keys[api_key]
+            state.rate_limited += 1
+            state.cooldown_until = time.monotonic() + self.COOLDOWN_SECONDS
+
+    @staticmethod
+    def is_rate_limit(exc: BaseException) -> bool:
+        """True for 429/RESOURCE_EXHAUSTED errors from either Gemini SDK."""
+        for attr in ("code", "status_code"):
+            if getattr(exc, attr, None) == 429:
+                return True
+        message = str(exc).lower()
+        return any(marker in message
+                   for marker in AgentPool.RATE_LIMIT_MARKERS)
+
+    def key_label(self, api_key: str) -> str:
+        """Short, loggable name of a key (never the full key)."""
+        index = self.api_keys.index(api_key) + 1 \
+            if api_key in self.api_keys else "?"
+        return f"key-{index}…{api_key[-4:]}"
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-key load, keyed by `key_label`."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                self.key_label(key): {
+                    "in_flight": state.in_flight,
+                    "leases": state.leases,
+                    "rate_limited": state.rate_limited,
+                    "cooldown_s": max(0.0, state.cooldown_until - now),
+                }
+                for key, state in self._keys.items()
+            }
@@ -0,0 +1,181 @@
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+import streamlit as st  # type: ignore
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by `submit` when `max_queue` jobs are already waiting."""
+
+
+@dataclass
+class Job:
+    """One background request; `partial` holds streamed text so far."""
+    job_id: str
+    key: str
+    label: str = ""
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    partial: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event,
+                                          repr=False)
+    fn: Optional[Callable[["Job"], Any]] = field(default=None, repr=False)
+
+    FINISHED = ("done", "failed", "cancelled")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in Job.FINISHED
+
+    @property
+    def cancelled(self) -> bool:
+        """Checked by long-running work between steps (e.g. chunks)."""
+        return self.cancel_event.is_set()
+
+
+class JobExecutor:
+    """Bounded thread pool that runs LLM requests off the script thread.
+
+    Jobs wait in a FIFO queue and start when a worker is free and fewer
+    than `per_key_limit` jobs with the same key are running, so one key
+    (e.g. one session) cannot occupy every worker. Running jobs are
+    cancelled cooperatively through `Job.cancelled`. Finished jobs are
+    kept for `retention_seconds` so a rerun can pick up the result.
+    """
+    def __init__(self, max_workers: int = 4, per_key_limit: int = 2,
+                 max_queue: int = 64, retention_seconds: float = 600.0):
+        self.max_workers = max_workers
+        self.per_key_limit = per_key_limit
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="llm-job")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Deque[Job] = deque()
+        self._running: Dict[str, int] = {}
+        self._counts = {"done": 0, "failed": 0, "cancelled": 0}
+        self._wait_total = 0.0
+        self._started = 0
+
+    @staticmethod
+    @st.cache_resource
+    def shared(max_workers: int = 4,
+               per_key_limit: int = 2) -> "JobExecutor":
+        """Process-wide executor shared by every Streamlit session."""
+        return JobExecutor(max_workers, per_key_limit)
+
+    def submit(self, key: str, fn: Callable[[Job], Any],
+               label: str = "") -> str:
+        """Queue `fn(job)` and return the job id."""
+        with self._lock:
+            if len(self._pending) >= self.max_queue:
+                raise JobQueueFull(
+                    f"{len(self._pending)} jobs already waiting"
+                )
+            self._prune()
+            job = Job(job_id=f"job-{next(self._ids)}", key=key, label=label,
+                      fn=fn)
+            self._jobs[job.job_id] = job
+            self._pending.append(job)
+            self._dispatch()
+        return job.job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def position(self, job_id: str) -> int:
+        """1-based place in the queue, 0 once the job has started."""
+        with self._lock:
+            for i, job in enumerate(self._pending):
+                if job.job_id == job_id:
+                    return i + 1
+            return 0
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job or ask a running one to stop."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_event.set()
+            if job.status == "queued":
+                self._pending.remove(job)
+                self._finish(job, "cancelled")
+            return True
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            queued_by_key: Dict[str, int] = {}
+            for job in self._pending:
+                queued_by_key[job.key] = queued_by_key.get(job.key, 0) + 1
+            return {
+                "queue_depth": len(self._pending),
+                "running": sum(self._running.values()),
+                "max_workers": self.max_workers,
+                "queued_by_key": queued_by_key,
+                "running_by_key": dict(self._running),
+                "avg_wait_s": (self._wait_total / self._started
+                               if self._started else 0.0),
+                **self._counts,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            for job in list(self._pending):
+                job.cancel_event.set()
+                self._finish(job, "cancelled")
+            self._pending.clear()
+        self._pool.shutdown(wait=wait)
+
+    def _dispatch(self) -> None:
+        """Start every queued job that fits the worker and key limits."""
+        for job in list(self._pending):
+            if sum(self._running.values()) >= self.max_workers:
+                return
+            if self._running.get(job.key, 0) >= self.per_key_limit:
+                continue
+            self._pending.remove(job)
+            self._running[job.key] = self._running.get(job.key, 0) + 1
+            job.status = "running"
+            job.started_at = time.time()
+            self._wait_total += job.started_at - job.submitted_at
+            self._started += 1
+            self._pool.submit(self._run, job)
+
+    def _run(self, job: Job) -> None:
+        try:
+            result = job.fn(job)
+        except Exception as exc:
+            status, job.error = "failed", str(exc)
+        else:
+            job.result = result
+            status = "cancelled" if job.cancelled else "done"
+        with self._lock:
+            self._running[job.key] -= 1
+            if not self._running[job.key]:
+                del self._running[job.key]
+            self._finish(job, status)
+            self._dispatch()
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        job.fn = None
+        self._counts[status] += 1
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,89 @@
+import time
+from types import SimpleNamespace
+from typing import Callable, Iterator, List, Optional
+
+from services.retrieval.context_packer import TokenEstimator
+
+
+class LLMBackend:
+    """Where answers come from once the prompt is built.
+
+    ChatManager and ResponsePipeline call `complete`/`stream`; the default
+    (no backend) path keeps using the autogen agents and LLMStreamer.
+    """
+    name = "base"
+
+    def complete(self, system_message: str, prompt: str) -> str:
+        raise NotImplementedError
+
+    def stream(self, system_message: str, prompt: str) -> Iterator[str]:
+        yield self.complete(system_message, prompt)
+
+
+class StubBackend(LLMBackend):
+    """Deterministic offline backend for tests and benchmarks.
+
+    Each call sleeps `base_latency` plus one interval per generated token
+    at `tokens_per_second`, and counts calls and tokens. It also speaks
+    the autogen client protocol (`create`/`extract_text_or_completion_object`),
+    so it can replace `agent.client` on a real ConversableAgent.
+    """
+    name = "stub"
+
+    def __init__(self, base_latency: float = 0.0,
+                 tokens_per_second: Optional[float] = None,
+                 reply: str = "Stub answer.",
+                 reply_fn: Optional[Callable[[str], str]] = None):
+        self.base_latency = base_latency
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+        self.reply_fn = reply_fn
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Read by autogen when an agent prints its usage summary
+        self.total_usage_summary = None
+        self.actual_usage_summary = None
+
+    def _answer(self, prompt: str) -> str:
+        return self.reply_fn(prompt) if self.reply_fn else self.reply
+
+    def _tokens(self, text: str) -> List[str]:
+        """Split the reply into roughly token-sized pieces."""
+        words = text.split(" ")
+        return [word + (" " if i < len(words) - 1 else "")
+                for i, word in enumerate(words)]
+
+    def _account(self, prompt: str, answer: str) -> None:
+        self.calls += 1
+        self.prompt_tokens += TokenEstimator.estimate(prompt)
+        self.completion_tokens += TokenEstimator.estimate(answer)
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def complete(self, system_message: str, prompt: str) -> str:
+        answer = self._answer(prompt)
+        self._account(system_message + prompt, answer)
+        time.sleep(self.base_latency + TokenEstimator.estimate(answer)
+                   * self._token_delay())
+        return answer
+
+    def stream(self, system_message: str, prompt: str) -> Iterator[str]:
+        answer = self._answer(prompt)
+        self._account(system_message + prompt, answer)
+        time.sleep(self.base_latency)
+        delay = self._token_delay()
+        for piece in self._tokens(answer):
+            if delay:
+                time.sleep(TokenEstimator.estimate(piece) * delay)
+            yield piece
+
+    # autogen client protocol
+    def create(self, messages=None, **kwargs):
+        prompt = "\n".join(str(m.get("content", "")) for m in messages or [])
+        return SimpleNamespace(text=self.complete("", prompt))
+
+    @staticmethod
+    def extract_text_or_completion_object(response):
+        return [response.text]
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import re
+import time
+import streamlit as st  # type: ignore
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple
+
+from utils.lru_cache import LRUCache
+from utils.text_tokenizer import TextTokenizer
+from utils.tracing import Tracer
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    score: float
+    matched: List[str] = field(default_factory=list)
+    cached: bool = False
+    latency_ms: float = 0.0
+
+
+class QueryRouter:
+    """Decides whether a question goes to the org-chart or the notes agent.
+
+    All rules are compiled into one regex; English terms only match whole
+    words, so "WBR reports" or "organize" no longer count as org questions.
+    Each rule that fires adds its weight, optional `scorers` (e.g. "does
+    the question name someone in the org graph?") add theirs, and a score
+    of at least THRESHOLD routes to the org agent. Mentioning a team is
+    common in note questions too, so it only counts with a second signal.
+    Decisions are memoized per corpus generation and appended to a
+    rotating JSONL log for offline review, which keeps a hash and a short
+    preview of the prompt rather than the prompt itself.
+    """
+    ORG_ROUTE = "GraphRAG_Agent"
+    NOTES_ROUTE = "TextRAG_Agent"
+    THRESHOLD = 1.0
+    LOG_PATH = "data/logs/routing.jsonl"
+    PROMPT_PREVIEW_CHARS = 40
+    # (name, pattern, weight); English patterns get word boundaries
+    RULES: List[Tuple[str, str, float]] = [
+        ("org_chart", r"(?:org|organi[sz]ation(?:al)?)\s+"
+                      r"(?:chart|structure|tree)s?", 2.0),
+        ("reporting", r"reports?\s+to|reporting\s+(?:line|structure|chain)s?"
+                      r"|direct\s+reports?", 2.0),
+        ("org", r"org|organi[sz]ations?", 1.0),
+        ("manager", r"managers?|managed\s+by|manages|supervisors?|boss"
+                    r"|subordinates?", 1.0),
+        ("lead", r"team\s+leads?|led\s+by|who\s+leads", 1.0),
+        ("team", r"teams?|departments?|divisions?|headcount", 0.5),
+    ]
+    CJK_RULES: List[Tuple[str, str, float]] = [
+        ("org_chart_zh", r"組織圖|組織架構|組織|架構圖", 2.0),
+        ("reporting_zh", r"匯報|向.{1,8}報告|直屬", 2.0),
+        ("manager_zh", r"主管|經理|老闆|上司|下屬", 1.0),
+        ("team_zh", r"團隊|部門|組員|成員", 0.5),
+    ]
+
+    def __init__(self, log_path: Optional[str] = LOG_PATH,
+                 cache_size: int = 1024, max_bytes: int = 5_000_000,
+                 backup_count: int = 3):
+        parts = [f"(?P<{name}>(?<![a-z0-9])(?:{pattern})(?![a-z0-9]))"
+                 for name, pattern, _ in QueryRouter.RULES]
+        parts += [f"(?P<{name}>{pattern})"
+                  for name, pattern, _ in QueryRouter.CJK_RULES]
+        self.pattern = re.compile("|".join(parts))
+        self.weights = {name: weight for name, _, weight
+                        in QueryRouter.RULES + QueryRouter.CJK_RULES}
+        self.log_path = log_path
+        self.decisions = LRUCache(cache_size)
+        self._logger = (Tracer.rotating_logger(log_path, max_bytes,
+                                               backup_count)
+                        if log_path else None)
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "QueryRouter":
+        return QueryRouter()
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return " ".join(TextTokenizer.normalize(prompt).split())
+
+    def score(self, prompt: str) -> Tuple[float, List[str]]:
+        """Rule score of an already normalized prompt."""
+        matched = sorted({match.lastgroup
+                          for match in self.pattern.finditer(prompt)})
+        return sum(self.weights[name] for name in matched), matched
+
+    def route(self, prompt: str,
+              scorers: Sequence[Callable[[str], float]] = (),
+              generation: Hashable = None) -> RouteDecision:
+        """Route `prompt`; pass the corpus version as `generation` when
+        `scorers` depend on the indexes, so stale decisions are dropped."""
+        start = time.perf_counter()
+        normalized = QueryRouter.normalize(prompt)
+        self.decisions.ensure_generation(generation)
+        cached = self.decisions.get(normalized)
+        if cached is not None:
+            decision = RouteDecision(cached.route, cached.score,
+                                     cached.matched, cached=True)
+        else:
+            score, matched = self.score(normalized)
+            for scorer in scorers:
+                extra = scorer(prompt)
+                if extra:
+                    score += extra
+                    matched.append(getattr(scorer, "__name__", "scorer"))
+            route = (QueryRouter.ORG_ROUTE if score >= QueryRouter.THRESHOLD
+                     else QueryRouter.NOTES_ROUTE)
+            decision = RouteDecision(route, score, matched)
+            self.decisions.put(normalized, decision)
+        decision.latency_ms = (time.perf_counter() - start) * 1000
+        self._log(prompt, decision)
+        return decision
+
+    def _log(self, prompt: str, decision: RouteDecision) -> None:
+        if self._logger is None:
+            return
+        record = {
+            "ts": time.time(),
+            "prompt_hash": hashlib.sha1(
+                prompt.encode("utf-8")
+            ).hexdigest()[:16],
+            "prompt": prompt[:QueryRouter.PROMPT_PREVIEW_CHARS],
+            **asdict(decision)
+        }
+        # logging handles locking; a failed write is reported by logging
+        # itself and never breaks answering
+        self._logger.info(json.dumps(record, ensure_ascii=False))
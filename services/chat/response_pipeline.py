@@ -0,0 +1,101 @@
+from typing import Dict, List, Sequence
+from autogen.code_utils import content_str  # type: ignore
+
+from utils.tracing import Tracer
+
+
+class ResponsePipeline:
+    """Runs one question through an agent and cleans the resulting history.
+
+    Modes:
+      - "single_call": one LLM round-trip; the assistant reply is taken
+        straight from `generate_reply`.
+      - "reflection": the original `initiate_chat(...,
+        summary_method="reflection_with_llm")` flow, which costs a second
+        LLM call for a summary that is never displayed.
+
+    With an LLMBackend, single-call replies come from the backend instead
+    of the agent's autogen client.
+    """
+    MODES = ("single_call", "reflection")
+    # History entries echoing the prompt/context rather than answering
+    FILTER_KEYWORDS = [
+        "```mermaid", "# personal", "based on the following",
+        "use the following"
+    ]
+
+    def __init__(self, user_proxy, mode: str = "single_call",
+                 termination_phrases: Sequence[str] = (), backend=None):
+        if mode not in ResponsePipeline.MODES:
+            raise ValueError(f"Unknown response mode: {mode}")
+        if backend is not None and mode == "reflection":
+            raise ValueError("reflection mode needs the autogen agents")
+        self.backend = backend
+        self.user_proxy = user_proxy
+        self.mode = mode
+        self.termination_phrases = [p.lower() for p in termination_phrases]
+
+    def run(self, agent, final_prompt: str) -> List[Dict[str, str]]:
+        if self.mode == "reflection":
+            with Tracer.shared().span("initiate_chat", agent=agent.name):
+                response = self.user_proxy.initiate_chat(
+                    agent,
+                    message=final_prompt,
+                    summary_method="reflection_with_llm",
+                    max_turns=1
+                )
+            return self.filter_history(response.chat_history)
+
+        with Tracer.shared().span("llm", agent=agent.name):
+            if self.backend is not None:
+                reply = self.backend.complete(agent.system_message,
+                                              final_prompt)
+            else:
+                reply = agent.generate_reply(
+                    messages=[{"role": "user", "content": final_prompt}],
+                    sender=self.user_proxy
+                )
+        if isinstance(reply, dict):
+            reply = reply.get("content", "")
+        return self.filter_history([
+            {"role": "assistant", "content": content_str(reply or "")}
+        ])
+
+    @staticmethod
+    def token_counts(agent) -> Dict[str, int]:
+        """Token counts the agent's autogen client got back from the API
+        since the agent was leased (the pool resets reused agents);
+        empty when the API did not report any."""
+        summary = getattr(getattr(agent, "client", None),
+                          "actual_usage_summary", None) or {}
+        models = [usage for usage in summary.values()
+                  if isinstance(usage, dict)]
+        if not models:
+            return {}
+        return {
+            "prompt_tokens": sum(m.get("prompt_tokens", 0) for m in models),
+            "completion_tokens": sum(m.get("completion_tokens", 0)
+                                     for m in models),
+        }
+
+    @staticmethod
+    @Tracer.traced("filter_history")
+    def filter_history(chat_history) -> List[Dict[str, str]]:
+        filtered_history = []
+        for msg in chat_history:
+            content = (msg.get("content") or "").strip()
+            if not content:
+                continue
+            if any(keyword in content.lower()
+                   for keyword in ResponsePipeline.FILTER_KEYWORDS):
+                continue
+            # autogen records the agent's reply under the proxy's "user"
+            # role; everything left after filtering is the answer
+            filtered_history.append({"role": "assistant", "content": content})
+        return filtered_history
+
+    def is_refusal(self, content: str) -> bool:
+        """True if the reply is a TERMINATION_PHRASES-style non-answer;
+        such replies are shown but should not be cached."""
+        lowered = content.lower()
+        return any(phrase in lowered for phrase in self.termination_phrases)
@@ -0,0 +1,190 @@
+import atexit
+import logging
+import threading
+import time
+import streamlit as st  # type: ignore
+from dataclasses import astuple, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from utils.sqlite_helper import SQLiteHelper
+from utils.sqlite_pool import SQLitePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UsageRecord:
+    """One answered question; `source` says how it was answered."""
+    route: str
+    source: str
+    agent: Optional[str] = None
+    api_key: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    cache_hit: bool = False
+    error: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+
+
+class UsageTracker:
+    """Token and latency accounting in the `llm_usage` table.
+
+    Records are buffered and written in one transaction once
+    `batch_size` are waiting or `flush_seconds` have passed, so
+    answering never waits on a per-call insert. Rollups flush first.
+    A failed flush (e.g. the database is locked) is logged and retried
+    with the next batch, keeping at most `MAX_PENDING` records, so
+    accounting never fails an answer. `api_key` holds the pool's short
+    key label, never the key itself.
+    """
+    # Beside prompt_cache, in the same database file
+    DB_PATH = SQLiteHelper.DB_PATH
+    BATCH_SIZE = 20
+    FLUSH_SECONDS = 5.0
+    MAX_PENDING = 1000
+    COLUMNS = ("route", "source", "agent", "api_key", "prompt_tokens",
+               "completion_tokens", "latency_ms", "cache_hit", "error", "ts")
+    # Rollup dimension -> SQL expression
+    GROUPS = {
+        "day": "date(ts, 'unixepoch', 'localtime')",
+        "agent": "COALESCE(agent, '-')",
+        "route": "route",
+        "source": "source",
+        "api_key": "COALESCE(api_key, '-')",
+    }
+
+    def __init__(self, db_path: str = DB_PATH,
+                 batch_size: int = BATCH_SIZE,
+                 flush_seconds: float = FLUSH_SECONDS):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending: List[UsageRecord] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        with self.pool().transaction(write=True) as cursor:
+            UsageTracker._create_schema(cursor)
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "UsageTracker":
+        tracker = UsageTracker()
+        # Do not lose the last partial batch on shutdown
+        atexit.register(tracker.flush_quietly)
+        return tracker
+
+    def pool(self) -> SQLitePool:
+        return SQLitePool.for_path(self.db_path)
+
+    @staticmethod
+    def _create_schema(cursor) -> None:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY,
+                route TEXT NOT NULL,
+                source TEXT NOT NULL,
+                agent TEXT,
+                api_key TEXT,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                latency_ms REAL NOT NULL DEFAULT 0,
+                cache_hit INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                ts REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_llm_usage_ts ON llm_usage (ts)
+        """)
+
+    def record(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._pending.append(record)
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush
+                   >= self.flush_seconds)
+        if due:
+            self.flush_quietly()
+
+    def flush_quietly(self) -> int:
+        """`flush`, logging instead of raising; for the answering path."""
+        try:
+            return self.flush()
+        except Exception:
+            with self._lock:
+                pending = len(self._pending)
+            logger.warning("Usage flush failed; %d records kept for retry",
+                           pending, exc_info=True)
+            return 0
+
+    def flush(self) -> int:
+        """Write buffered records; returns how many were written."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not batch:
+            return 0
+        placeholders = ", ".join("?" for _ in UsageTracker.COLUMNS)
+        try:
+            with self.pool().transaction(write=True) as cursor:
+                cursor.executemany(
+                    f"INSERT INTO llm_usage ({', '.join(self.COLUMNS)}) "
+                    f"VALUES ({placeholders})",
+                    [astuple(record) for record in batch]
+                )
+        except Exception:
+            # Keep the batch for the next flush rather than drop it, but
+            # only the newest MAX_PENDING while the database stays down
+            with self._lock:
+                self._pending[:0] = batch
+                del self._pending[:-self.MAX_PENDING]
+            raise
+        return len(batch)
+
+    def rollup(self, by: str = "day",
+               since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Totals grouped by day, agent, route, source or api_key."""
+        if by not in UsageTracker.GROUPS:
+            raise ValueError(f"Unknown rollup dimension: {by}")
+        self.flush()
+        with self.pool().transaction() as cursor:
+            rows = cursor.execute(f"""
+                SELECT {UsageTracker.GROUPS[by]} AS bucket,
+                       COUNT(*),
+                       SUM(source IN ('llm', 'stream') AND error IS NULL),
+                       SUM(cache_hit),
+                       SUM(prompt_tokens),
+                       SUM(completion_tokens),
+                       AVG(latency_ms),
+                       MAX(latency_ms),
+                       SUM(error IS NOT NULL)
+                FROM llm_usage
+                WHERE ts >= ?
+                GROUP BY bucket
+                ORDER BY bucket
+            """, (since or 0,)).fetchall()
+        return [{
+            by: bucket,
+            "requests": requests,
+            "llm_calls": llm_calls,
+            "cache_hits": cache_hits,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "avg_latency_ms": round(avg_latency, 1),
+            "max_latency_ms": round(max_latency, 1),
+            "errors": errors,
+        } for (bucket, requests, llm_calls, cache_hits, prompt_tokens,
+               completion_tokens, avg_latency, max_latency, errors) in rows]
+
+    def key_usage_today(self) -> Dict[str, Dict[str, int]]:
+        """LLM calls and tokens per API key since local midnight, for
+        comparing against the per-key Gemini daily quota."""
+        midnight = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+        return {
+            row["api_key"]: {"llm_calls": row["llm_calls"],
+                             "total_tokens": row["total_tokens"]}
+            for row in self.rollup("api_key", since=midnight)
+            if row["api_key"] != "-"
+        }
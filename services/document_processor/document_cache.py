@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+import time
+import streamlit as st  # type: ignore
+from typing import Dict, Optional, Tuple
+
+
+class CorpusCache:
+    """Process-wide cache of the markdown notes under `uploaded_docs`.
+
+    Files are keyed by (path, size, mtime_ns); a load only re-reads files
+    whose key changed and bumps `version` whenever the corpus differs from
+    the previous load. CRUD operations call `invalidate` so edits show up
+    immediately instead of waiting for the next rescan.
+    """
+    BASE_DIRS = {
+        "personal": "uploaded_docs/personal",
+        "org": "uploaded_docs/org"
+    }
+
+    def __init__(self, base_dirs: Optional[Dict[str, str]] = None,
+                 rescan_interval: float = 1.0):
+        self.base_dirs = base_dirs or dict(CorpusCache.BASE_DIRS)
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        # path -> ((size, mtime_ns), content)
+        self._entries: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._docs: Dict[str, Dict[str, str]] = {
+            category: {} for category in self.base_dirs
+        }
+        self._fingerprints: Dict[str, str] = {}
+        self._version = 0
+        self._last_scan = None
+        self._dirty = True
+        # Paths re-read on the next scan even if their key is unchanged
+        self._stale: set = set()
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "CorpusCache":
+        return CorpusCache()
+
+    @property
+    def version(self) -> int:
+        """Monotonically increasing counter, bumped on every change."""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def fingerprint(self, category: Optional[str] = None) -> str:
+        """Stable digest of file keys; equal across processes and restarts."""
+        with self._lock:
+            self._refresh()
+            if category is not None:
+                return self._fingerprints.get(category, "")
+            return hashlib.sha1(
+                "|".join(f"{c}:{self._fingerprints[c]}"
+                         for c in sorted(self._fingerprints)).encode()
+            ).hexdigest()
+
+    def load(self) -> Dict[str, Dict[str, str]]:
+        """Return {category: {filename: content}} for every `.md` file."""
+        with self._lock:
+            self._refresh()
+            return {category: dict(files)
+                    for category, files in self._docs.items()}
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Force a rescan; drop `path` (or everything) so it is re-read."""
+        with self._lock:
+            if path is None:
+                self._stale.update(self._entries)
+            else:
+                self._stale.add(os.path.abspath(path))
+            self._dirty = True
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if (not self._dirty and self._last_scan is not None
+                and now - self._last_scan < self.rescan_interval):
+            return
+
+        changed = False
+        seen = set()
+        docs: Dict[str, Dict[str, str]] = {}
+        fingerprints: Dict[str, str] = {}
+        for category, base_dir in self.base_dirs.items():
+            docs[category] = {}
+            digest = hashlib.sha1()
+            try:
+                entries = sorted(os.scandir(base_dir), key=lambda e: e.name)
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                path = os.path.abspath(entry.path)
+                stat = entry.stat()
+                key = (stat.st_size, stat.st_mtime_ns)
+                previous = cached = self._entries.get(path)
+                if (cached is None or cached[0] != key
+                        or path in self._stale):
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            cached = (key, f.read())
+                    except (FileNotFoundError, UnicodeDecodeError):
+                        continue
+                    self._entries[path] = cached
+                    changed = changed or previous != cached
+                seen.add(path)
+                docs[category][entry.name] = cached[1]
+                digest.update(f"{entry.name}:{key[0]}:{key[1]}|".encode())
+            fingerprints[category] = digest.hexdigest()
+
+        for path in set(self._entries) - seen:
+            del self._entries[path]
+            changed = True
+        if changed or fingerprints != self._fingerprints:
+            self._version += 1
+        self._docs, self._fingerprints = docs, fingerprints
+        self._last_scan = now
+        self._dirty = False
+        self._stale.clear()
@@ -1,13 +1,28 @@
 import streamlit as st  # type: ignore
 import os
 from typing import Optional
+from services.document_processor.document_cache import CorpusCache
 from services.document_processor.document_mermaid import MermaidProcessor
+from services.document_processor.mermaid_index import MermaidIndex
+from services.retrieval.link_index import LinkIndex
 
 
 class CRUDProcessor:
     def __init__(self):
         self.mermaid_processor = MermaidProcessor()
 
+    @staticmethod
+    def _index_links(file_path: str, content: Optional[str]) -> None:
+        """Keep the link index in step with the personal notes."""
+        personal_dir = os.path.abspath(CorpusCache.BASE_DIRS["personal"])
+        if os.path.dirname(os.path.abspath(file_path)) != personal_dir:
+            return
+        source = os.path.basename(file_path)
+        if content is None:
+            LinkIndex.shared().remove_document(source)
+        else:
+            LinkIndex.shared().update_document(source, content)
+
     def handle_file_upload(self, uploaded_file, upload_dir: str) -> None:
         """Handle file upload with preview."""
         if uploaded_file is None:
@@ -37,17 +52,20 @@ class CRUDProcessor:
             # Write file
             with open(file_path, "wb") as f:
                 f.write(uploaded_file.getbuffer())
+            CorpusCache.shared().invalidate(file_path)
 
             st.success("✅ Upload successful!")
 
             # Show preview of uploaded content
             file_content = uploaded_file.getvalue().decode("utf-8")
+            blocks = MermaidIndex.shared().update(file_path, file_content)
+            self._index_links(file_path, file_content)
             with st.expander("📋 Preview uploaded content", expanded=True):
                 st.markdown(file_content)
 
             # Extract and render Mermaid blocks
             st.markdown("⬇️ Mermaid chart preview：")
-            self.mermaid_processor.render_mermaid_blocks(file_content)
+            self.mermaid_processor.render_mermaid_blocks(file_content, blocks)
 
         except Exception as e:
             st.error(f"❌ Upload failed: {str(e)}")
@@ -77,6 +95,9 @@ class CRUDProcessor:
             # Write new content
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(content)
+            CorpusCache.shared().invalidate(file_path)
+            MermaidIndex.shared().update(file_path, content)
+            self._index_links(file_path, content)
             # Clean up backup after successful write
             if os.path.exists(backup_path):
                 os.remove(backup_path)
@@ -116,6 +137,9 @@ class CRUDProcessor:
 
             # Move to backup location instead of permanent deletion
             os.rename(file_path, backup_path)
+            CorpusCache.shared().invalidate(file_path)
+            MermaidIndex.shared().remove(file_path)
+            self._index_links(file_path, None)
 
             st.success(
                 "✅ File deleted successfully!"
@@ -134,6 +158,9 @@ class CRUDProcessor:
                 return False
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(content)
+            CorpusCache.shared().invalidate(file_path)
+            MermaidIndex.shared().update(file_path, content)
+            self._index_links(file_path, content)
             st.success(
                 f"✅ File created successfully: {os.path.basename(file_path)}")
             return True
@@ -1,6 +1,8 @@
 import streamlit as st  # type: ignore
 import streamlit.components.v1 as components  # type: ignore
-import re
+from typing import List, Optional
+from services.document_processor.mermaid_index import (MermaidBlock,
+                                                      MermaidIndex)
 
 
 class MermaidProcessor:
@@ -19,22 +21,22 @@ class MermaidProcessor:
         """
         components.html(html_code, height=height, scrolling=True)
 
-    def render_mermaid_blocks(self, markdown_text: str):
-        pattern = r"```mermaid\s*\n([\s\S]*?)```"
-        matches = re.findall(pattern, markdown_text)
+    def render_mermaid_blocks(self, markdown_text: str,
+                              blocks: Optional[List[MermaidBlock]] = None):
+        """Render each Mermaid block, then the remaining markdown.
 
-        for i, code in enumerate(matches):
+        `blocks` should come from MermaidIndex for this exact text; without
+        them the text is scanned here.
+        """
+        if blocks is None:
+            blocks = MermaidIndex.extract(markdown_text)
+
+        for block in blocks:
             # st.markdown(f"### Mermaid block #{i+1}")
             # st.code(code, language="mermaid")
-            cleaned = (
-                code.strip()
-                .replace("\\n", "<br>")
-                .replace('\r\n', '\n')
-                .replace('\r', '\n')
-            )
-            self.render_mermaid_raw(cleaned)
+            self.render_mermaid_raw(block.code.replace("\\n", "<br>"))
 
-        cleaned_text = re.sub(pattern, '', markdown_text, flags=re.DOTALL)
+        cleaned_text = MermaidIndex.strip_blocks(markdown_text, blocks)
         if cleaned_text.strip():
             st.markdown("---")
             st.markdown(cleaned_text, unsafe_allow_html=True)
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import streamlit as st  # type: ignore
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class MermaidBlock:
+    """One ```mermaid fence: normalized code plus where it sits in the file.
+
+    `start`/`end` are character offsets of the whole fence (backticks
+    included) in the indexed text; `line` is the 1-based opening line.
+    """
+    source: str
+    index: int
+    code: str
+    digest: str
+    start: int
+    end: int
+    line: int
+
+
+@dataclass
+class _FileEntry:
+    stamp: Tuple[int, int]
+    digest: str
+    blocks: List[MermaidBlock] = field(default_factory=list)
+
+
+class MermaidIndex:
+    """Sidecar index of the Mermaid blocks in each uploaded markdown file.
+
+    CRUD operations call `update`/`remove` so blocks are extracted once at
+    ingestion; chat and preview read them back with `blocks`/`blocks_in`.
+    Files changed outside the app are re-indexed on first access, detected
+    by (size, mtime_ns) or, when the caller passes the text, by its hash.
+    """
+    INDEX_PATH = "data/mermaid_index.json"
+    PATTERN = re.compile(r"```mermaid[ \t]*\r?\n([\s\S]*?)```")
+
+    def __init__(self, index_path: str = INDEX_PATH):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._files: Dict[str, _FileEntry] = self._read_index()
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "MermaidIndex":
+        return MermaidIndex()
+
+    @staticmethod
+    def normalize(code: str) -> str:
+        return code.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+    @staticmethod
+    def extract(markdown_text: str, source: str = "") -> List[MermaidBlock]:
+        blocks = []
+        line, last = 1, 0
+        matches = MermaidIndex.PATTERN.finditer(markdown_text)
+        for i, match in enumerate(matches):
+            line += markdown_text.count("\n", last, match.start())
+            last = match.start()
+            code = MermaidIndex.normalize(match.group(1))
+            blocks.append(MermaidBlock(
+                source=source, index=i, code=code,
+                digest=hashlib.sha1(code.encode("utf-8")).hexdigest(),
+                start=match.start(), end=match.end(), line=line
+            ))
+        return blocks
+
+    @staticmethod
+    def strip_blocks(markdown_text: str, blocks: List[MermaidBlock]) -> str:
+        """The markdown with the given blocks cut out, using their offsets."""
+        parts, pos = [], 0
+        for block in blocks:
+            parts.append(markdown_text[pos:block.start])
+            pos = block.end
+        parts.append(markdown_text[pos:])
+        return "".join(parts)
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def update(self, path: str, content: Optional[str] = None
+               ) -> List[MermaidBlock]:
+        """(Re-)index `path`; pass `content` to skip reading the file."""
+        with self._lock:
+            blocks = self._index(os.path.abspath(path), content)
+            self._write_index()
+            return blocks
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            if self._files.pop(os.path.abspath(path), None) is not None:
+                self._write_index()
+
+    def blocks(self, path: str, content: Optional[str] = None
+               ) -> List[MermaidBlock]:
+        """Indexed blocks of `path`. With `content`, the offsets are
+        guaranteed to refer to that exact text."""
+        with self._lock:
+            key = os.path.abspath(path)
+            entry = self._files.get(key)
+            if entry is not None:
+                if content is not None:
+                    fresh = entry.digest == MermaidIndex._digest(content)
+                else:
+                    fresh = entry.stamp == MermaidIndex._stamp(key)
+                if fresh:
+                    return entry.blocks
+            blocks = self._index(key, content)
+            self._write_index()
+            return blocks
+
+    def blocks_in(self, directory: str) -> List[MermaidBlock]:
+        """Blocks of every `.md` file in `directory`, in filename order."""
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except FileNotFoundError:
+            return []
+        blocks: List[MermaidBlock] = []
+        with self._lock:
+            changed = False
+            for entry in entries:
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                key = os.path.abspath(entry.path)
+                cached = self._files.get(key)
+                if cached is None or cached.stamp != MermaidIndex._stamp(key):
+                    self._index(key)
+                    changed = True
+                if key in self._files:
+                    blocks.extend(self._files[key].blocks)
+            if changed:
+                self._write_index()
+        return blocks
+
+    @staticmethod
+    def _digest(content: str) -> str:
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def _index(self, key: str, content: Optional[str] = None
+               ) -> List[MermaidBlock]:
+        if content is None:
+            try:
+                with open(key, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except (FileNotFoundError, UnicodeDecodeError):
+                self._files.pop(key, None)
+                return []
+        blocks = MermaidIndex.extract(content, os.path.basename(key))
+        self._files[key] = _FileEntry(
+            stamp=MermaidIndex._stamp(key) or (0, 0),
+            digest=MermaidIndex._digest(content),
+            blocks=blocks
+        )
+        return blocks
+
+    def _read_index(self) -> Dict[str, _FileEntry]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        try:
+            return {
+                path: _FileEntry(
+                    stamp=tuple(entry["stamp"]), digest=entry["digest"],
+                    blocks=[MermaidBlock(**block)
+                            for block in entry["blocks"]]
+                )
+                for path, entry in raw.get("files", {}).items()
+            }
+        except (KeyError, TypeError):
+            # Written by an incompatible version; rebuild lazily
+            return {}
+
+    def _write_index(self) -> None:
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        payload = {"files": {path: asdict(entry)
+                             for path, entry in self._files.items()}}
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
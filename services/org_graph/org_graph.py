@@ -0,0 +1,275 @@
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.text_tokenizer import TextTokenizer
+
+
+@dataclass
+class OrgNode:
+    """One person or unit; `name` is the first label line, `details` the
+    rest (title, email, ...)."""
+    key: str
+    name: str
+    details: List[str] = field(default_factory=list)
+    sources: Set[str] = field(default_factory=set)
+
+    @property
+    def label(self) -> str:
+        return " / ".join([self.name] + self.details)
+
+
+class OrgGraph:
+    """Directed org chart: an edge manager -> report.
+
+    `children` is the adjacency index (who reports to a node) and
+    `parents` the reverse index (whom a node reports to).
+    """
+    def __init__(self):
+        self.nodes: Dict[str, OrgNode] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.parents: Dict[str, List[str]] = {}
+
+    @staticmethod
+    def node_key(name: str) -> str:
+        return " ".join(TextTokenizer.normalize(name).split())
+
+    def add_node(self, name: str, details: Iterable[str] = (),
+                 source: str = "") -> str:
+        key = OrgGraph.node_key(name)
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = OrgNode(key, name.strip())
+            self.children[key] = []
+            self.parents[key] = []
+        for detail in details:
+            if detail not in node.details:
+                node.details.append(detail)
+        if source:
+            node.sources.add(source)
+        return key
+
+    def add_edge(self, manager: str, report: str) -> None:
+        if manager == report or report in self.children[manager]:
+            return
+        self.children[manager].append(report)
+        self.parents[report].append(manager)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def find(self, name: str) -> Optional[str]:
+        """Resolve a free-text name to a node key: exact match, then a
+        unique node whose label contains every query token."""
+        key = OrgGraph.node_key(name)
+        if key in self.nodes:
+            return key
+        tokens = set(TextTokenizer.tokenize(name))
+        if not tokens:
+            return None
+        matches = [k for k, node in self.nodes.items()
+                   if tokens <= set(TextTokenizer.tokenize(node.label))]
+        return matches[0] if len(matches) == 1 else None
+
+    def mentioned(self, text: str) -> List[str]:
+        """Nodes whose every name token appears in `text`."""
+        tokens = set(TextTokenizer.tokenize(text))
+        mentioned = []
+        for key, node in self.nodes.items():
+            name_tokens = set(TextTokenizer.tokenize(node.name))
+            if name_tokens and name_tokens <= tokens:
+                mentioned.append(key)
+        return mentioned
+
+    def managers_of(self, key: str) -> List[str]:
+        return list(self.parents.get(key, []))
+
+    def reports_of(self, key: str, recursive: bool = False) -> List[str]:
+        if not recursive:
+            return list(self.children.get(key, []))
+        seen: List[str] = []
+        queue = deque(self.children.get(key, []))
+        while queue:
+            node = queue.popleft()
+            if node in seen or node == key:
+                continue
+            seen.append(node)
+            queue.extend(self.children.get(node, []))
+        return seen
+
+    def path(self, start: str, goal: str) -> Optional[List[str]]:
+        """Shortest chain between two nodes, following reporting lines in
+        either direction."""
+        previous: Dict[str, Optional[str]] = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = previous[node]
+                return chain[::-1]
+            for nxt in self.children[node] + self.parents[node]:
+                if nxt not in previous:
+                    previous[nxt] = node
+                    queue.append(nxt)
+        return None
+
+    def neighborhood(self, keys: Iterable[str], radius: int = 2) -> Set[str]:
+        selected = set(keys)
+        frontier = set(selected)
+        for _ in range(radius):
+            frontier = {nxt for node in frontier
+                        for nxt in self.children[node] + self.parents[node]
+                        } - selected
+            selected |= frontier
+        return selected
+
+    def to_mermaid(self, keys: Optional[Iterable[str]] = None) -> str:
+        """Compact Mermaid rendering of the whole graph or a subgraph."""
+        keys = set(self.nodes) if keys is None else set(keys)
+        ids = {key: f"n{i}" for i, key in enumerate(sorted(keys))}
+        lines = ["graph TD"]
+        for key in sorted(keys):
+            label = self.nodes[key].label.replace('"', "'")
+            lines.append(f'    {ids[key]}["{label}"]')
+        for key in sorted(keys):
+            for report in self.children[key]:
+                if report in keys:
+                    lines.append(f"    {ids[key]} --> {ids[report]}")
+        return "\n".join(lines)
+
+
+class MermaidOrgParser:
+    """Parses `graph`/`flowchart` Mermaid blocks into an OrgGraph.
+
+    Arrows point from manager to report (`CEO --> CTO`); `A <-- B` is read
+    as B -> A. Node ids are local to a block, so nodes are merged across
+    blocks and files by their label's first line.
+    """
+    HEADER = re.compile(r"^\s*(graph|flowchart)\b", re.IGNORECASE)
+    SKIP = re.compile(r"^\s*(%%|subgraph\b|end\b|classDef\b|class\b|"
+                      r"style\b|linkStyle\b|click\b|direction\b)")
+    NODE_ID = re.compile(r"\w+(?:[.\-]\w+)*")
+    # Longest openers first so "[[" wins over "["
+    SHAPES = (("[[", "]]"), ("[(", ")]"), ("([", "])"), ("((", "))"),
+              ("{{", "}}"), ("[/", "/]"), ("[\\", "\\]"), ("[", "]"),
+              ("(", ")"), ("{", "}"), (">", "]"))
+    LINK_WITH_TEXT = re.compile(
+        r"\s*(<)?(?:--|==|-\.)\s*[^\->=|]+?\s*(?:-{2,}|={2,}|\.-)([>xo]?)\s*"
+    )
+    LINK = re.compile(
+        r"\s*(<)?(?:-{2,}|={2,}|-\.+-)([>xo]?)\s*(?:\|[^|]*\|)?\s*"
+    )
+    LINE_BREAK = re.compile(r"<br\s*/?>|\\n", re.IGNORECASE)
+
+    @staticmethod
+    def parse_label(text: str) -> Tuple[str, List[str]]:
+        text = text.strip()
+        if len(text) >= 2 and text[0] == text[-1] == '"':
+            text = text[1:-1]
+        lines = [re.sub(r"<[^>]+>", "", part).strip()
+                 for part in MermaidOrgParser.LINE_BREAK.split(text)]
+        lines = [line for line in lines if line]
+        return (lines[0], lines[1:]) if lines else ("", [])
+
+    @staticmethod
+    def _node(stmt: str, pos: int) -> Tuple[Optional[Tuple[str, str]], int]:
+        """Parse `id` plus optional shape at `pos` -> ((id, label), end)."""
+        while pos < len(stmt) and stmt[pos].isspace():
+            pos += 1
+        match = MermaidOrgParser.NODE_ID.match(stmt, pos)
+        if not match:
+            return None, pos
+        node_id, pos = match.group(), match.end()
+        for opener, closer in MermaidOrgParser.SHAPES:
+            if stmt.startswith(opener, pos):
+                start = pos + len(opener)
+                search_from = start
+                if stmt.startswith('"', start):
+                    quote_end = stmt.find('"', start + 1)
+                    search_from = quote_end + 1 if quote_end != -1 else start
+                end = stmt.find(closer, search_from)
+                if end == -1:
+                    break
+                return (node_id, stmt[start:end]), end + len(closer)
+        return (node_id, ""), pos
+
+    @staticmethod
+    def _group(stmt: str, pos: int) -> Tuple[List[Tuple[str, str]], int]:
+        """Parse `A & B & C`."""
+        nodes = []
+        while True:
+            node, pos = MermaidOrgParser._node(stmt, pos)
+            if node is None:
+                return nodes, pos
+            nodes.append(node)
+            amp = re.match(r"\s*&\s*", stmt[pos:])
+            if not amp:
+                return nodes, pos
+            pos += amp.end()
+
+    @staticmethod
+    def parse_statement(stmt: str):
+        """Return (nodes, edges) for one statement; ids are block-local."""
+        nodes: List[Tuple[str, str]] = []
+        edges: List[Tuple[str, str]] = []
+        left, pos = MermaidOrgParser._group(stmt, 0)
+        nodes.extend(left)
+        while left:
+            link = (MermaidOrgParser.LINK_WITH_TEXT.match(stmt, pos)
+                    or MermaidOrgParser.LINK.match(stmt, pos))
+            if not link:
+                break
+            right, pos = MermaidOrgParser._group(stmt, link.end())
+            nodes.extend(right)
+            reverse = bool(link.group(1)) and not link.group(2)
+            for a, _ in left:
+                for b, _ in right:
+                    edges.append((b, a) if reverse else (a, b))
+            left = right
+        return nodes, edges
+
+    @staticmethod
+    def parse_block(graph: OrgGraph, block: str, source: str = "") -> None:
+        lines = block.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        if not any(MermaidOrgParser.HEADER.match(line) for line in lines):
+            return
+        labels: Dict[str, str] = {}
+        edges: List[Tuple[str, str]] = []
+        for line in lines:
+            if MermaidOrgParser.HEADER.match(line) \
+                    or MermaidOrgParser.SKIP.match(line):
+                continue
+            for stmt in line.split(";"):
+                nodes, stmt_edges = MermaidOrgParser.parse_statement(stmt)
+                for node_id, label in nodes:
+                    if label or node_id not in labels:
+                        labels[node_id] = label
+                edges.extend(stmt_edges)
+        keys = {}
+        for node_id, label in labels.items():
+            name, details = MermaidOrgParser.parse_label(label or node_id)
+            keys[node_id] = graph.add_node(name or node_id, details, source)
+        for manager, report in edges:
+            graph.add_edge(keys[manager], keys[report])
+
+    @staticmethod
+    def build(docs: Dict[str, str]) -> OrgGraph:
+        """Graph of every Mermaid block in `docs` ({filename: markdown})."""
+        return MermaidOrgParser.build_from_blocks(
+            (fname, block)
+            for fname in sorted(docs)
+            for block in re.findall(r"```mermaid\s*\n([\s\S]*?)```",
+                                    docs[fname])
+        )
+
+    @staticmethod
+    def build_from_blocks(blocks: Iterable[Tuple[str, str]]) -> OrgGraph:
+        """Graph of pre-extracted (source, code) blocks."""
+        graph = OrgGraph()
+        for source, code in blocks:
+            MermaidOrgParser.parse_block(graph, code, source)
+        return graph
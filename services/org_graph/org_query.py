@@ -0,0 +1,142 @@
+import re
+import threading
+import streamlit as st  # type: ignore
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.org_graph.org_graph import MermaidOrgParser, OrgGraph
+
+
+class OrgQueryEngine:
+    """Answers common reporting-line questions straight from the OrgGraph.
+
+    The graph is rebuilt only when the org corpus signature changes.
+    Questions that do not match a known pattern (or name an unknown
+    person) return None and go to the LLM with `relevant_subgraph`.
+    """
+    TRAILING = " ?？!！.。"
+    # "Lead" can point either way along a reporting line: X's team lead
+    # is X (who heads it), while "who leads X" asks for X's manager
+    TEAM_LEAD_PATTERNS = [
+        re.compile(r"(?:who (?:leads|heads|runs)|(?:lead|head) of) "
+                   r"(.+?)(?:'s)? team\b", re.I),
+        re.compile(r"(.+?)(?:'s)? team(?:'s)? (?:lead|head)\b", re.I),
+        re.compile(r"(.+?)(?:的)?團隊的?(?:主管|負責人)"),
+    ]
+    MANAGER_PATTERNS = [
+        re.compile(r"who (?:does|do) (.+?) (?:report|reports) to", re.I),
+        re.compile(r"who (?:manages|leads|supervises) (.+)", re.I),
+        re.compile(r"(?:manager|boss|supervisor|lead) of (.+)", re.I),
+        re.compile(r"(.+?)'s (?:manager|boss|supervisor|lead)\b", re.I),
+        re.compile(r"(.+?)的(?:主管|經理|老闆|上司)"),
+    ]
+    TEAM_PATTERNS = [
+        re.compile(r"who (?:is|are) (?:in|on) (.+?)(?:'s)? team", re.I),
+        re.compile(r"who (?:reports|report) (?:directly )?to (.+)", re.I),
+        re.compile(r"(?:who|whom) (?:does|do) (.+?) "
+                   r"(?:lead|manage|supervise)\b", re.I),
+        re.compile(r"(?:team|direct reports|reports|members) of (.+)", re.I),
+        re.compile(r"(.+?)'s (?:team|direct reports|reports)\b", re.I),
+        re.compile(r"(.+?)的(?:團隊|下屬|組員|成員)"),
+    ]
+    PATH_PATTERNS = [
+        re.compile(r"(?:path|chain|relationship|connection|link) "
+                   r"(?:between|from) (.+?) (?:and|to) (.+)", re.I),
+        re.compile(r"how (?:is|are) (.+?) (?:related|connected) to (.+)",
+                   re.I),
+    ]
+    PREFIX = re.compile(r"^(?:list|show(?: me)?|who is|who's|what is|"
+                        r"tell me|give me|the)\s+", re.I)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature = None
+        self.graph = OrgGraph()
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "OrgQueryEngine":
+        """Process-wide engine shared by every Streamlit session."""
+        return OrgQueryEngine()
+
+    def ensure_graph(self, docs: Dict[str, str],
+                     signature: Optional[str] = None,
+                     blocks: Optional[Iterable[Tuple[str, str]]] = None
+                     ) -> OrgGraph:
+        """Rebuild the graph when the org corpus changed; `blocks` are
+        pre-extracted (source, code) pairs used instead of scanning docs."""
+        with self._lock:
+            if signature is None or signature != self._signature:
+                self.graph = (MermaidOrgParser.build(docs) if blocks is None
+                              else MermaidOrgParser.build_from_blocks(blocks))
+                self._signature = signature
+            return self.graph
+
+    def _resolve(self, text: str) -> Optional[str]:
+        text = OrgQueryEngine.PREFIX.sub("", text.strip(self.TRAILING))
+        return self.graph.find(text.strip(self.TRAILING))
+
+    def _names(self, keys: List[str]) -> str:
+        return ", ".join(self.graph.nodes[k].label for k in keys)
+
+    def answer(self, question: str) -> Optional[str]:
+        """A direct answer, or None when the LLM should handle it."""
+        question = question.strip()
+        for pattern in OrgQueryEngine.PATH_PATTERNS:
+            match = pattern.search(question)
+            if match:
+                start, goal = (self._resolve(match.group(1)),
+                               self._resolve(match.group(2)))
+                if start is None or goal is None:
+                    return None
+                chain = self.graph.path(start, goal)
+                if chain is None:
+                    return (f"{self.graph.nodes[start].name} and "
+                            f"{self.graph.nodes[goal].name} are not "
+                            "connected in the org charts.")
+                return " → ".join(self.graph.nodes[k].name for k in chain)
+        for pattern in OrgQueryEngine.TEAM_LEAD_PATTERNS:
+            match = pattern.search(question)
+            if match:
+                key = self._resolve(match.group(1))
+                if key is None:
+                    return None
+                name = self.graph.nodes[key].name
+                reports = self.graph.reports_of(key)
+                if not reports:
+                    return f"Nobody reports to {name} in the org charts."
+                return (f"{name} leads the team: "
+                        f"{self._names(reports)}.")
+        for pattern in OrgQueryEngine.MANAGER_PATTERNS:
+            match = pattern.search(question)
+            if match:
+                key = self._resolve(match.group(1))
+                if key is None:
+                    return None
+                name = self.graph.nodes[key].name
+                managers = self.graph.managers_of(key)
+                if not managers:
+                    return f"{name} has no manager in the org charts."
+                return f"{name} reports to {self._names(managers)}."
+        for pattern in OrgQueryEngine.TEAM_PATTERNS:
+            match = pattern.search(question)
+            if match:
+                key = self._resolve(match.group(1))
+                if key is None:
+                    return None
+                name = self.graph.nodes[key].name
+                reports = self.graph.reports_of(key)
+                if not reports:
+                    return f"Nobody reports to {name} in the org charts."
+                return (f"{name}'s direct reports: "
+                        f"{self._names(reports)}.")
+        return None
+
+    def relevant_subgraph(self, question: str, radius: int = 2) -> str:
+        """Mermaid text of the people named in `question` and their
+        surroundings; the whole graph when nobody is named."""
+        mentioned = self.graph.mentioned(question)
+        if not mentioned:
+            return self.graph.to_mermaid()
+        return self.graph.to_mermaid(
+            self.graph.neighborhood(mentioned, radius)
+        )
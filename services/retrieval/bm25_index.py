@@ -0,0 +1,61 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from services.retrieval.markdown_chunker import Chunk
+from utils.text_tokenizer import TextTokenizer
+
+
+class BM25Index:
+    """In-process Okapi BM25 inverted index over note chunks."""
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[Chunk] = []
+        self.doc_lengths: List[int] = []
+        # term -> [(chunk position, term frequency)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.avg_length = 0.0
+
+    def add(self, chunk: Chunk) -> None:
+        position = len(self.chunks)
+        counts = Counter(TextTokenizer.tokenize(chunk.text))
+        self.chunks.append(chunk)
+        self.doc_lengths.append(sum(counts.values()))
+        for term, freq in counts.items():
+            self.postings[term].append((position, freq))
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths)
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Chunk], **kwargs) -> "BM25Index":
+        index = cls(**kwargs)
+        for chunk in chunks:
+            index.add(chunk)
+        return index
+
+    def idf(self, term: str) -> float:
+        n = len(self.chunks)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[Chunk, float]]:
+        """Return up to top_k (chunk, score) pairs with a positive score."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(TextTokenizer.tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for position, freq in postings:
+                norm = self.k1 * (
+                    1 - self.b
+                    + self.b * self.doc_lengths[position] / self.avg_length
+                )
+                scores[position] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+        ranked = heapq.nlargest(top_k, scores.items(), key=lambda x: x[1])
+        return [(self.chunks[pos], score) for pos, score in ranked]
+
+    def __len__(self) -> int:
+        return len(self.chunks)
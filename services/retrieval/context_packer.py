@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import List, Sequence, Set
+
+from utils.text_tokenizer import TextTokenizer
+
+logger = logging.getLogger(__name__)
+
+
+class TokenEstimator:
+    """Cheap token estimate: one per CJK character, ~4 chars per token else."""
+    @staticmethod
+    def estimate(text: str) -> int:
+        cjk = len(TextTokenizer.CJK_PATTERN.findall(text))
+        return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@dataclass
+class ContextItem:
+    """A candidate piece of context (note chunk or Mermaid block)."""
+    key: str
+    text: str
+    score: float = 0.0
+    kind: str = "chunk"
+
+
+@dataclass
+class PackResult:
+    items: List[ContextItem]
+    used_tokens: int
+    budget: int
+    duplicates: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"packed {len(self.items)} items, {self.used_tokens}/"
+                f"{self.budget} tokens; duplicates={self.duplicates} "
+                f"dropped={self.dropped} truncated={self.truncated}")
+
+
+class ContextPacker:
+    """Greedily packs the highest-scoring unique items into a token budget."""
+    def __init__(self, budget_tokens: int,
+                 duplicate_threshold: float = 0.9):
+        self.budget_tokens = budget_tokens
+        self.duplicate_threshold = duplicate_threshold
+
+    @staticmethod
+    def relevance(query: str, text: str) -> float:
+        """Fraction of distinct query tokens that occur in `text`."""
+        query_tokens = set(TextTokenizer.tokenize(query))
+        if not query_tokens:
+            return 0.0
+        return len(query_tokens & set(TextTokenizer.tokenize(text))) / len(
+            query_tokens)
+
+    @staticmethod
+    def _shingles(text: str) -> Set[str]:
+        tokens = TextTokenizer.tokenize(text)
+        if len(tokens) < 3:
+            return set(tokens)
+        return {" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+
+    def _is_duplicate(self, shingles: Set[str],
+                      accepted: List[Set[str]]) -> bool:
+        for other in accepted:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= \
+                    self.duplicate_threshold:
+                return True
+        return False
+
+    def pack(self, candidates: Sequence[ContextItem],
+             reserved_tokens: int = 0) -> PackResult:
+        """Pack candidates; `reserved_tokens` covers the prompt template."""
+        budget = max(self.budget_tokens - reserved_tokens, 0)
+        result = PackResult(items=[], used_tokens=0, budget=budget)
+        seen_hashes: Set[str] = set()
+        accepted_shingles: List[Set[str]] = []
+
+        # Stable sort keeps retrieval order among equally scored items
+        for item in sorted(candidates, key=lambda c: c.score, reverse=True):
+            normalized = " ".join(TextTokenizer.tokenize(item.text))
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+            shingles = self._shingles(item.text)
+            if digest in seen_hashes or self._is_duplicate(
+                    shingles, accepted_shingles):
+                result.duplicates.append(item.key)
+                continue
+
+            cost = TokenEstimator.estimate(item.text)
+            if result.used_tokens + cost > budget:
+                if result.items:
+                    result.dropped.append(item.key)
+                    continue
+                # Nothing fits yet: keep the best item, cut to the budget
+                item = ContextItem(item.key, self._truncate(item.text, budget),
+                                   item.score, item.kind)
+                if not item.text:
+                    result.dropped.append(item.key)
+                    continue
+                cost = TokenEstimator.estimate(item.text)
+                result.truncated.append(item.key)
+
+            seen_hashes.add(digest)
+            accepted_shingles.append(shingles)
+            result.items.append(item)
+            result.used_tokens += cost
+
+        if result.duplicates or result.dropped or result.truncated:
+            logger.info("Context packer: %s", result.summary())
+        return result
+
+    @staticmethod
+    def _truncate(text: str, budget: int) -> str:
+        if budget <= 0:
+            return ""
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if TokenEstimator.estimate(text[:mid]) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
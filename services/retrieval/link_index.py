@@ -0,0 +1,289 @@
+import hashlib
+import os
+import re
+import threading
+import streamlit as st  # type: ignore
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from services.retrieval.markdown_chunker import MarkdownChunker
+from utils.prompt_normalizer import PromptNormalizer
+from utils.sqlite_pool import SQLitePool
+from utils.text_tokenizer import TextTokenizer
+
+
+@dataclass
+class LinkEntry:
+    """A URL or intranet alias (`STIM/`) found under a note heading."""
+    source: str
+    heading_path: str
+    target: str
+    kind: str
+    context: str
+
+    @property
+    def markdown(self) -> str:
+        if self.kind == "url":
+            return f"[{self.target}]({self.target})"
+        # Aliases are typed into the browser as-is, e.g. http://STIM/
+        return f"[`{self.target}`](http://{self.target})"
+
+
+class LinkExtractor:
+    """Pulls every URL and alias out of a note, with its heading path."""
+    TITLE_PATTERN = re.compile(r"^# +(.+?)\s*$", re.MULTILINE)
+    URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]\"'`]+")
+    # `peoplenow/`, `OMTLE/` ... but not `KPI/FY25` or `and/or`
+    ALIAS_PATTERN = re.compile(r"(?<![\w/.:<>-])([A-Za-z][\w-]{1,30}/)"
+                               r"(?![\w/])")
+    TRAILING = ".,;:!?*_"
+    CONTEXT_CHARS = 300
+
+    @staticmethod
+    def section_heading(heading_path: str, markdown_text: str) -> str:
+        """`heading_path` without the note's own `# Title`, which every
+        entry of the note shares and so says nothing about the link."""
+        title = LinkExtractor.TITLE_PATTERN.search(markdown_text)
+        if title is None:
+            return heading_path
+        parts = heading_path.split(" > ")
+        if parts[0] == title.group(1).strip():
+            parts = parts[1:]
+        return " > ".join(parts)
+
+    @staticmethod
+    def extract(source: str, markdown_text: str) -> List[LinkEntry]:
+        entries: List[LinkEntry] = []
+        seen = set()
+        chunker = MarkdownChunker(max_chars=10_000)
+        for chunk in chunker.chunk_document(source, markdown_text):
+            body = chunk.body
+            urls = [m.group().rstrip(LinkExtractor.TRAILING)
+                    for m in LinkExtractor.URL_PATTERN.finditer(body)]
+            without_urls = LinkExtractor.URL_PATTERN.sub(" ", body)
+            aliases = LinkExtractor.ALIAS_PATTERN.findall(without_urls)
+            context = " ".join(
+                LinkExtractor.ALIAS_PATTERN.sub(" ", without_urls).split()
+            )[:LinkExtractor.CONTEXT_CHARS]
+            for kind, targets in (("url", urls), ("alias", aliases)):
+                for target in targets:
+                    key = (chunk.title, target)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    entries.append(LinkEntry(source, chunk.title, target,
+                                             kind, context))
+        return entries
+
+
+class LinkIndex:
+    """SQLite + FTS5 index of every link in the notes.
+
+    Text is pre-tokenized with TextTokenizer (CJK bigrams, stemming) so
+    FTS matching agrees with BM25 retrieval; the note's own `# Title` is
+    left out of the indexed heading, since it would match every entry of
+    the note. `lookup` answers "where is X" questions directly; it
+    returns nothing when too few of the question's content words match,
+    leaving the question to the LLM.
+    """
+    DB_PATH = "data/link_index.db"
+    # Words that only say "I want a link"
+    INTENT_WORDS = {"link", "links", "url", "urls", "alias", "aliases",
+                    "where", "find", "related", "useful", "site", "page",
+                    "portal", "portals", "連結", "網址", "在哪",
+                    "all", "any", "list", "have", "my", "there", "哪些"}
+    # Words that mark a question as a link lookup
+    LINK_QUESTION_WORDS = {"link", "links", "url", "urls", "alias",
+                           "aliases", "where", "portal", "portals",
+                           "website", "連結", "網址", "在哪", "哪裡"}
+    ALIAS_WORDS = {"alias", "aliases", "別名"}
+    MIN_COVERAGE = 0.5
+    # Bumped whenever indexing changes, so existing notes are re-indexed
+    FORMAT = 3
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._signature: Optional[str] = None
+        self._ignored = {
+            token for word in PromptNormalizer.STOPWORDS
+            | LinkIndex.INTENT_WORDS
+            for token in TextTokenizer.tokenize(word)
+        }
+        self._alias_tokens = {
+            token for word in LinkIndex.ALIAS_WORDS
+            for token in TextTokenizer.tokenize(word)
+        }
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self.pool().transaction(write=True) as cursor:
+            LinkIndex._create_schema(cursor)
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "LinkIndex":
+        return LinkIndex()
+
+    def pool(self) -> SQLitePool:
+        return SQLitePool.for_path(self.db_path)
+
+    @staticmethod
+    def _create_schema(cursor) -> None:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS links (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                heading_path TEXT,
+                target TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                context TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_links_source ON links (source)
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS link_sources (
+                source TEXT PRIMARY KEY,
+                digest TEXT NOT NULL
+            )
+        """)
+        # rowid = links.id; columns hold TextTokenizer output
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS links_fts
+            USING fts5(heading, target, context)
+        """)
+
+    @staticmethod
+    def is_link_question(query: str) -> bool:
+        tokens = set(TextTokenizer.tokenize(query))
+        return any(set(TextTokenizer.tokenize(word)) <= tokens
+                   for word in LinkIndex.LINK_QUESTION_WORDS)
+
+    @staticmethod
+    def _tokens(text: str) -> str:
+        return " ".join(TextTokenizer.tokenize(text))
+
+    @staticmethod
+    def _delete_source(cursor, source: str) -> None:
+        cursor.execute("""
+            DELETE FROM links_fts WHERE rowid IN
+                (SELECT id FROM links WHERE source = ?)
+        """, (source,))
+        cursor.execute("DELETE FROM links WHERE source = ?", (source,))
+        cursor.execute("DELETE FROM link_sources WHERE source = ?",
+                       (source,))
+
+    def update_document(self, source: str, content: str) -> bool:
+        """Index one note; a no-op (False) when its content is unchanged."""
+        digest = hashlib.sha1(
+            f"{LinkIndex.FORMAT}:{content}".encode("utf-8")
+        ).hexdigest()
+        with self.pool().transaction(write=True) as cursor:
+            row = cursor.execute(
+                "SELECT digest FROM link_sources WHERE source = ?", (source,)
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                return False
+            LinkIndex._delete_source(cursor, source)
+            for entry in LinkExtractor.extract(source, content):
+                cursor.execute("""
+                    INSERT INTO links (source, heading_path, target, kind,
+                                       context)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (entry.source, entry.heading_path, entry.target,
+                      entry.kind, entry.context))
+                cursor.execute("""
+                    INSERT INTO links_fts (rowid, heading, target, context)
+                    VALUES (?, ?, ?, ?)
+                """, (cursor.lastrowid, LinkIndex._tokens(
+                    LinkExtractor.section_heading(entry.heading_path, content)
+                ),
+                      LinkIndex._tokens(entry.target),
+                      LinkIndex._tokens(entry.context)))
+            cursor.execute(
+                "INSERT INTO link_sources (source, digest) VALUES (?, ?)",
+                (source, digest)
+            )
+        return True
+
+    def remove_document(self, source: str) -> None:
+        with self.pool().transaction(write=True) as cursor:
+            LinkIndex._delete_source(cursor, source)
+
+    def sync(self, docs: Dict[str, str],
+             signature: Optional[str] = None) -> None:
+        """Match the index to `docs`; skipped while `signature` is unchanged
+        (pass the corpus fingerprint)."""
+        with self._lock:
+            if signature is not None and signature == self._signature:
+                return
+            for source, content in docs.items():
+                self.update_document(source, content)
+            with self.pool().transaction(write=True) as cursor:
+                indexed = [row[0] for row in
+                           cursor.execute("SELECT source FROM link_sources")]
+                for source in set(indexed) - set(docs):
+                    LinkIndex._delete_source(cursor, source)
+            self._signature = signature
+
+    def search(self, query: str, limit: int = 8
+               ) -> List[Tuple[LinkEntry, float]]:
+        """Entries ranked by (share of query words matched, FTS bm25)."""
+        terms = [t for t in dict.fromkeys(TextTokenizer.tokenize(query))
+                 if t not in self._ignored]
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self.pool().transaction() as cursor:
+            rows = cursor.execute("""
+                SELECT l.source, l.heading_path, l.target, l.kind, l.context,
+                       f.heading, f.target, f.context,
+                       bm25(links_fts, 3.0, 2.0, 1.0)
+                FROM links_fts AS f JOIN links AS l ON l.id = f.rowid
+                WHERE links_fts MATCH ?
+                ORDER BY bm25(links_fts, 3.0, 2.0, 1.0)
+                LIMIT ?
+            """, (match, limit * 5)).fetchall()
+        ranked = []
+        for row in rows:
+            indexed = set(" ".join(row[5:8]).split())
+            coverage = sum(term in indexed for term in terms) / len(terms)
+            ranked.append((LinkEntry(*row[:5]), coverage, -row[8]))
+        ranked.sort(key=lambda r: (r[1], r[2]), reverse=True)
+        return [(entry, coverage) for entry, coverage, _ in ranked[:limit]]
+
+    def aliases(self, limit: int = 20) -> List[LinkEntry]:
+        with self.pool().transaction() as cursor:
+            rows = cursor.execute("""
+                SELECT source, heading_path, target, kind, context
+                FROM links WHERE kind = 'alias' ORDER BY source, id LIMIT ?
+            """, (limit,)).fetchall()
+        return [LinkEntry(*row) for row in rows]
+
+    def lookup(self, query: str, limit: int = 8) -> List[LinkEntry]:
+        """Best matches, or [] when nothing covers enough of the query.
+        Questions about aliases only get aliases; all of them when the
+        question names nothing else ("useful aliases?")."""
+        results = [(entry, coverage)
+                   for entry, coverage in self.search(query, limit * 2)
+                   if coverage >= LinkIndex.MIN_COVERAGE]
+        tokens = TextTokenizer.tokenize(query)
+        if self._alias_tokens & set(tokens):
+            if not any(token not in self._ignored for token in tokens):
+                return self.aliases(limit)
+            return [entry for entry, _ in results
+                    if entry.kind == "alias"][:limit]
+        if not results:
+            return []
+        best = results[0][1]
+        return [entry for entry, coverage in results[:limit]
+                if coverage == best]
+
+    @staticmethod
+    def format_answer(entries: List[LinkEntry]) -> str:
+        lines = ["Here is what I found in your notes:", ""]
+        for entry in entries:
+            where = entry.heading_path or entry.source
+            lines.append(f"- **{where}**: {entry.markdown} "
+                         f"_({entry.source})_")
+        return "\n".join(lines)
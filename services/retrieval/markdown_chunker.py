@@ -0,0 +1,93 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class Chunk:
+    """A heading-scoped section of a markdown note."""
+    chunk_id: str
+    source: str
+    heading_path: List[str] = field(default_factory=list)
+    body: str = ""
+
+    @property
+    def title(self) -> str:
+        return " > ".join(self.heading_path)
+
+    @property
+    def text(self) -> str:
+        """Heading path plus body, as indexed and sent to the agent."""
+        return f"{self.title}\n{self.body}" if self.title else self.body
+
+
+class MarkdownChunker:
+    """Splits markdown notes into chunks on `#`, `##` and `###` headings."""
+    HEADING_PATTERN = re.compile(r"^(#{1,3})\s+(.+?)\s*#*\s*$")
+    FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+    # Horizontal rules carry no content once sections are split
+    RULE_PATTERN = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+
+    def __init__(self, max_chars: int = 1500):
+        self.max_chars = max_chars
+
+    def chunk_document(self, source: str, markdown_text: str) -> List[Chunk]:
+        chunks: List[Chunk] = []
+        path: List[str] = []
+        body: List[str] = []
+        in_fence = False
+
+        def flush():
+            text = "\n".join(body).strip()
+            if text:
+                for part in self._split_long(text):
+                    chunks.append(Chunk(
+                        chunk_id=f"{source}#{len(chunks)}",
+                        source=source,
+                        heading_path=list(path),
+                        body=part
+                    ))
+            body.clear()
+
+        for line in markdown_text.splitlines():
+            if self.FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            heading = None if in_fence else self.HEADING_PATTERN.match(line)
+            if heading:
+                flush()
+                level = len(heading.group(1))
+                del path[level - 1:]
+                # Pad skipped levels so depth always matches the marker
+                path.extend([""] * (level - 1 - len(path)))
+                path.append(heading.group(2).strip())
+                continue
+            if not in_fence and self.RULE_PATTERN.match(line):
+                continue
+            body.append(line)
+        flush()
+
+        for chunk in chunks:
+            chunk.heading_path = [h for h in chunk.heading_path if h]
+        return chunks
+
+    def chunk_documents(self, docs: Dict[str, str]) -> List[Chunk]:
+        chunks = []
+        for fname, content in docs.items():
+            chunks.extend(self.chunk_document(fname, content))
+        return chunks
+
+    def _split_long(self, text: str) -> List[str]:
+        """Pack paragraphs of an oversized section into max_chars pieces."""
+        if len(text) <= self.max_chars:
+            return [text]
+        parts, current = [], ""
+        for paragraph in re.split(r"\n\s*\n", text):
+            candidate = f"{current}\n\n{paragraph}" if current else paragraph
+            if current and len(candidate) > self.max_chars:
+                parts.append(current)
+                current = paragraph
+            else:
+                current = candidate
+        if current:
+            parts.append(current)
+        return parts
@@ -0,0 +1,88 @@
+import hashlib
+import threading
+import streamlit as st  # type: ignore
+from typing import Dict, List, Optional, Tuple
+
+from services.retrieval.bm25_index import BM25Index
+from services.retrieval.context_packer import ContextItem
+from services.retrieval.markdown_chunker import Chunk, MarkdownChunker
+from services.retrieval.vector_store import VectorStore
+
+
+class NoteRetriever:
+    """Selects the personal-note chunks relevant to a question.
+
+    Keyword (BM25) and dense (VectorStore) rankings are merged with
+    reciprocal rank fusion.
+    """
+    INDEX_DIR = "data/vector_index"
+    RRF_K = 60
+
+    def __init__(self, chunker: Optional[MarkdownChunker] = None,
+                 vector_store: Optional[VectorStore] = None):
+        self.chunker = chunker or MarkdownChunker()
+        self.vector_store = vector_store or VectorStore(NoteRetriever.INDEX_DIR)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._index = BM25Index()
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "NoteRetriever":
+        """Process-wide retriever shared by every Streamlit session."""
+        return NoteRetriever()
+
+    @staticmethod
+    def corpus_signature(docs: Dict[str, str]) -> str:
+        digest = hashlib.sha1()
+        for fname in sorted(docs):
+            digest.update(fname.encode("utf-8") + b"\0")
+            digest.update(docs[fname].encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    def _ensure_index(self, docs: Dict[str, str],
+                      signature: Optional[str] = None) -> BM25Index:
+        """Rebuild the indexes only when the note set has changed."""
+        signature = signature or NoteRetriever.corpus_signature(docs)
+        with self._lock:
+            if signature != self._signature:
+                chunks = self.chunker.chunk_documents(docs)
+                self._index = BM25Index.from_chunks(chunks)
+                self.vector_store.sync(chunks, signature)
+                self._signature = signature
+            return self._index
+
+    def retrieve(
+        self, docs: Dict[str, str], query: str, top_k: int = 5,
+        signature: Optional[str] = None
+    ) -> List[Tuple[Chunk, float]]:
+        """Top-k fused chunks; pass the corpus fingerprint as `signature`
+        to skip hashing every note on each call."""
+        keyword_hits = self._ensure_index(docs, signature).search(
+            query, top_k=top_k * 2
+        )
+        dense_hits = self.vector_store.search(
+            [query], top_k=top_k * 2, min_score=0.1
+        )[0]
+
+        fused: Dict[str, float] = {}
+        chunks: Dict[str, Chunk] = {}
+        for hits in (keyword_hits, dense_hits):
+            for rank, (chunk, _) in enumerate(hits):
+                chunks.setdefault(chunk.chunk_id, chunk)
+                fused[chunk.chunk_id] = (fused.get(chunk.chunk_id, 0.0)
+                                         + 1.0 / (self.RRF_K + rank + 1))
+        ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)
+        return [(chunks[cid], score) for cid, score in ranked[:top_k]]
+
+    @staticmethod
+    def as_context_items(
+        results: List[Tuple[Chunk, float]]
+    ) -> List[ContextItem]:
+        """Wrap retrieved chunks as markdown sections for the packer."""
+        return [
+            ContextItem(key=chunk.chunk_id,
+                        text=f"# {chunk.source}\n{chunk.text}",
+                        score=score)
+            for chunk, score in results
+        ]
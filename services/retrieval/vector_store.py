@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np  # type: ignore
+
+from services.retrieval.markdown_chunker import Chunk
+from utils.text_tokenizer import TextTokenizer
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of words and char n-grams.
+
+    Any object with `name`, `dim` and `embed(texts) -> (n, dim) float32`
+    can be passed to VectorStore instead.
+    """
+    def __init__(self, dim: int = 512, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+        # Bump the suffix when tokenization changes, so stored vectors
+        # built from the old features are not reused
+        self.name = f"hashing-{dim}-{ngram}-v2"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for token in TextTokenizer.tokenize(text):
+            features.append(token)
+            padded = f"<{token}>"
+            if len(padded) > self.ngram:
+                features.extend(
+                    padded[i:i + self.ngram]
+                    for i in range(len(padded) - self.ngram + 1)
+                )
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash()
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                matrix[row, h % self.dim] += sign
+        # Sublinear term frequency, then L2 normalise for cosine
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class VectorStore:
+    """Persistent dense index: a memory-mapped `.npy` matrix plus metadata.
+
+    `manifest.json` names the current vectors/metadata pair, so a rebuild
+    writes new files and swaps the manifest atomically; processes that
+    still map the old matrix keep reading it until they reload. Several
+    processes may build at once, so a build only deletes the files of
+    the manifest it replaced; anything else unreferenced is left for
+    ORPHAN_SECONDS, long after any build that could still publish it.
+    """
+    ORPHAN_SECONDS = 3600.0
+
+    def __init__(self, index_dir: str, embedder=None,
+                 block_rows: int = 65536):
+        self.index_dir = index_dir
+        self.embedder = embedder or HashingEmbedder()
+        self.block_rows = block_rows
+        self._lock = threading.Lock()
+        self._manifest: Optional[dict] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._metadata: List[dict] = []
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.index_dir, "manifest.json")
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _write_atomic(path: str, write) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def load(self) -> bool:
+        """Map the current on-disk index; False if none is usable."""
+        manifest = self._read_manifest()
+        if not manifest or manifest.get("embedder") != self.embedder.name:
+            return False
+        if manifest == self._manifest:
+            return True
+        try:
+            with open(os.path.join(self.index_dir, manifest["metadata"]),
+                      "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            vectors = np.load(os.path.join(self.index_dir,
+                                           manifest["vectors"]),
+                              mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return False
+        self._manifest, self._vectors, self._metadata = (
+            manifest, vectors, metadata
+        )
+        return True
+
+    def sync(self, chunks: List[Chunk], signature: str) -> None:
+        """Ensure the index matches `signature`, embedding only new chunks."""
+        with self._lock:
+            if self.load() and self._manifest.get("signature") == signature:
+                return
+            self._build(chunks, signature)
+
+    def _build(self, chunks: List[Chunk], signature: str) -> None:
+        # Reuse vectors from the previous index for unchanged chunk text
+        previous: Dict[str, int] = {}
+        if self._vectors is not None:
+            previous = {meta["text_hash"]: row
+                        for row, meta in enumerate(self._metadata)}
+
+        metadata, missing = [], []
+        vectors = np.zeros((len(chunks), self.embedder.dim),
+                           dtype=np.float32)
+        for row, chunk in enumerate(chunks):
+            digest = self.text_hash(chunk.text)
+            metadata.append({
+                "chunk_id": chunk.chunk_id,
+                "source": chunk.source,
+                "heading_path": chunk.heading_path,
+                "body": chunk.body,
+                "text_hash": digest,
+            })
+            if digest in previous:
+                vectors[row] = self._vectors[previous[digest]]
+            else:
+                missing.append(row)
+        if missing:
+            vectors[missing] = self.embedder.embed(
+                [chunks[row].text for row in missing]
+            )
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        stem = f"{signature[:16]}-{os.getpid()}"
+        manifest = {
+            "signature": signature,
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "rows": len(chunks),
+            "vectors": f"vectors-{stem}.npy",
+            "metadata": f"metadata-{stem}.json",
+        }
+        self._write_atomic(
+            os.path.join(self.index_dir, manifest["vectors"]),
+            lambda f: np.save(f, vectors)
+        )
+        self._write_atomic(
+            os.path.join(self.index_dir, manifest["metadata"]),
+            lambda f: f.write(json.dumps(metadata,
+                                         ensure_ascii=False).encode("utf-8"))
+        )
+        replaced = self._read_manifest()
+        self._write_atomic(
+            self.manifest_path,
+            lambda f: f.write(json.dumps(manifest).encode("utf-8"))
+        )
+        self._remove_stale_files(manifest, replaced)
+        self.load()
+
+    def _remove_stale_files(self, manifest: dict,
+                            replaced: Optional[dict]) -> None:
+        # Another process may have published since our own swap
+        current = self._read_manifest() or manifest
+        keep = {"manifest.json", manifest["vectors"], manifest["metadata"],
+                current.get("vectors"), current.get("metadata")}
+        stale = ({replaced.get("vectors"), replaced.get("metadata")}
+                 if replaced else set())
+        cutoff = time.time() - self.ORPHAN_SECONDS
+        for fname in os.listdir(self.index_dir):
+            if fname in keep:
+                continue
+            path = os.path.join(self.index_dir, fname)
+            try:
+                if fname in stale or os.path.getmtime(path) < cutoff:
+                    # Open memory maps elsewhere survive the unlink on POSIX
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def search(
+        self, queries: Sequence[str], top_k: int = 5, min_score: float = 0.0
+    ) -> List[List[Tuple[Chunk, float]]]:
+        """Batched cosine top-k; one result list per query."""
+        if self._vectors is None or not len(self._metadata):
+            return [[] for _ in queries]
+        q = self.embedder.embed(queries)
+        k = min(top_k, len(self._metadata))
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), k), dtype=np.int64)
+
+        # Scan the mapped matrix in blocks to bound resident memory
+        for start in range(0, len(self._metadata), self.block_rows):
+            block = np.asarray(self._vectors[start:start + self.block_rows])
+            scores = q @ block.T
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_rows = np.concatenate([
+                best_rows,
+                np.broadcast_to(np.arange(start, start + len(block)),
+                                scores.shape)
+            ], axis=1)
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, top, axis=1)
+            best_rows = np.take_along_axis(merged_rows, top, axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([
+                (self._to_chunk(self._metadata[rows[i]]), float(scores[i]))
+                for i in order if scores[i] > min_score
+            ])
+        return results
+
+    @staticmethod
+    def _to_chunk(meta: dict) -> Chunk:
+        return Chunk(chunk_id=meta["chunk_id"], source=meta["source"],
+                     heading_path=meta["heading_path"], body=meta["body"])
+
+    def __len__(self) -> int:
+        return len(self._metadata)
@@ -1,12 +1,29 @@
 import streamlit as st  # type: ignore
 import re
-import os
 import time
-from autogen import ConversableAgent, UserProxyAgent  # type: ignore
+from contextlib import contextmanager
+from autogen import ConversableAgent  # type: ignore
 from autogen.code_utils import content_str  # type: ignore
-from typing import Dict, List  # type: ignore
+from typing import List  # type: ignore
+from streamlit.runtime.scriptrunner import get_script_run_ctx  # type: ignore
 from utils.ui_helper import UIHelper
+from services.chat.agent_pool import AgentPool
+from services.chat.job_executor import JobExecutor, JobQueueFull
+from services.chat.query_router import QueryRouter
+from services.chat.response_pipeline import ResponsePipeline
+from services.chat.usage_tracker import UsageRecord, UsageTracker
+from services.document_processor.document_cache import CorpusCache
+from services.document_processor.mermaid_index import MermaidIndex
+from services.org_graph.org_query import OrgQueryEngine
+from services.retrieval.context_packer import (ContextItem, ContextPacker,
+                                              TokenEstimator)
+from services.retrieval.link_index import LinkIndex
+from services.retrieval.note_retriever import NoteRetriever
 from utils.llm_setup import LLMSetup
+from utils.llm_streaming import LLMStreamer
+from utils.tracing import Tracer
+from utils.prompt_normalizer import PromptNormalizer
+from utils.single_flight import SingleFlight, SingleFlightTimeout
 from utils.sqlite_helper import SQLiteHelper
 
 
@@ -17,9 +34,23 @@ class Config:
     USER_NAME = "👧 BP Mia"
     PLACEHOLDER = "Please input your command"
     SEED = 42
-    ORG_KEYWORDS = ["org", "organization", "structure",
-                    "team", "manager", "lead", "report",
-                    "department", "chart"]
+    # Stream answers token by token into the chat instead of waiting
+    STREAMING = True
+    # Seconds a session waits for an identical in-flight request
+    SINGLE_FLIGHT_TIMEOUT = 60
+    # "single_call" (one LLM call) or "reflection" (extra summary call)
+    RESPONSE_MODE = "single_call"
+    # Answer on a background worker pool; the page polls for results
+    BACKGROUND_JOBS = True
+    JOB_WORKERS = 4
+    JOBS_PER_SESSION = 2
+    JOB_POLL_SECONDS = 0.5
+    RETRIEVAL_TOP_K = 8
+    # Prompt-context token budget per agent, clamped to the model limit
+    CONTEXT_TOKEN_BUDGETS = {
+        "GraphRAG_Agent": 8000,
+        "TextRAG_Agent": 4000,
+    }
     TERMINATION_PHRASES = [
         "I'm unable to provide",
         "I am sorry",
@@ -34,20 +65,14 @@ class Config:
 class DocumentLoader:
     """Handles loading of markdown documents from specified directories."""
     @staticmethod
+    @Tracer.traced("load_documents")
     def load_documents():
-        base_dirs = {
-            "personal": "uploaded_docs/personal",
-            "org": "uploaded_docs/org"
-        }
-        docs = {"personal": {}, "org": {}}
-        for category, path in base_dirs.items():
-            if os.path.exists(path):
-                for fname in os.listdir(path):
-                    if fname.endswith(".md"):
-                        with open(os.path.join(path, fname), "r",
-                                  encoding="utf-8") as f:
-                            docs[category][fname] = f.read()
-        return docs
+        # Only files whose (size, mtime) changed since the last call are read
+        return CorpusCache.shared().load()
+
+    @staticmethod
+    def corpus_fingerprint(category=None) -> str:
+        return CorpusCache.shared().fingerprint(category)
 
 
 class MermaidExtractor:
@@ -60,37 +85,58 @@ class MermaidExtractor:
 
 class AgentFactory:
     """Creates and configures autogen agents."""
+    GRAPH_SYSTEM_MESSAGE = (
+        "You are a GraphRAG Agent specializing "
+        "in querying an organizational structure stored in a graph DB."
+        "Your role is to answer questions about employees,"
+        "such as their email, position, or reporting relationships."
+        "Use precise and accurate information retrieved from the graph DB"
+        "If the query is unclear or the information is unavailable,"
+        "politely explain and ask for clarification."
+    )
+    TEXT_SYSTEM_MESSAGE = (
+        "You are a TextRAG Agent designed to"
+        "answer questions based on personal markdown notes."
+        "Your role is to retrieve relevant information"
+        "from the notes and provide clear, concise answers."
+        "Focus on understanding the context of the notes"
+        "and delivering responses that align with the user's intent."
+        "If the notes lack relevant information,"
+        "inform the user and"
+        "suggest rephrasing or providing more details."
+    )
+
     @staticmethod
-    def create_graph_agent():
+    def create_graph_agent(api_key):
         return ConversableAgent(
             name="GraphRAG_Agent",
-            system_message="You are a GraphRAG Agent specializing "
-            "in querying an organizational structure stored in a graph DB."
-            "Your role is to answer questions about employees,"
-            "such as their email, position, or reporting relationships."
-            "Use precise and accurate information retrieved from the graph DB"
-            "If the query is unclear or the information is unavailable,"
-            "politely explain and ask for clarification.",
-            llm_config=LLMSetup.create_llm_config(Config.GEMINI2_API_KEY)
+            system_message=AgentFactory.GRAPH_SYSTEM_MESSAGE,
+            llm_config=LLMSetup.create_llm_config(api_key),
+            # Pooled agents answer on server threads; never block on input()
+            human_input_mode="NEVER"
         )
 
     @staticmethod
-    def create_text_agent():
+    def create_text_agent(api_key):
         return ConversableAgent(
             name="TextRAG_Agent",
-            system_message="You are a TextRAG Agent designed to"
-            "answer questions based on personal markdown notes."
-            "Your role is to retrieve relevant information"
-            "from the notes and provide clear, concise answers."
-            "Focus on understanding the context of the notes"
-            "and delivering responses that align with the user's intent."
-            "If the notes lack relevant information,"
-            "inform the user and"
-            "suggest rephrasing or providing more details.",
-            llm_config=LLMSetup.create_llm_config(Config.GEMINI1_API_KEY)
+            system_message=AgentFactory.TEXT_SYSTEM_MESSAGE,
+            llm_config=LLMSetup.create_llm_config(api_key),
+            # Pooled agents answer on server threads; never block on input()
+            human_input_mode="NEVER"
         )
 
     @staticmethod
+    def pool() -> AgentPool:
+        """Process-wide agents, load-balanced over both Gemini keys."""
+        pool = AgentPool.shared((Config.GEMINI1_API_KEY,
+                                 Config.GEMINI2_API_KEY))
+        pool.register("GraphRAG_Agent", AgentFactory.create_graph_agent)
+        pool.register("TextRAG_Agent", AgentFactory.create_text_agent)
+        return pool
+
+    @staticmethod
+    @st.cache_resource
     def create_user_proxy():
         return LLMSetup.create_user_proxy(
             is_termination_msg=lambda x: any(
@@ -102,27 +148,157 @@ class AgentFactory:
 
 class ChatManager:
     """Manages chat interactions and history."""
-    def __init__(self):
-        self.graph_agent = AgentFactory.create_graph_agent()
-        self.text_agent = AgentFactory.create_text_agent()
+    INTERRUPTED_NOTE = "\n\n_(The answer was interrupted.)_"
+
+    def __init__(self, backend=None):
+        # backend: an LLMBackend replacing Gemini (e.g. StubBackend offline)
+        self.backend = backend
+        self.pool = AgentFactory.pool()
         self.user_proxy = AgentFactory.create_user_proxy()
+        self.pipeline = ResponsePipeline(self.user_proxy,
+                                         mode=Config.RESPONSE_MODE,
+                                         termination_phrases=Config.TERMINATION_PHRASES,
+                                         backend=backend)
+        self.jobs = JobExecutor.shared(Config.JOB_WORKERS,
+                                       Config.JOBS_PER_SESSION)
+        self.usage = UsageTracker.shared()
         self.system_avatar = "👧"
         self.user_avatar = "🗣️"
 
-    def generate_response(self, prompt):
+    @staticmethod
+    def pack_context(agent_name, candidates, prompt):
+        """Fit the best non-duplicate candidates into the agent's budget."""
+        packer = ContextPacker(LLMSetup.context_budget(
+            Config.CONTEXT_TOKEN_BUDGETS[agent_name]
+        ))
+        # Reserve room for the instructions and the question itself
+        return packer.pack(candidates,
+                           reserved_tokens=TokenEstimator.estimate(prompt) + 100)
+
+    def cache_scope(self):
+        """(corpus version, config key) that cached answers are tied to."""
+        return (
+            DocumentLoader.corpus_fingerprint(),
+            LLMSetup.config_key(AgentFactory.GRAPH_SYSTEM_MESSAGE,
+                                AgentFactory.TEXT_SYSTEM_MESSAGE)
+        )
+
+    def cache_lookup(self, prompt, scope):
+        """Cached answer history for `prompt`, or None on a miss."""
+        start = time.perf_counter()
+        with Tracer.shared().span("cache_lookup") as span:
+            cached = SQLiteHelper.get_response(prompt, *scope)
+            span.attrs["hit"] = bool(cached)
+        if not cached:
+            return None
+        self.usage.record(UsageRecord(
+            route="cache", source="cache", cache_hit=True,
+            latency_ms=(time.perf_counter() - start) * 1000
+        ))
+        return [{"role": "assistant", "content": cached}]
+
+    def cache_store(self, prompt, scope, history):
+        """Cache a generated answer; refusals are shown but not kept."""
+        if history and not self.pipeline.is_refusal(history[0]["content"]):
+            SQLiteHelper.save_prompt_response(prompt, history[0]["content"],
+                                              *scope)
+
+    @staticmethod
+    @Tracer.traced("mermaid_blocks")
+    def org_blocks():
+        """Org-chart Mermaid blocks, extracted once at upload time."""
+        return MermaidIndex.shared().blocks_in(CorpusCache.BASE_DIRS["org"])
+
+    @staticmethod
+    @Tracer.traced("org_graph")
+    def org_engine(docs):
+        """Org-chart graph engine, rebuilt only when the org docs change."""
+        engine = OrgQueryEngine.shared()
+        engine.ensure_graph(
+            docs.get("org", {}), DocumentLoader.corpus_fingerprint("org"),
+            blocks=[(b.source, b.code) for b in ChatManager.org_blocks()]
+        )
+        return engine
+
+    @Tracer.traced("direct_answer")
+    def direct_answer(self, prompt):
+        """Answer reporting-line questions from the org graph and link
+        lookups from the link index, without the LLM."""
+        start = time.perf_counter()
         docs = DocumentLoader.load_documents()
-        prompt_lower = prompt.lower()
-        is_org_related = any(keyword in prompt_lower for
-                             keyword in Config.ORG_KEYWORDS)
-        if is_org_related:
-            mermaid_blocks = []
-            for content in docs.get("org", {}).values():
-                mermaid_blocks += MermaidExtractor.extract_mermaid_blocks(
-                    content
-                )
-            mermaid_diagrams = "\n\n".join(f"```mermaid\n{block}\n```"
-                                           for block in mermaid_blocks)
-            final_prompt = (
+        answer = ChatManager.org_engine(docs).answer(prompt)
+        source = "org_graph"
+        if answer is None and LinkIndex.is_link_question(prompt):
+            index = LinkIndex.shared()
+            index.sync(docs.get("personal", {}),
+                       DocumentLoader.corpus_fingerprint("personal"))
+            entries = index.lookup(prompt)
+            if entries:
+                answer = LinkIndex.format_answer(entries)
+                source = "link_index"
+        if answer:
+            self.usage.record(UsageRecord(
+                route="direct", source=source,
+                latency_ms=(time.perf_counter() - start) * 1000
+            ))
+        return answer
+
+    @staticmethod
+    @Tracer.traced("route")
+    def route(prompt, engine):
+        """Org-chart vs notes decision; naming someone in the org graph
+        tips borderline questions towards the org agent."""
+        def names_org_member(question):
+            return 0.5 if engine.graph.mentioned(question) else 0.0
+        return QueryRouter.shared().route(
+            prompt, scorers=[names_org_member],
+            generation=DocumentLoader.corpus_fingerprint("org")
+        )
+
+    def build_request(self, prompt):
+        """Pick the agent kind for `prompt` and assemble its final prompt."""
+        docs = DocumentLoader.load_documents()
+        engine = ChatManager.org_engine(docs)
+        kind = self.route(prompt, engine).route
+        candidates = ChatManager.retrieve_context(kind, prompt, docs, engine)
+        return kind, ChatManager.compose_prompt(kind, prompt, candidates)
+
+    @staticmethod
+    @Tracer.traced("retrieve")
+    def retrieve_context(kind, prompt, docs, engine):
+        """Context candidates for `kind`: org subgraph or note chunks."""
+        if kind == QueryRouter.ORG_ROUTE:
+            # Send only the part of the org graph the question touches;
+            # raw blocks remain the fallback for non-flowchart diagrams
+            return [
+                ContextItem(key="org-graph",
+                            text="```mermaid\n"
+                            f"{engine.relevant_subgraph(prompt)}\n```",
+                            score=1.0, kind="mermaid")
+            ] if len(engine.graph) else [
+                ContextItem(key=f"{block.source}#mermaid{block.index}",
+                            text=f"```mermaid\n{block.code}\n```",
+                            score=ContextPacker.relevance(prompt,
+                                                          block.code),
+                            kind="mermaid")
+                for block in ChatManager.org_blocks()
+            ]
+        results = NoteRetriever.shared().retrieve(
+            docs.get("personal", {}), prompt,
+            top_k=Config.RETRIEVAL_TOP_K,
+            signature=DocumentLoader.corpus_fingerprint("personal")
+        )
+        return NoteRetriever.as_context_items(results)
+
+    @staticmethod
+    @Tracer.traced("build_prompt")
+    def compose_prompt(kind, prompt, candidates):
+        """Pack `candidates` into the agent's budget around the question."""
+        packed = ChatManager.pack_context(kind, candidates, prompt)
+        if kind == QueryRouter.ORG_ROUTE:
+            mermaid_diagrams = "\n\n".join(item.text
+                                           for item in packed.items)
+            return (
                 "Based on the following organization charts,"
                 "answer the user's question."
                 "Only use this information to determine reporting lines,"
@@ -131,45 +307,283 @@ class ChatManager:
                 "raw reference material in your response:\n\n"
                 f"{mermaid_diagrams}\n\nUser's question: {prompt}"
             )
+        personal_content = ("\n\n".join(item.text
+                                         for item in packed.items)
+                            or "(No matching notes found.)")
+        return (
+            "Use the following personal notes to"
+            "answer the user's question."
+            "Do not include any raw personal notes"
+            "or reference material in your response:\n\n"
+            f"{personal_content}\n\nUser's question: {prompt}"
+        )
 
-            # Run the chat with history
-            response = self.user_proxy.initiate_chat(
-                self.graph_agent,
-                message=final_prompt,
-                summary_method="reflection_with_llm",
-                max_turns=1
+    @contextmanager
+    def track_usage(self, kind, lease, final_prompt, source):
+        """Record one LLM call in llm_usage. The body passes the yielded
+        record to `count_tokens` once the answer is complete."""
+        record = UsageRecord(
+            route=kind, source=source, agent=kind,
+            api_key=self.pool.key_label(lease.api_key),
+            prompt_tokens=TokenEstimator.estimate(
+                lease.agent.system_message + final_prompt
             )
+        )
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as exc:
+            record.error = type(exc).__name__
+            raise
+        finally:
+            record.latency_ms = (time.perf_counter() - start) * 1000
+            self.usage.record(record)
+
+    @staticmethod
+    def count_tokens(record, counts, completion):
+        """Use the token counts Gemini reported; estimate what it did not
+        (the prompt estimate is already on the record)."""
+        record.prompt_tokens = counts.get("prompt_tokens",
+                                          record.prompt_tokens)
+        record.completion_tokens = counts.get(
+            "completion_tokens", TokenEstimator.estimate(completion)
+        )
 
+    def token_stream(self, lease, final_prompt, usage=None):
+        """Answer fragments from the configured backend or Gemini; `usage`
+        receives Gemini's token counts when it reports them."""
+        if self.backend is not None:
+            return self.backend.stream(lease.agent.system_message,
+                                       final_prompt)
+        return LLMStreamer.stream(lease.api_key, lease.agent.system_message,
+                                  final_prompt, usage=usage)
 
-        else:
-            personal_content = "\n\n".join(
-                f"# {fname}\n{content}"
-                for fname, content in docs.get("personal", {}).items()
+    @Tracer.traced("cached_response")
+    def cached_response(self, prompt):
+        """Cached answer, or one generated by a single LLM call shared by
+        every session asking the same question at the same time."""
+        scope = self.cache_scope()
+        existed_response = self.cache_lookup(prompt, scope)
+        if existed_response:
+            return existed_response
+
+        def generate():
+            # A leader that finished just before we arrived has cached it
+            cached = SQLiteHelper.get_response(prompt, *scope)
+            if cached:
+                return [{"role": "assistant", "content": cached}]
+            response = self.generate_response(prompt)
+            self.cache_store(prompt, scope, response)
+            return response
+
+        key = (PromptNormalizer.normalize(prompt), *scope)
+        try:
+            response, _ = SingleFlight.shared().do(
+                key, generate, timeout=Config.SINGLE_FLIGHT_TIMEOUT
             )
-            final_prompt = (
-                "Use the following personal notes to"
-                "answer the user's question."
-                "Do not include any raw personal notes"
-                "or reference material in your response:\n\n"
-                f"{personal_content}\n\nUser's question: {prompt}"
+        except SingleFlightTimeout:
+            # The shared call is stuck; try on our own
+            response = generate()
+        # Followers get the same list; give each session its own copy
+        return [dict(entry) for entry in response]
+
+    @Tracer.traced("generate_response")
+    def generate_response(self, prompt):
+        direct = self.direct_answer(prompt)
+        if direct:
+            return [{"role": "assistant", "content": direct}]
+        kind, final_prompt = self.build_request(prompt)
+        with self.pool.lease(kind) as lease, \
+                self.track_usage(kind, lease, final_prompt, "llm") as usage:
+            history = self.pipeline.run(lease.agent, final_prompt)
+            ChatManager.count_tokens(
+                usage, ResponsePipeline.token_counts(lease.agent),
+                "".join(entry["content"] for entry in history)
             )
+        return history
+
+    @Tracer.traced("stream_response")
+    def stream_response(self, prompt, container):
+        """Render the answer into `container` as Gemini streams it.
+
+        Returns the same filtered history entries as `generate_response`.
+        """
+        scope = self.cache_scope()
+        direct = self.direct_answer(prompt)
+        history = (None if direct
+                   else self.cache_lookup(prompt, scope))
+        if direct or history:
+            container.chat_message(
+                "assistant", avatar=self.system_avatar
+            ).markdown(direct or history[0]["content"])
+            return history or [{"role": "assistant", "content": direct}]
+        kind, final_prompt = self.build_request(prompt)
+        emitted = []
+        counts = {}
 
-            response = self.user_proxy.initiate_chat(
-                self.text_agent,
-                message=final_prompt,
-                summary_method="reflection_with_llm",
-                max_turns=1
+        def tokens(lease):
+            for token in self.token_stream(lease, final_prompt, counts):
+                emitted.append(token)
+                yield token
+
+        with container.chat_message("assistant", avatar=self.system_avatar):
+            # Everything shown for this answer lives in one placeholder,
+            # so a fallback replaces it instead of printing below it
+            placeholder = st.empty()
+            try:
+                with self.pool.lease(kind) as lease, \
+                        Tracer.shared().span("llm_stream", agent=kind), \
+                        self.track_usage(kind, lease, final_prompt,
+                                         "stream") as usage:
+                    with placeholder.container():
+                        content = st.write_stream(tokens(lease))
+                    ChatManager.count_tokens(
+                        usage, counts,
+                        content if isinstance(content, str) else ""
+                    )
+            except Exception:
+                if emitted:
+                    # Part of the answer is already on screen; keep it
+                    # rather than asking the LLM a second time; it is
+                    # incomplete, so it is not cached
+                    content = "".join(emitted) + ChatManager.INTERRUPTED_NOTE
+                    placeholder.markdown(content)
+                    return ResponsePipeline.filter_history(
+                        [{"role": "assistant", "content": content}]
+                    )
+                # Fall back to the blocking autogen path; after a 429
+                # the pool hands out the other key
+                history = self.generate_response(prompt)
+                with placeholder.container():
+                    for entry in history:
+                        st.markdown(entry["content"])
+                self.cache_store(prompt, scope, history)
+                return history
+        history = ResponsePipeline.filter_history([{"role": "assistant",
+                                                    "content": content or ""}])
+        self.cache_store(prompt, scope, history)
+        return history
+
+    @Tracer.traced("answer_job")
+    def answer_job(self, job, prompt):
+        """Background job body: streams into `job.partial` so the page can
+        show progress, and stops early once the job is cancelled.
+        Complete LLM answers are cached like `cached_response` does."""
+        scope = self.cache_scope()
+        direct = self.direct_answer(prompt)
+        if direct:
+            return [{"role": "assistant", "content": direct}]
+        cached = self.cache_lookup(prompt, scope)
+        if cached:
+            return cached
+        if not Config.STREAMING:
+            history = self.generate_response(prompt)
+            self.cache_store(prompt, scope, history)
+            return history
+        kind, final_prompt = self.build_request(prompt)
+        counts = {}
+        try:
+            with self.pool.lease(kind) as lease, \
+                    Tracer.shared().span("llm_stream", agent=kind), \
+                    self.track_usage(kind, lease, final_prompt,
+                                     "stream") as usage:
+                for token in self.token_stream(lease, final_prompt, counts):
+                    if job.cancelled:
+                        break
+                    job.partial += token
+                ChatManager.count_tokens(usage, counts, job.partial)
+        except Exception:
+            if not job.partial:
+                # Fail the job so the page shows the error instead of
+                # quietly paying for a second LLM call
+                raise
+            # Keep what already streamed; it is incomplete, so not cached
+            return ResponsePipeline.filter_history([{
+                "role": "assistant",
+                "content": job.partial + ChatManager.INTERRUPTED_NOTE
+            }])
+        history = ResponsePipeline.filter_history([{"role": "assistant",
+                                                    "content": job.partial}])
+        if not job.cancelled:
+            self.cache_store(prompt, scope, history)
+        return history
+
+    @staticmethod
+    def session_key():
+        """Per-session concurrency key for the job executor."""
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else "default"
+
+    def submit_prompt(self, prompt):
+        """Queue `prompt`; its answer is collected by `poll_jobs`."""
+        if "rag_jobs" not in st.session_state:
+            st.session_state.rag_jobs = []
+        try:
+            job_id = self.jobs.submit(
+                ChatManager.session_key(),
+                lambda job: self.answer_job(job, prompt),
+                label=prompt
             )
-        
-        llm_response = []
-        for entry in response.chat_history:
-            content = entry.get("content", "").strip().lower()
-            if not any(keyword in content for keyword in [
-                "```mermaid", "# personal", "based on the following", "use the following"
-            ]):
-                llm_response.append({"role": "assistant", "content": content})
-        return llm_response
+        except JobQueueFull:
+            st.session_state.rag_messages.append({
+                "role": "assistant",
+                "content": "⚠️ Too many questions are waiting right now, "
+                "please try again in a moment."
+            })
+            return
+        st.session_state.rag_jobs.append(job_id)
 
+    def poll_jobs(self):
+        """Fragment body: show pending answers, collect finished ones."""
+        job_ids = st.session_state.get("rag_jobs", [])
+        finished = False
+        for job_id in list(job_ids):
+            job = self.jobs.get(job_id)
+            if job is None or job.finished:
+                job_ids.remove(job_id)
+                finished = True
+                if job is not None and job.status == "done":
+                    st.session_state.rag_messages.extend(job.result or [])
+                elif job is not None and job.status == "failed":
+                    st.session_state.rag_messages.append({
+                        "role": "assistant",
+                        "content": f"❌ Something went wrong: {job.error}"
+                    })
+                continue
+            with st.chat_message("assistant", avatar=self.system_avatar):
+                position = self.jobs.position(job_id)
+                st.markdown(job.partial or (
+                    f"⏳ Waiting in line (#{position})…" if position
+                    else "⏳ Thinking…"
+                ))
+                if st.button("✖ Cancel", key=f"cancel_{job_id}"):
+                    self.jobs.cancel(job_id)
+        if finished:
+            # Redraw the full history with the new answers
+            st.rerun()
+
+    def show_queue_metrics(self):
+        """Job queue and per-key load in the sidebar's performance panel."""
+        if not st.session_state.get("perf_panel"):
+            return
+        metrics = self.jobs.metrics()
+        with st.sidebar:
+            st.caption(
+                f"Jobs: {metrics['running']}/{metrics['max_workers']} "
+                f"running, {metrics['queue_depth']} queued, "
+                f"avg wait {metrics['avg_wait_s']:.1f} s, "
+                f"{metrics['failed']} failed"
+            )
+            for label, stats in self.pool.stats().items():
+                st.caption(f"{label}: {stats['in_flight']} in flight, "
+                           f"{stats['rate_limited']} rate limited")
+
+    def render_jobs(self, container):
+        """Poll background jobs without blocking the rest of the page."""
+        poll_every = (Config.JOB_POLL_SECONDS
+                      if st.session_state.get("rag_jobs") else None)
+        with container:
+            st.fragment(run_every=poll_every)(self.poll_jobs)()
 
     def show_chat_history(self, chat_history, container):
         for entry in chat_history:
@@ -214,9 +628,10 @@ class ChatManager:
         st.write("If you are the new employee, we also have some useful :blue-background[system URL] for you.")
         UIHelper.config_page()
         UIHelper.setup_sidebar()
+        self.show_queue_metrics()
         SQLiteHelper.initialize_db()
         chat_container = st.container()
-        chat_manager = ChatManager()
+        chat_manager = self
         
         
         # Dialog to update user name & show recommended prompts 
@@ -235,18 +650,13 @@ class ChatManager:
                         st.session_state.first_conversation = False
                         st.session_state.rag_messages.append({"role": "user", "content": prompt})
 
-                        # check if prompted existed 
-                        existed_response = SQLiteHelper.get_response(prompt)
-                        if existed_response: 
-                            response = [{"role": "assistant", "content": existed_response}]
-                        else: 
-                            response = self.generate_response(prompt)
-                            if response:
-                                SQLiteHelper.save_prompt_response(prompt, response[0]["content"])
-        
+                        response = self.cached_response(prompt)
                         st.session_state.rag_messages.extend(response)
                         
             if st.button("Confirm"):
+                if Config.BACKGROUND_JOBS:
+                    # The history is drawn on every rerun in this mode
+                    st.rerun()
                 self.show_chat_history(st.session_state.rag_messages, chat_container)
         
         # Show dialog only if it is the first conversation
@@ -258,9 +668,22 @@ class ChatManager:
             st.session_state.rag_messages.append(
                 {"role": "user", "content": prompt}
             )
-            response = chat_manager.generate_response(prompt)
-            st.session_state.rag_messages.extend(response)
-            chat_manager.show_chat_history(st.session_state.rag_messages, chat_container)
+            if Config.BACKGROUND_JOBS:
+                self.submit_prompt(prompt)
+            elif Config.STREAMING:
+                chat_manager.show_chat_history(st.session_state.rag_messages, chat_container)
+                response = chat_manager.stream_response(prompt, chat_container)
+                st.session_state.rag_messages.extend(response)
+            else:
+                response = chat_manager.cached_response(prompt)
+                st.session_state.rag_messages.extend(response)
+                chat_manager.show_chat_history(st.session_state.rag_messages, chat_container)
+
+        if Config.BACKGROUND_JOBS:
+            # Answers arrive on later reruns, so always draw the history
+            self.show_chat_history(st.session_state.rag_messages,
+                                   chat_container)
+            self.render_jobs(chat_container)
 
 
 if __name__ == "__main__":
@@ -5,3 +5,9 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
+
+# The app modules read both Gemini keys from st.secrets when imported;
+# tests never call Gemini, so no secrets.toml is needed
+from utils.llm_setup import LLMSetup  # noqa: E402
+
+LLMSetup.load_api_keys = staticmethod(lambda: ("dummy", "dummy"))
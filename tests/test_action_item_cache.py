@@ -0,0 +1,139 @@
+import json
+import os
+from datetime import datetime
+
+from services.action_items.action_item_cache import ActionItemCache
+from services.action_items.action_item_parser import ActionItemParser
+
+NOTE = """# Weekly sync
+*Date*: 2025-04-11
+
+## Action Items
+- [x] Prepare deck by 2025-04-14
+- [ ] Send minutes by 2025-04-12
+
+## Notes
+- [ ] not an action item
+"""
+
+
+def make_cache(tmp_path):
+    return ActionItemCache(str(tmp_path / "notes"),
+                           cache_path=str(tmp_path / "cache.json"),
+                           output_path=str(tmp_path / "action_items.json"))
+
+
+def test_parser_reads_only_the_action_items_section():
+    items = ActionItemParser.parse("sync.md", NOTE)
+    assert [(i["id"], i["completed"], i["due_date"][:10]) for i in items] == [
+        ("sync.md_0", True, "2025-04-14"), ("sync.md_1", False, "2025-04-12")
+    ]
+
+
+def test_only_changed_files_are_reparsed_and_removed_ones_pruned(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "a.md").write_text(NOTE, encoding="utf-8")
+    (notes / "b.md").write_text(NOTE.replace("deck", "budget"),
+                                encoding="utf-8")
+    cache = make_cache(tmp_path)
+    items = cache.refresh()
+    assert cache.parsed == 2
+    assert [i["due_date"][:10] for i in items] == [
+        "2025-04-12", "2025-04-12", "2025-04-14", "2025-04-14"
+    ]
+
+    # Same content with a new mtime is not re-parsed
+    os.utime(notes / "a.md", ns=(1, 1))
+    cache.refresh()
+    assert cache.parsed == 2
+
+    (notes / "b.md").write_text(NOTE.replace("## Notes", "## Other"),
+                                encoding="utf-8")
+    (notes / "a.md").unlink()
+    items = cache.refresh()
+    assert cache.parsed == 3
+    assert {i["filename"] for i in items} == {"b.md"}
+
+    # A new process reuses the persisted parses
+    reloaded = make_cache(tmp_path)
+    assert reloaded.refresh() == items and reloaded.parsed == 0
+
+
+def test_output_is_only_rewritten_when_items_change(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "a.md").write_text(NOTE, encoding="utf-8")
+    output = tmp_path / "action_items.json"
+    make_cache(tmp_path).refresh()
+    assert len(json.loads(output.read_text(encoding="utf-8"))) == 2
+    os.utime(output, ns=(1, 1))
+
+    # Unrelated edit outside the section: same items, file untouched
+    (notes / "a.md").write_text(NOTE + "\nmore notes\n", encoding="utf-8")
+    make_cache(tmp_path).refresh()
+    assert os.stat(output).st_mtime_ns == 1
+
+
+def test_undated_notes_are_reparsed_on_a_new_day(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "a.md").write_text("## Action Items\n- [ ] Call vendor "
+                                "in 3 days\n", encoding="utf-8")
+    cache = make_cache(tmp_path)
+    first = cache.refresh(now=datetime(2025, 4, 1, 9))
+    second = cache.refresh(now=datetime(2025, 4, 2, 9))
+    assert cache.parsed == 2
+    assert first[0]["due_date"][:10] == "2025-04-04"
+    assert second[0]["due_date"][:10] == "2025-04-05"
+
+
+def test_parallel_extraction_matches_serial_across_folders(tmp_path,
+                                                           monkeypatch):
+    monkeypatch.setattr(ActionItemCache, "CHUNK_SIZE", 3)
+    for folder in ("personal", "org"):
+        (tmp_path / "notes" / folder).mkdir(parents=True)
+        for i in range(5):
+            (tmp_path / "notes" / folder / f"{i}.md").write_text(
+                NOTE.replace("2025-04-12", f"2025-05-{i + 10}"),
+                encoding="utf-8"
+            )
+    serial = ActionItemCache(str(tmp_path / "notes"),
+                             cache_path=str(tmp_path / "serial.json"),
+                             output_path=None)
+    serial.update(workers=1)
+    seen = []
+    parallel = make_cache(tmp_path)
+    parallel.update(workers=2, progress=lambda done, total:
+                    seen.append((done, total)))
+    assert parallel.refresh() == serial.refresh()
+    assert parallel.parsed == 10 and seen[-1] == (10, 10)
+    assert "org/0.md" in {item["filename"] for item in serial.refresh()}
+
+
+def test_rescan_waits_for_a_folder_change_or_the_interval(tmp_path,
+                                                          monkeypatch):
+    notes = tmp_path / "notes"
+    (notes / "org").mkdir(parents=True)
+    (notes / "org" / "a.md").write_text(NOTE, encoding="utf-8")
+    cache = ActionItemCache(str(notes), cache_path=str(tmp_path / "c.json"),
+                            output_path=None, rescan_seconds=60)
+    cache.refresh()
+    walks = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan",
+                        lambda today: walks.append(today) or scan(today))
+
+    # Edited in place: no folder changed, so no walk yet
+    (notes / "org" / "a.md").write_text(NOTE.replace("deck", "memo"),
+                                        encoding="utf-8")
+    assert not cache.update() and walks == []
+
+    # A note added in a subfolder changes that folder's mtime
+    (notes / "org" / "b.md").write_text(NOTE, encoding="utf-8")
+    assert cache.update() and len(walks) == 1
+    assert any(i["task"].startswith("Prepare memo") for i in cache.refresh())
+
+    monkeypatch.setattr(cache, "_scanned_at", cache._scanned_at - 61)
+    cache.update()
+    assert len(walks) == 2
@@ -0,0 +1,72 @@
+import pytest
+
+from services.action_items.action_item_editor import (
+    ActionItemEdit, ActionItemEditor, EditConflict
+)
+from services.action_items.action_item_parser import ActionItemParser
+
+NOTE = """# Standup
+*Date*: 2025-04-07
+
+## Action Items
+- [ ] Follow up
+- [ ] Follow up
+- [x] Send deck by Apr 14
+
+## Notes
+- [ ] Follow up
+"""
+
+
+def write(tmp_path, content):
+    path = tmp_path / "standup.md"
+    path.write_bytes(content.encode("utf-8"))
+    return str(path), ActionItemEditor.digest(content)
+
+
+def test_locate_reports_lines_and_offsets():
+    located = ActionItemParser.locate(NOTE)
+    assert [(i.line, i.text) for i in located] == [
+        (5, "Follow up"), (6, "Follow up"), (7, "Send deck by Apr 14")
+    ]
+    assert NOTE[located[1].start:located[1].end] == "- [ ] Follow up"
+
+
+def test_identical_lines_are_edited_independently(tmp_path):
+    path, digest = write(tmp_path, NOTE)
+    ActionItemEditor.apply(path, [ActionItemEdit(1, completed=True)], digest)
+    content = open(path, encoding="utf-8").read()
+    assert content == NOTE.replace("- [ ] Follow up\n- [ ] Follow up",
+                                   "- [ ] Follow up\n- [x] Follow up")
+
+
+def test_batch_is_applied_in_one_write(tmp_path):
+    path, digest = write(tmp_path, NOTE)
+    new_digest = ActionItemEditor.apply(path, [
+        ActionItemEdit(0, completed=True),
+        ActionItemEdit(2, completed=False, due="Apr 21"),
+        ActionItemEdit(0, task="Follow up with Ana"),
+    ], digest)
+    content = open(path, encoding="utf-8").read()
+    assert new_digest == ActionItemEditor.digest(content)
+    assert "- [x] Follow up with Ana\n- [ ] Follow up\n" in content
+    assert "- [ ] Send deck by Apr 21\n" in content
+    # Checkboxes outside the section are untouched
+    assert content.endswith("## Notes\n- [ ] Follow up\n")
+
+
+def test_stale_digest_raises_conflict(tmp_path):
+    path, digest = write(tmp_path, NOTE)
+    ActionItemEditor.apply(path, [ActionItemEdit(0, completed=True)], digest)
+    with pytest.raises(EditConflict):
+        ActionItemEditor.apply(path, [ActionItemEdit(1, completed=True)],
+                               digest)
+
+
+def test_crlf_line_endings_are_preserved(tmp_path):
+    crlf = NOTE.replace("\n", "\r\n")
+    path, digest = write(tmp_path, crlf)
+    ActionItemEditor.apply(path, [ActionItemEdit(2, due="")], digest)
+    with open(path, "rb") as f:
+        raw = f.read().decode("utf-8")
+    assert raw == crlf.replace("Send deck by Apr 14", "Send deck")
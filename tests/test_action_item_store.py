@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from services.action_items.action_item_store import ActionItemStore
+
+
+def item(task, due, completed=False):
+    return {"task": task, "completed": completed, "due_date": due,
+            "markdown": task}
+
+
+ENTRIES = {
+    "sync.md": ("v1", "d1", [
+        item("Send minutes", "2025-04-08T00:00:00"),
+        item("Book room", "2025-04-10T00:00:00"),
+        item("Prepare deck", "2025-04-08T00:00:00", True),
+    ]),
+    "review.md": ("v1", "d2", [
+        item("Close audit", None),
+        item("Update forecast", "2025-04-20T00:00:00"),
+    ]),
+}
+TODAY = date(2025, 4, 9)
+
+
+def test_sync_only_rewrites_changed_files(tmp_path):
+    store = ActionItemStore(str(tmp_path / "items.db"))
+    assert store.sync(ENTRIES) == 2
+    assert store.sync(ENTRIES) == 0
+    changed = dict(ENTRIES)
+    changed["review.md"] = ("v2", "d3", [item("Close audit", None)])
+    assert store.sync(changed) == 1
+    assert store.count() == 4
+    del changed["review.md"]
+    assert store.sync(changed) == 1
+    assert store.filenames() == ["sync.md"]
+
+
+def test_filters_and_pagination(tmp_path):
+    store = ActionItemStore(str(tmp_path / "items.db"))
+    store.sync(ENTRIES)
+    overdue, total = store.query(due="overdue", today=TODAY)
+    assert total == 1 and overdue[0]["id"] == "sync.md_0"
+    assert overdue[0]["digest"] == "d1"
+    week, _ = store.query(due="this_week", today=TODAY)
+    assert [i["task"] for i in week] == ["Send minutes", "Prepare deck",
+                                         "Book room"]
+    assert store.count(status="done") == 1
+    assert store.count(due="no_date") == 1
+    assert store.count(filename="review.md", status="open") == 2
+
+    pages = [store.query(limit=2, offset=offset)[0]
+             for offset in (0, 2, 4)]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    # Items without a due date come last
+    assert pages[-1][0]["task"] == "Close audit"
+    with pytest.raises(ValueError):
+        store.query(status="later")
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from services.chat.agent_pool import AgentPool
+
+
+class FakeAgent:
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+def make_pool():
+    pool = AgentPool(["key-a", "key-b"])
+    pool.register("TextRAG_Agent", FakeAgent)
+    pool.register("GraphRAG_Agent", FakeAgent)
+    return pool
+
+
+def test_busy_key_sends_same_kind_to_other_key():
+    pool = make_pool()
+    with pool.lease("TextRAG_Agent") as first:
+        with pool.lease("TextRAG_Agent") as second:
+            assert first.api_key != second.api_key
+            assert first.agent is not second.agent
+    # Agents are reused once returned
+    with pool.lease("TextRAG_Agent") as again:
+        assert again.agent in (first.agent, second.agent)
+
+
+def test_rate_limited_key_cools_down():
+    pool = make_pool()
+    with pytest.raises(RateLimited):
+        with pool.lease("GraphRAG_Agent") as lease:
+            throttled = lease.api_key
+            raise RateLimited("quota exceeded")
+    for _ in range(3):
+        with pool.lease("GraphRAG_Agent") as lease:
+            assert lease.api_key != throttled
+    assert sum(s["rate_limited"] for s in pool.stats().values()) == 1
+
+
+def test_concurrent_leases_balance_over_keys():
+    pool = make_pool()
+    barrier = threading.Barrier(4)
+    used = []
+
+    def worker():
+        with pool.lease("TextRAG_Agent") as lease:
+            used.append(lease.api_key)
+            barrier.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(used) == ["key-a", "key-a", "key-b", "key-b"]
+    assert all(s["in_flight"] == 0 for s in pool.stats().values())
+
+
+def test_reused_agent_keeps_answering_past_auto_reply_limit(monkeypatch):
+    from autogen import ConversableAgent  # type: ignore
+    from services.chat.response_pipeline import ResponsePipeline
+
+    def blocked(self, prompt=""):
+        raise AssertionError("asked for human input")
+    monkeypatch.setattr(ConversableAgent, "get_human_input", blocked)
+    # TERMINATE is autogen's default; the reset on lease must still keep
+    # the per-sender counter below max_consecutive_auto_reply
+    pool = AgentPool(["key-a"])
+    pool.register("TextRAG_Agent", lambda key: ConversableAgent(
+        "TextRAG_Agent", llm_config=False, human_input_mode="TERMINATE",
+        default_auto_reply="ok"
+    ))
+    proxy = ConversableAgent("user_proxy", llm_config=False,
+                             human_input_mode="NEVER")
+    pipeline = ResponsePipeline(proxy)
+    for _ in range(150):
+        with pool.lease("TextRAG_Agent") as lease:
+            history = pipeline.run(lease.agent, "Where is the HR portal?")
+        assert history == [{"role": "assistant", "content": "ok"}]
@@ -0,0 +1,77 @@
+from services.retrieval.bm25_index import BM25Index
+from services.retrieval.markdown_chunker import MarkdownChunker
+from utils.text_tokenizer import TextTokenizer
+
+
+NOTE = (
+    "# Portals\n---\n"
+    "## Yield & Quality\n\n"
+    "### Yield performance\nhttps://example.com/yield\n\n"
+    "## HR Related\n人資: peoplenow/\n"
+    "```mermaid\n## not a heading\nA-->B\n```\n"
+)
+
+
+def test_tokenize_mixed_cjk_latin():
+    tokens = TextTokenizer.tokenize("人資 Links")
+    assert tokens == ["人", "資", "人資", "link"]
+
+
+def test_stem_matches_singular_and_plural():
+    stem = TextTokenizer.stem
+    for singular, plural in [("alias", "aliases"), ("note", "notes"),
+                             ("case", "cases"), ("match", "matches"),
+                             ("status", "statuses"), ("idea", "ideas")]:
+        assert stem(singular) == stem(plural)
+    assert stem("notes") != stem("not")
+
+
+def test_chunk_document_splits_on_headings():
+    chunks = MarkdownChunker().chunk_document("Portals.md", NOTE)
+    assert [c.title for c in chunks] == [
+        "Portals > Yield & Quality > Yield performance",
+        "Portals > HR Related",
+    ]
+    assert "## not a heading" in chunks[1].body
+
+
+def test_bm25_ranks_matching_section_first():
+    chunks = MarkdownChunker().chunk_document("Portals.md", NOTE)
+    index = BM25Index.from_chunks(chunks)
+    assert index.search("yield performance links")[0][0].title.endswith(
+        "Yield performance"
+    )
+    assert index.search("人資")[0][0].title == "Portals > HR Related"
+    assert index.search("unrelated") == []
+
+
+def test_vector_store_persists_and_searches(tmp_path):
+    from services.retrieval.vector_store import VectorStore
+
+    chunks = MarkdownChunker().chunk_document("Portals.md", NOTE)
+    store = VectorStore(str(tmp_path))
+    store.sync(chunks, "v1")
+
+    reopened = VectorStore(str(tmp_path))
+    assert reopened.load()
+    hits = reopened.search(["yield performance", "人資"], top_k=1)
+    assert hits[0][0][0].title.endswith("Yield performance")
+    assert hits[1][0][0].title == "Portals > HR Related"
+
+
+def test_rebuild_keeps_files_another_process_may_publish(tmp_path):
+    import os
+    from services.retrieval.vector_store import VectorStore
+
+    chunks = MarkdownChunker().chunk_document("Portals.md", NOTE)
+    store = VectorStore(str(tmp_path))
+    store.sync(chunks, "v1")
+    first = dict(store._manifest)
+    # Written by a concurrent build that has not swapped the manifest yet
+    (tmp_path / "vectors-other-1.npy").write_bytes(b"")
+    (tmp_path / "metadata-other-1.json").write_bytes(b"[]")
+    store.sync(chunks[:1], "v2")
+    remaining = set(os.listdir(tmp_path))
+    assert first["vectors"] not in remaining
+    assert {"vectors-other-1.npy", "metadata-other-1.json"} <= remaining
+    assert VectorStore(str(tmp_path)).load()
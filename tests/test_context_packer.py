@@ -0,0 +1,30 @@
+from services.retrieval.context_packer import (ContextItem, ContextPacker,
+                                              TokenEstimator)
+
+
+def test_token_estimate_counts_cjk_per_character():
+    assert TokenEstimator.estimate("人資") == 2
+    assert TokenEstimator.estimate("abcdefgh") == 2
+
+
+def test_pack_drops_duplicates_and_respects_budget():
+    items = [
+        ContextItem("a", "yield performance dashboard link " * 4, score=3),
+        ContextItem("a-copy", "Yield performance dashboard link " * 4,
+                    score=2),
+        ContextItem("b", "wbr meeting slides " * 40, score=1),
+        ContextItem("c", "hr alias peoplenow", score=0.5),
+    ]
+    result = ContextPacker(budget_tokens=60).pack(items)
+    assert [item.key for item in result.items] == ["a", "c"]
+    assert result.duplicates == ["a-copy"]
+    assert result.dropped == ["b"]
+    assert result.used_tokens <= 60
+
+
+def test_pack_truncates_single_oversized_item():
+    result = ContextPacker(budget_tokens=10).pack(
+        [ContextItem("big", "x" * 400)]
+    )
+    assert result.truncated == ["big"]
+    assert TokenEstimator.estimate(result.items[0].text) <= 10
@@ -0,0 +1,31 @@
+import os
+
+from services.document_processor.document_cache import CorpusCache
+
+
+def test_corpus_cache_rereads_only_changed_files(tmp_path):
+    personal = tmp_path / "personal"
+    personal.mkdir()
+    (personal / "a.md").write_text("alpha", encoding="utf-8")
+    (personal / "b.md").write_text("beta", encoding="utf-8")
+    (personal / "skip.txt").write_text("ignored", encoding="utf-8")
+
+    cache = CorpusCache({"personal": str(personal),
+                         "org": str(tmp_path / "missing")})
+    docs = cache.load()
+    assert docs == {"personal": {"a.md": "alpha", "b.md": "beta"},
+                    "org": {}}
+    version = cache.version
+    fingerprint = cache.fingerprint()
+
+    # Unchanged corpus: same version, nothing re-read
+    cache.invalidate()
+    assert cache.load() == docs
+    assert cache.version == version
+
+    (personal / "a.md").write_text("alpha v2", encoding="utf-8")
+    os.remove(personal / "b.md")
+    cache.invalidate(str(personal / "a.md"))
+    assert cache.load()["personal"] == {"a.md": "alpha v2"}
+    assert cache.version > version
+    assert cache.fingerprint() != fingerprint
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from services.action_items.due_date_parser import DueDateParser
+
+# A Wednesday
+BASE = datetime(2025, 4, 9, 10, 30)
+
+
+def test_fast_path_recognizes_note_forms():
+    cases = {
+        "prepare deck in 3 days by 2025-04-14": datetime(2025, 4, 14),
+        "send minutes in 3 days": datetime(2025, 4, 12, 10, 30),
+        "book room within two weeks": datetime(2025, 4, 23, 10, 30),
+        "sync with vendor next wednesday": datetime(2025, 4, 16),
+        "review budget next fri": datetime(2025, 4, 11),
+        "close audit by april 20": datetime(2025, 4, 20),
+        "close audit by apr 2nd": datetime(2026, 4, 2),
+        "update forecast before ww22-2025": datetime(2025, 1, 30),
+    }
+    for text, expected in cases.items():
+        assert DueDateParser.fast_path(text, BASE) == expected, text
+    assert DueDateParser.fast_path("call back when possible", BASE) is None
+
+
+def test_fiscal_year_starts_on_friday_nearest_september_first():
+    assert DueDateParser.fiscal_year_start(2025) == datetime(2024, 8, 30)
+    assert DueDateParser.fiscal_year_start(2026) == datetime(2025, 8, 29)
+    assert DueDateParser.fiscal_week_end(1, 2025) == datetime(2024, 9, 5)
+
+
+def test_fallback_uses_dateparser_once_per_phrase():
+    parser = DueDateParser()
+    assert parser.parse("Send report by tomorrow", BASE) == datetime(
+        2025, 4, 10, 10, 30)
+    calls = parser.dateparser_calls
+    assert parser.parse("Send report by tomorrow", BASE) == datetime(
+        2025, 4, 10, 10, 30)
+    assert parser.parse("Send REPORT by tomorrow", BASE).day == 10
+    assert parser.dateparser_calls == calls
+    assert parser.parse("Prepare deck by 2025-04-14", BASE).day == 14
+    assert parser.fast_hits == 1
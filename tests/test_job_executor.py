@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from services.chat.job_executor import JobExecutor, JobQueueFull
+
+
+def wait_for(executor, job_id, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = executor.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"{job_id} did not finish")
+
+
+def test_jobs_run_in_background_and_respect_per_key_limit():
+    executor = JobExecutor(max_workers=3, per_key_limit=1)
+    release = threading.Event()
+    ids = [executor.submit("session-a", lambda job: release.wait(2) and "a")
+           for _ in range(2)]
+    other = executor.submit("session-b", lambda job: "b")
+
+    assert wait_for(executor, other).result == "b"
+    metrics = executor.metrics()
+    # The second session-a job waits although a worker is free
+    assert metrics["running_by_key"] == {"session-a": 1}
+    assert metrics["queued_by_key"] == {"session-a": 1}
+    assert executor.position(ids[1]) == 1
+
+    release.set()
+    assert [wait_for(executor, i).result for i in ids] == ["a", "a"]
+    assert executor.metrics()["done"] == 3
+    executor.shutdown()
+
+
+def test_cancel_queued_and_running_jobs():
+    executor = JobExecutor(max_workers=1, per_key_limit=1)
+    chunks = []
+
+    def streaming(job):
+        while not job.cancelled:
+            chunks.append(".")
+            time.sleep(0.01)
+        return "partial"
+
+    running = executor.submit("k", streaming)
+    queued = executor.submit("k", lambda job: "never")
+    assert executor.cancel(queued)
+    assert executor.get(queued).status == "cancelled"
+    time.sleep(0.05)
+    assert executor.cancel(running)
+    assert wait_for(executor, running).status == "cancelled"
+    assert chunks
+    executor.shutdown()
+
+
+def test_failures_are_recorded_and_queue_is_bounded():
+    executor = JobExecutor(max_workers=1, per_key_limit=1, max_queue=1)
+    release = threading.Event()
+
+    def boom(job):
+        release.wait(2)
+        raise RuntimeError("quota exceeded")
+
+    failing = executor.submit("k", boom)
+    executor.submit("k", lambda job: None)
+    with pytest.raises(JobQueueFull):
+        executor.submit("k", lambda job: None)
+    release.set()
+    job = wait_for(executor, failing)
+    assert job.status == "failed" and job.error == "quota exceeded"
+    executor.shutdown()
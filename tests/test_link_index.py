@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from services.retrieval.link_index import LinkExtractor, LinkIndex
+
+NOTES = {
+    "Alias.md": "# Useful Alias\n\n## HR Related\n人資: peoplenow/\n\n"
+                "## Software download\n軟體下載: SAM/\n",
+    "Portals.md": "# Portals\n\n## Yield & Quality\n\n### Yield performance\n"
+                  "https://example.com/sites/Yield%20Metrics.aspx\n\n"
+                  "### NPI PLM schedule\nhttps://example.com/npi\n\n"
+                  "## WBR\nFor **WBR reports**, visit **WBR<Year>KPI/FY25**\n"
+                  "https://example.com/wbr.\n",
+}
+
+
+def test_extractor_finds_urls_and_aliases_with_heading_path():
+    entries = LinkExtractor.extract("Portals.md", NOTES["Portals.md"])
+    targets = {e.target: e for e in entries}
+    assert set(targets) == {"https://example.com/sites/Yield%20Metrics.aspx",
+                            "https://example.com/npi",
+                            "https://example.com/wbr"}
+    assert targets["https://example.com/npi"].heading_path == \
+        "Portals > Yield & Quality > NPI PLM schedule"
+    aliases = LinkExtractor.extract("Alias.md", NOTES["Alias.md"])
+    assert [(e.kind, e.target) for e in aliases] == [
+        ("alias", "peoplenow/"), ("alias", "SAM/")]
+
+
+def test_lookup_answers_link_questions_and_falls_through(tmp_path):
+    index = LinkIndex(str(tmp_path / "links.db"))
+    index.sync(NOTES, signature="v1")
+
+    hits = index.lookup("Give me Yield & Performance related links")
+    assert [e.heading_path for e in hits] == \
+        ["Portals > Yield & Quality > Yield performance"]
+    assert [e.target for e in index.lookup("人資的網址")] == ["peoplenow/"]
+    assert {e.target for e in index.lookup("useful aliases?")} == \
+        {"peoplenow/", "SAM/"}
+    assert index.lookup("where is the weather forecast") == []
+    # An alias question about something without an alias goes to the LLM
+    assert index.lookup("alias for the weather forecast") == []
+    assert index.lookup("what aliases do I have") == index.aliases(5)
+    assert LinkIndex.is_link_question("where is the HR portal")
+    assert not LinkIndex.is_link_question("What is WBR about?")
+
+    # Removed notes drop out of the index
+    index.sync({"Alias.md": NOTES["Alias.md"]}, signature="v2")
+    assert index.lookup("NPI schedule link") == []
+
+
+def test_note_title_does_not_match_every_entry(tmp_path):
+    # Every link in Portals.md sits under "# Portals"; "HR portal" must
+    # only find the HR alias, not the whole note
+    notes_dir = Path(__file__).parent.parent / "uploaded_docs" / "personal"
+    docs = {path.name: path.read_text(encoding="utf-8")
+            for path in notes_dir.glob("*.md")}
+    index = LinkIndex(str(tmp_path / "links.db"))
+    index.sync(docs)
+    assert [e.target for e in index.lookup("where is the HR portal")] == \
+        ["peoplenow/"]
+    assert LinkExtractor.section_heading(
+        "Portals > Frontend", NOTES["Portals.md"]) == "Frontend"
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from services.chat.llm_backend import StubBackend
+from services.chat.response_pipeline import ResponsePipeline
+
+
+class FakeAgent:
+    name = "TextRAG_Agent"
+    system_message = "You answer from notes."
+
+    def generate_reply(self, messages, sender):
+        raise AssertionError("the backend should answer, not autogen")
+
+
+def test_stub_backend_is_deterministic_and_counts_usage():
+    backend = StubBackend(reply_fn=lambda prompt: f"echo: {prompt[-5:]}")
+    assert backend.complete("sys", "where is STIM/") == "echo: STIM/"
+    assert "".join(backend.stream("sys", "where is STIM/")) == "echo: STIM/"
+    assert backend.calls == 2
+    assert backend.prompt_tokens > 0 and backend.completion_tokens > 0
+
+
+def test_stub_backend_sleeps_for_latency_and_token_rate():
+    backend = StubBackend(base_latency=0.02, tokens_per_second=1000,
+                          reply="word " * 40)
+    start = time.perf_counter()
+    backend.complete("", "q")
+    assert time.perf_counter() - start >= 0.02
+
+
+def test_pipeline_uses_backend_in_single_call_mode():
+    pipeline = ResponsePipeline(None, backend=StubBackend(reply=" Answer "))
+    assert pipeline.run(FakeAgent(), "question") == [
+        {"role": "assistant", "content": "Answer"}
+    ]
+    with pytest.raises(ValueError):
+        ResponsePipeline(None, mode="reflection", backend=StubBackend())
@@ -0,0 +1,35 @@
+import os
+
+from services.document_processor.mermaid_index import MermaidIndex
+
+DOC = ("# Org\r\nintro\r\n```mermaid\r\ngraph TD\r\n  A --> B\r\n```\r\n"
+       "middle\n```mermaid\nC --> D\n```\nend\n")
+
+
+def test_extract_normalizes_and_records_offsets():
+    blocks = MermaidIndex.extract(DOC, "org.md")
+    assert [b.code for b in blocks] == ["graph TD\n  A --> B", "C --> D"]
+    assert [b.line for b in blocks] == [3, 8]
+    assert DOC[blocks[1].start:blocks[1].end] == "```mermaid\nC --> D\n```"
+    stripped = MermaidIndex.strip_blocks(DOC, blocks)
+    assert "mermaid" not in stripped and "middle" in stripped
+
+
+def test_index_persists_and_reindexes_changed_files(tmp_path):
+    doc = tmp_path / "org.md"
+    doc.write_text("```mermaid\nA --> B\n```\n", encoding="utf-8")
+    index_path = str(tmp_path / "index.json")
+
+    index = MermaidIndex(index_path)
+    assert [b.code for b in index.update(str(doc))] == ["A --> B"]
+
+    # A fresh process reads the sidecar instead of rescanning
+    reloaded = MermaidIndex(index_path)
+    assert [b.code for b in reloaded.blocks_in(str(tmp_path))] == ["A --> B"]
+
+    doc.write_text("```mermaid\nA --> C\n```\n", encoding="utf-8")
+    os.utime(doc, ns=(1, 1))
+    assert [b.code for b in reloaded.blocks(str(doc))] == ["A --> C"]
+
+    reloaded.remove(str(doc))
+    assert MermaidIndex(index_path)._files == {}
@@ -0,0 +1,68 @@
+from services.org_graph.org_graph import MermaidOrgParser
+from services.org_graph.org_query import OrgQueryEngine
+
+DOCS = {
+    "fab.md": (
+        "# Fab org\n```mermaid\ngraph TD\n"
+        '    A["Alice Chen<br>Director"] --> B[Bob Lin]\n'
+        "    A --> C(Carol Wu)\n"
+        "    B -->|leads| D[David Ho] & E[Eve Kao]\n"
+        "```\n"
+    ),
+    "quality.md": (
+        "```mermaid\nflowchart LR\n"
+        "    %% ids are local to each block\n"
+        "    X[Carol Wu] -- manages --> Y[Frank Lee]\n"
+        "    Z[Grace Yu] <-- Y\n"
+        "```\n"
+    ),
+}
+
+
+def make_engine():
+    engine = OrgQueryEngine()
+    engine.ensure_graph(DOCS, signature="v1")
+    return engine
+
+
+def test_parser_builds_adjacency_and_merges_blocks_by_name():
+    graph = MermaidOrgParser.build(DOCS)
+    assert graph.nodes["alice chen"].details == ["Director"]
+    assert graph.children["alice chen"] == ["bob lin", "carol wu"]
+    assert graph.children["bob lin"] == ["david ho", "eve kao"]
+    # Carol appears in both charts and is one node
+    assert graph.children["carol wu"] == ["frank lee"]
+    assert graph.parents["grace yu"] == ["frank lee"]
+
+
+def test_engine_answers_common_questions_directly():
+    engine = make_engine()
+    assert engine.answer("Who does Frank Lee report to?") == \
+        "Frank Lee reports to Carol Wu."
+    assert engine.answer("List Bob Lin's team") == \
+        "Bob Lin's direct reports: David Ho, Eve Kao."
+    assert engine.answer("path between Eve and Frank") == \
+        "Eve Kao → Bob Lin → Alice Chen → Carol Wu → Frank Lee"
+    assert engine.answer("Alice的下屬") == \
+        "Alice Chen's direct reports: Bob Lin, Carol Wu."
+
+
+def test_free_form_questions_fall_back_to_subgraph():
+    engine = make_engine()
+    assert engine.answer("Who is the manager of the team?") is None
+    subgraph = engine.relevant_subgraph("What does David Ho work on?",
+                                        radius=1)
+    assert "David Ho" in subgraph and "Bob Lin" in subgraph
+    assert "Frank Lee" not in subgraph
+
+
+def test_lead_questions_point_the_right_way():
+    engine = make_engine()
+    # The lead of Bob's team is Bob; Bob's lead is his manager
+    assert engine.answer("Who leads Bob Lin's team?") == \
+        "Bob Lin leads the team: David Ho, Eve Kao."
+    assert engine.answer("Who does Bob Lin lead?") == \
+        "Bob Lin's direct reports: David Ho, Eve Kao."
+    assert engine.answer("Who is Frank Lee's lead?") == \
+        "Frank Lee reports to Carol Wu."
+    assert engine.answer("Who leads the yield team?") is None
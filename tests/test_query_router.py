@@ -0,0 +1,44 @@
+import json
+
+from services.chat.query_router import QueryRouter
+
+
+def test_word_boundaries_and_cjk_aliases(tmp_path):
+    router = QueryRouter(log_path=None)
+    notes = QueryRouter.NOTES_ROUTE
+    org = QueryRouter.ORG_ROUTE
+    assert router.route("Where are the WBR reports?").route == notes
+    assert router.route("How do I organize my notes?").route == notes
+    assert router.route("Who does Bob report to?").route == org
+    assert router.route("Show the org chart").route == org
+    assert router.route("Bob的主管是誰").route == org
+    # A team alone is not enough, a team plus a manager is
+    assert router.route("What did the yield team decide about WBR?"
+                        ).route == notes
+    assert router.route("Who manages the yield team?").route == org
+
+
+def test_scorers_and_cached_decisions_are_logged(tmp_path):
+    log_path = tmp_path / "routing.jsonl"
+    router = QueryRouter(log_path=str(log_path))
+
+    def names_org_member(question):
+        return 1.0 if "Alice" in question else 0.0
+
+    first = router.route("What is Alice working on?",
+                         scorers=[names_org_member], generation="v1")
+    second = router.route("what is  alice working on?",
+                          scorers=[names_org_member], generation="v1")
+    assert first.route == QueryRouter.ORG_ROUTE
+    assert first.matched == ["names_org_member"]
+    assert second.cached and second.route == first.route
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [r["cached"] for r in records] == [False, True]
+    assert all(r["latency_ms"] >= 0 for r in records)
+    # Only a hash and a short preview of the prompt are kept
+    long_prompt = "Where are my notes about " + "x" * 200
+    router.route(long_prompt)
+    last = json.loads(log_path.read_text().splitlines()[-1])
+    assert len(last["prompt"]) == QueryRouter.PROMPT_PREVIEW_CHARS
+    assert len(last["prompt_hash"]) == 16
@@ -0,0 +1,49 @@
+from services.chat.response_pipeline import ResponsePipeline
+
+
+class FakeAgent:
+    name = "TextRAG_Agent"
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def generate_reply(self, messages, sender):
+        self.calls += 1
+        return self.reply
+
+
+def test_single_call_mode_uses_one_llm_call():
+    agent = FakeAgent({"content": "  The HR alias is peoplenow/  "})
+    pipeline = ResponsePipeline(user_proxy=None, mode="single_call")
+    history = pipeline.run(agent, "Use the following personal notes ...")
+    assert agent.calls == 1
+    assert history == [{"role": "assistant",
+                        "content": "The HR alias is peoplenow/"}]
+
+
+def test_filter_history_drops_prompt_echo_and_refusals_are_flagged():
+    history = ResponsePipeline.filter_history([
+        {"role": "assistant", "content": "Use the following notes: ..."},
+        {"role": "user", "content": "STIM/ is the floor plan alias"},
+        {"role": "user", "content": "   "},
+    ])
+    assert history == [{"role": "assistant",
+                        "content": "STIM/ is the floor plan alias"}]
+    pipeline = ResponsePipeline(None, termination_phrases=["I apologize"])
+    assert pipeline.is_refusal("i apologize, no notes match")
+
+
+def test_token_counts_come_from_the_agent_client_usage():
+    from types import SimpleNamespace
+
+    agent = FakeAgent("ok")
+    agent.client = SimpleNamespace(actual_usage_summary=None)
+    assert ResponsePipeline.token_counts(agent) == {}
+    agent.client.actual_usage_summary = {
+        "total_cost": 0.0,
+        "gemini-2.0-flash": {"cost": 0.0, "prompt_tokens": 812,
+                             "completion_tokens": 64, "total_tokens": 876},
+    }
+    assert ResponsePipeline.token_counts(agent) == {
+        "prompt_tokens": 812, "completion_tokens": 64}
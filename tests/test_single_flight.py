@@ -0,0 +1,80 @@
+import threading
+import time
+import pytest
+
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def run_concurrently(n, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def slow_answer():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results, errors = run_concurrently(
+        8, lambda: flight.do("prompt", slow_answer))
+    assert not errors and len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert {value for value, _ in results} == {"answer"}
+    assert flight.in_flight() == 0
+
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("quota exceeded")
+
+    results, errors = run_concurrently(4, lambda: flight.do("k", failing))
+    assert not results and len(errors) == 4
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    # The failed call is not remembered
+    assert flight.do("k", lambda: "retry") == ("retry", False)
+
+
+def test_followers_time_out_without_cancelling_leader():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(
+        target=lambda: flight.do("k", lambda: release.wait(2)))
+    leader.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.01)
+    with pytest.raises(SingleFlightTimeout):
+        flight.do("k", lambda: None, timeout=0.05)
+    release.set()
+    leader.join()
+
+
+def test_a_timeout_raised_by_the_call_is_not_a_follower_timeout():
+    flight = SingleFlight()
+
+    def llm_timeout():
+        time.sleep(0.1)
+        raise TimeoutError("Gemini did not answer")
+
+    results, errors = run_concurrently(
+        3, lambda: flight.do("k", llm_timeout, timeout=5))
+    assert not results and len(errors) == 3
+    assert all(type(e) is TimeoutError for e in errors)
@@ -0,0 +1,114 @@
+from utils.sqlite_helper import SQLiteHelper
+
+
+def test_near_duplicate_prompt_reuses_cached_answer(monkeypatch, tmp_path):
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(tmp_path / "cache.db"))
+    SQLiteHelper.initialize_db()
+    SQLiteHelper.save_prompt_response(
+        "Give me Yield & Performance related links", "yield answer"
+    )
+
+    assert SQLiteHelper.get_response(
+        "Give me Yield & Performance related links") == "yield answer"
+    assert SQLiteHelper.get_response(
+        "give me yield and performance links") == "yield answer"
+    assert SQLiteHelper.get_response("Give me WBR meeting slides") is None
+
+    # One extra content word asks something else
+    SQLiteHelper.save_prompt_response("HR portal link", "hr answer")
+    assert SQLiteHelper.get_response("hr portals links?") == "hr answer"
+    assert SQLiteHelper.get_response("HR portal link for Taiwan") is None
+
+    monkeypatch.setattr(SQLiteHelper, "SIMILARITY_THRESHOLD", None)
+    SQLiteHelper.l1_cache().clear()
+    assert SQLiteHelper.get_response(
+        "give me yield and performance links") is None
+
+
+def test_cache_scoped_by_corpus_version_and_evicts_lru(monkeypatch, tmp_path):
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(SQLiteHelper, "MAX_ROWS", 2)
+    SQLiteHelper.initialize_db()
+
+    SQLiteHelper.save_prompt_response("alias list", "old", "v1", "cfg")
+    assert SQLiteHelper.get_response("alias list", "v2", "cfg") is None
+    SQLiteHelper.save_prompt_response("alias list", "new", "v1", "cfg")
+    assert SQLiteHelper.get_response("alias list", "v1", "cfg") == "new"
+
+    SQLiteHelper.save_prompt_response("hr portal", "hr", "v1", "cfg")
+    SQLiteHelper.get_response("alias list", "v1", "cfg")
+    SQLiteHelper.save_prompt_response("wbr slides", "wbr", "v1", "cfg")
+    # "hr portal" was least recently used when the cap was exceeded;
+    # drop the in-memory tier so the lookup goes to SQLite
+    SQLiteHelper.l1_cache().clear()
+    assert SQLiteHelper.get_response("hr portal", "v1", "cfg") is None
+    assert SQLiteHelper.get_response("alias list", "v1", "cfg") == "new"
+
+
+def test_expired_entries_are_misses(monkeypatch, tmp_path):
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(tmp_path / "cache.db"))
+    SQLiteHelper.initialize_db()
+    SQLiteHelper.save_prompt_response("alias list", "old", ttl_seconds=-1)
+    assert SQLiteHelper.get_response("alias list") is None
+
+
+def test_concurrent_sessions_share_pool_without_lock_errors(
+        monkeypatch, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(tmp_path / "cache.db"))
+
+    def session(n):
+        SQLiteHelper.initialize_db()
+        SQLiteHelper.save_prompt_response(f"question {n}", f"answer {n}")
+        return SQLiteHelper.get_response(f"question {n}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        answers = list(executor.map(session, range(40)))
+    assert answers == [f"answer {n}" for n in range(40)]
+
+
+def test_l1_serves_repeat_lookups_without_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(tmp_path / "cache.db"))
+    SQLiteHelper.save_prompt_response("alias list", "aliases", "v1")
+    l1 = SQLiteHelper.l1_cache()
+    hits = l1.stats()["hits"]
+
+    monkeypatch.setattr(SQLiteHelper, "pool", None)  # any disk access fails
+    assert SQLiteHelper.get_response("alias list", "v1") == "aliases"
+    assert l1.stats()["hits"] == hits + 1
+
+    # A new corpus version starts a fresh L1 generation
+    monkeypatch.undo()
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(tmp_path / "cache.db"))
+    assert SQLiteHelper.get_response("alias list", "v2") is None
+    assert len(l1) == 0
+
+
+def test_legacy_rows_are_dropped_and_totals_track_writes(monkeypatch,
+                                                         tmp_path):
+    import sqlite3
+
+    db_path = tmp_path / "cache.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE prompt_cache (id INTEGER PRIMARY KEY "
+                     "AUTOINCREMENT, prompt_hash TEXT UNIQUE, prompt TEXT, "
+                     "response TEXT, timestamp TEXT)")
+        conn.execute("INSERT INTO prompt_cache (prompt_hash, prompt, "
+                     "response) VALUES ('h', 'alias list', 'old')")
+    monkeypatch.setattr(SQLiteHelper, "DB_PATH", str(db_path))
+    SQLiteHelper.save_prompt_response("alias list", "aliases", "v1")
+    SQLiteHelper.save_prompt_response("alias list", "more aliases", "v1")
+    SQLiteHelper.save_prompt_response("hr portal", "hr", "v1",
+                                      ttl_seconds=-1)
+    SQLiteHelper.save_prompt_response("wbr slides", "wbr", "v1")
+
+    with sqlite3.connect(db_path) as conn:
+        actual = conn.execute("SELECT COUNT(*), SUM(size_bytes) "
+                              "FROM prompt_cache").fetchone()
+        totals = conn.execute("SELECT row_count, byte_count "
+                              "FROM prompt_cache_totals").fetchone()
+        prompts = {row[0] for row in
+                   conn.execute("SELECT prompt FROM prompt_cache")}
+    assert prompts == {"alias list", "wbr slides"}
+    assert totals == actual
@@ -0,0 +1,59 @@
+import json
+import threading
+
+import pytest
+
+from utils.tracing import Tracer
+
+
+def test_spans_nest_inside_a_trace_and_are_logged(tmp_path):
+    tracer = Tracer(log_path=str(tmp_path / "traces.jsonl"))
+    with tracer.trace("chat", prompt="who leads yield?") as trace:
+        with tracer.span("load_documents"):
+            pass
+        with tracer.span("route") as span:
+            span.attrs["route"] = "GraphRAG_Agent"
+            with tracer.span("mermaid_blocks"):
+                pass
+    assert [(s.name, s.depth) for s in trace.spans] == [
+        ("load_documents", 0), ("route", 0), ("mermaid_blocks", 1)
+    ]
+    assert all(s.start_ms <= trace.duration_ms for s in trace.spans)
+    record = json.loads((tmp_path / "traces.jsonl").read_text())
+    assert record["name"] == "chat"
+    assert record["spans"][1]["attrs"] == {"route": "GraphRAG_Agent"}
+    assert "t0" not in record
+    assert tracer.recent() == [trace]
+
+
+def test_span_without_trace_starts_one_and_errors_are_recorded():
+    tracer = Tracer(log_path=None)
+    with pytest.raises(ValueError):
+        with tracer.span("read_excel_sheet"):
+            raise ValueError("bad sheet")
+    trace = tracer.recent(1)[0]
+    assert trace.name == "read_excel_sheet"
+    assert trace.error == "ValueError: bad sheet"
+    assert Tracer.current() is None
+
+
+def test_threads_trace_independently_and_waterfall_lists_spans():
+    tracer = Tracer(log_path=None)
+
+    def request(name):
+        with tracer.trace(name):
+            with tracer.span("llm"):
+                pass
+
+    threads = [threading.Thread(target=request, args=(f"job-{i}",))
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    traces = tracer.recent(10)
+    assert len(traces) == 4
+    assert all([s.name for s in t.spans] == ["llm"] for t in traces)
+    lines = Tracer.waterfall(traces[0]).splitlines()
+    assert lines[0].startswith(traces[0].name)
+    assert lines[1].startswith("llm") and lines[1].endswith("ms")
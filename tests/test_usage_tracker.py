@@ -0,0 +1,76 @@
+import sqlite3
+import time
+
+import pytest
+
+from services.chat.usage_tracker import UsageRecord, UsageTracker
+
+
+def rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM llm_usage").fetchone()[0]
+
+
+def test_records_are_written_in_batches(tmp_path):
+    db_path = str(tmp_path / "prompt_cache.db")
+    tracker = UsageTracker(db_path, batch_size=3, flush_seconds=3600)
+    for _ in range(2):
+        tracker.record(UsageRecord(route="TextRAG_Agent", source="llm"))
+    assert rows(db_path) == 0
+    tracker.record(UsageRecord(route="TextRAG_Agent", source="llm"))
+    assert rows(db_path) == 3
+    tracker.record(UsageRecord(route="direct", source="link_index"))
+    assert tracker.flush() == 1 and rows(db_path) == 4
+
+
+def test_rollups_by_agent_route_and_key(tmp_path):
+    tracker = UsageTracker(str(tmp_path / "prompt_cache.db"),
+                           batch_size=100)
+    tracker.record(UsageRecord(route="GraphRAG_Agent", source="stream",
+                               agent="GraphRAG_Agent", api_key="key-1…abcd",
+                               prompt_tokens=800, completion_tokens=50,
+                               latency_ms=900))
+    tracker.record(UsageRecord(route="TextRAG_Agent", source="llm",
+                               agent="TextRAG_Agent", api_key="key-2…wxyz",
+                               prompt_tokens=300, completion_tokens=40,
+                               latency_ms=500))
+    tracker.record(UsageRecord(route="TextRAG_Agent", source="llm",
+                               agent="TextRAG_Agent", api_key="key-2…wxyz",
+                               latency_ms=100, error="ServerError"))
+    tracker.record(UsageRecord(route="cache", source="cache",
+                               cache_hit=True, latency_ms=2))
+
+    by_route = {row["route"]: row for row in tracker.rollup("route")}
+    assert by_route["GraphRAG_Agent"]["total_tokens"] == 850
+    assert by_route["TextRAG_Agent"]["llm_calls"] == 1
+    assert by_route["TextRAG_Agent"]["errors"] == 1
+    assert by_route["cache"]["cache_hits"] == 1
+    assert {row["agent"] for row in tracker.rollup("agent")} == {
+        "-", "GraphRAG_Agent", "TextRAG_Agent"
+    }
+    (today,) = tracker.rollup("day")
+    assert today["requests"] == 4
+    assert tracker.rollup("day", since=time.time() + 60) == []
+    assert tracker.key_usage_today() == {
+        "key-1…abcd": {"llm_calls": 1, "total_tokens": 850},
+        "key-2…wxyz": {"llm_calls": 1, "total_tokens": 340},
+    }
+    with pytest.raises(ValueError):
+        tracker.rollup("prompt")
+
+
+def test_failed_flush_never_reaches_the_caller(tmp_path, monkeypatch):
+    tracker = UsageTracker(str(tmp_path / "prompt_cache.db"), batch_size=1)
+    healthy_pool = tracker.pool
+
+    class LockedPool:
+        def transaction(self, write=False):
+            raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(tracker, "pool", LockedPool)
+    monkeypatch.setattr(UsageTracker, "MAX_PENDING", 5)
+    for _ in range(8):
+        tracker.record(UsageRecord(route="TextRAG_Agent", source="stream"))
+    with pytest.raises(sqlite3.OperationalError):
+        tracker.flush()
+    monkeypatch.setattr(tracker, "pool", healthy_pool)
+    assert tracker.flush() == 5 and rows(tracker.db_path) == 5
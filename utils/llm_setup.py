@@ -1,3 +1,4 @@
+import hashlib
 import streamlit as st  # type: ignore
 from dotenv import load_dotenv  # type: ignore
 from autogen import LLMConfig, AssistantAgent, UserProxyAgent  # type: ignore
@@ -5,6 +6,16 @@ from autogen.code_utils import content_str  # type: ignore
 
 
 class LLMSetup:
+    DEFAULT_MODEL = "gemini-2.0-flash-lite"
+    TEMPERATURE = 0.3
+    # Input-token limits per model; context budgets never exceed these
+    MODEL_INPUT_TOKEN_LIMITS = {
+        "gemini-2.0-flash-lite": 1_048_576,
+        "gemini-2.0-flash": 1_048_576,
+    }
+    # Tokens held back for the system message and the reply
+    RESPONSE_TOKEN_RESERVE = 2048
+
     @staticmethod
     @st.cache_resource
     def load_api_keys():
@@ -18,10 +29,24 @@ class LLMSetup:
     @st.cache_resource
     def create_llm_config(
         api_key: str,
-        model: str = "gemini-2.0-flash-lite"
+        model: str = DEFAULT_MODEL
     ) -> LLMConfig:
         """Return a basic LLMConfig for the given API key."""
-        return LLMConfig(api_type="google", model=model, api_key=api_key, temperature=0.3)
+        return LLMConfig(api_type="google", model=model, api_key=api_key,
+                         temperature=LLMSetup.TEMPERATURE)
+
+    @staticmethod
+    def config_key(*parts: str, model: str = DEFAULT_MODEL) -> str:
+        """Fingerprint of the model settings plus caller-specific parts
+        (e.g. agent system messages), used to scope cached answers."""
+        raw = "\0".join([model, str(LLMSetup.TEMPERATURE), *parts])
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    @staticmethod
+    def context_budget(budget_tokens: int, model: str = DEFAULT_MODEL) -> int:
+        """Clamp an agent's context budget to what the model accepts."""
+        limit = LLMSetup.MODEL_INPUT_TOKEN_LIMITS.get(model, 32_768)
+        return min(budget_tokens, limit - LLMSetup.RESPONSE_TOKEN_RESERVE)
 
     @staticmethod
     def create_assistant(system_message: str, api_key: str) -> AssistantAgent:
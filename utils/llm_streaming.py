@@ -0,0 +1,56 @@
+import streamlit as st  # type: ignore
+from typing import Dict, Iterator, Optional
+from google import genai  # type: ignore
+from google.genai import types  # type: ignore
+from utils.llm_setup import LLMSetup
+
+
+class LLMStreamer:
+    """Streams Gemini completions token by token.
+
+    autogen's Gemini client ignores `stream=True`, so streaming talks to
+    the google-genai SDK directly with the same model and temperature as
+    `LLMSetup.create_llm_config`.
+    """
+    @staticmethod
+    @st.cache_resource
+    def get_client(api_key: str) -> genai.Client:
+        return genai.Client(api_key=api_key)
+
+    @staticmethod
+    def stream(
+        api_key: str,
+        system_message: str,
+        prompt: str,
+        model: str = LLMSetup.DEFAULT_MODEL,
+        usage: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """Yield text fragments as Gemini produces them. `usage`, if
+        given, receives Gemini's token counts as the stream reports them."""
+        response = LLMStreamer.get_client(api_key).models \
+            .generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=system_message,
+                    temperature=LLMSetup.TEMPERATURE
+                )
+            )
+        for chunk in response:
+            if usage is not None and chunk.usage_metadata is not None:
+                usage.update(LLMStreamer.token_counts(chunk.usage_metadata))
+            if chunk.text:
+                yield chunk.text
+
+    @staticmethod
+    def token_counts(metadata) -> Dict[str, int]:
+        """prompt/completion tokens from a response's usage metadata;
+        thinking tokens are billed as output, so they count as completion."""
+        counts = {}
+        if metadata.prompt_token_count is not None:
+            counts["prompt_tokens"] = metadata.prompt_token_count
+        if metadata.candidates_token_count is not None:
+            counts["completion_tokens"] = (metadata.candidates_token_count
+                                           + (metadata.thoughts_token_count
+                                              or 0))
+        return counts
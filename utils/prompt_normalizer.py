@@ -0,0 +1,77 @@
+import hashlib
+import re
+import zlib
+from typing import List, Set
+
+from utils.text_tokenizer import TextTokenizer
+
+_PRIME = (1 << 61) - 1
+
+
+def _coefficient(seed: str) -> int:
+    return int.from_bytes(hashlib.sha1(seed.encode()).digest()[:8],
+                          "big") % _PRIME
+
+
+class PromptNormalizer:
+    """Normalizes prompts and builds MinHash signatures for near-dup lookup."""
+    STOPWORDS = {
+        "a", "an", "and", "are", "can", "could", "do", "for", "give",
+        "i", "is", "me", "of", "on", "or", "please", "related", "show",
+        "some", "tell", "the", "to", "what", "where", "which", "with",
+        "you",
+    }
+    NUM_PERMUTATIONS = 64
+    BANDS = 16
+    PUNCTUATION_PATTERN = re.compile(r"[^\w\s]", re.UNICODE)
+
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        """Fold width/case, spell out '&', strip punctuation and spacing."""
+        text = TextTokenizer.normalize(prompt).replace("&", " and ")
+        text = PromptNormalizer.PUNCTUATION_PATTERN.sub(" ", text)
+        return " ".join(text.split())
+
+    @staticmethod
+    def shingles(prompt: str) -> Set[str]:
+        """Content tokens of the normalized prompt."""
+        return {
+            token for token in TextTokenizer.tokenize(
+                PromptNormalizer.normalize(prompt)
+            )
+            if token not in _STOPWORD_STEMS
+        }
+
+    @staticmethod
+    def signature(shingles: Set[str]) -> List[int]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles] or [0]
+        return [
+            min((a * h + b) % _PRIME for h in hashes)
+            for a, b in _COEFFICIENTS
+        ]
+
+    @staticmethod
+    def band_keys(signature: List[int]) -> List[str]:
+        """LSH buckets: prompts sharing any band become candidates."""
+        rows = len(signature) // PromptNormalizer.BANDS
+        return [
+            hashlib.md5(",".join(
+                map(str, signature[band * rows:(band + 1) * rows])
+            ).encode()).hexdigest()
+            for band in range(PromptNormalizer.BANDS)
+        ]
+
+    @staticmethod
+    def jaccard(a: Set[str], b: Set[str]) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+
+# Tokens arrive stemmed, so compare against stemmed stopwords
+_STOPWORD_STEMS = {TextTokenizer.stem(w) for w in PromptNormalizer.STOPWORDS}
+# Fixed permutations so signatures are comparable across processes
+_COEFFICIENTS = [
+    (_coefficient(f"a{i}") or 1, _coefficient(f"b{i}"))
+    for i in range(PromptNormalizer.NUM_PERMUTATIONS)
+]
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import streamlit as st  # type: ignore
+
+
+class SingleFlightTimeout(RuntimeError):
+    """A follower stopped waiting for the leader's call. Not a
+    TimeoutError, so it cannot be confused with one raised by the call."""
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one.
+
+    The first caller for a key (the leader) runs the function; callers
+    arriving while it is in flight wait on the same future and receive
+    its result or its exception. Once the call finishes the key is
+    forgotten, so later callers start a fresh call (or hit a cache the
+    leader filled).
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "SingleFlight":
+        """Process-wide instance shared by every Streamlit session."""
+        return SingleFlight()
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Return (result, shared). `shared` is True for followers.
+
+        Followers raise SingleFlightTimeout after `timeout` seconds;
+        the leader's call itself is never interrupted. Exceptions from
+        the call, timeouts included, reach every caller unchanged.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.followers += 1
+        if not leader:
+            # Since 3.11 futures' TimeoutError is the builtin, which the
+            # call itself may raise too; only a missed wait is ours
+            done = threading.Event()
+            future.add_done_callback(lambda _: done.set())
+            if not done.wait(timeout):
+                raise SingleFlightTimeout(
+                    f"no result for {key!r} after {timeout} s"
+                )
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -1,18 +1,89 @@
 
 import os
-import sqlite3
 import hashlib
+import threading
+import time
+import streamlit as st  # type: ignore
 from datetime import datetime
+from utils.lru_cache import LRUCache
+from utils.prompt_normalizer import PromptNormalizer
+from utils.sqlite_pool import SQLitePool
 
 class SQLiteHelper:
     DB_PATH = "data/prompt_cache.db"
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    # Minimum Jaccard similarity of content tokens for reusing a
+    # near-duplicate answer; set to None to disable the semantic tier.
+    # 1.0 only reuses answers for the same words in another order, case,
+    # spacing or number: one extra word ("... for Taiwan") can change
+    # what is asked, and scores 0.75 against a four-word prompt
+    SIMILARITY_THRESHOLD = 1.0
+    # Entries expire after this many seconds (None keeps them forever)
+    DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+    # LRU eviction caps on the prompt_cache table
+    MAX_ROWS = 5000
+    MAX_BYTES = 50 * 1024 * 1024
+    # In-memory L1 entries kept in front of SQLite
+    L1_MAX_ENTRIES = 512
+    # DB paths whose schema is ready in this process
+    _initialized = set()
+    _init_lock = threading.Lock()
+    # L1 hits not yet reflected in last_access; flushed with the next write
+    _pending_touches = {}
+    _touch_lock = threading.Lock()
 
 
+    @staticmethod
+    def pool() -> SQLitePool:
+        return SQLitePool.for_path(SQLiteHelper.DB_PATH)
+
+    @staticmethod
+    @st.cache_resource
+    def l1_cache() -> LRUCache:
+        """Process-wide L1 shared by every session; see `stats()`."""
+        return LRUCache(maxsize=SQLiteHelper.L1_MAX_ENTRIES)
+
+    @staticmethod
+    def _l1_key(prompt_hash: str):
+        return (os.path.abspath(SQLiteHelper.DB_PATH), prompt_hash)
+
+    @staticmethod
+    def _l1_get(prompt_hash: str, corpus_version: str, now: float):
+        l1 = SQLiteHelper.l1_cache()
+        l1.ensure_generation(corpus_version)
+        entry = l1.get(SQLiteHelper._l1_key(prompt_hash))
+        if entry is None:
+            return None
+        response, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            l1.pop(SQLiteHelper._l1_key(prompt_hash))
+            return None
+        with SQLiteHelper._touch_lock:
+            SQLiteHelper._pending_touches[prompt_hash] = now
+        return response
+
+    @staticmethod
+    def _l1_put(prompt_hash: str, corpus_version: str, response: str,
+                expires_at):
+        l1 = SQLiteHelper.l1_cache()
+        l1.ensure_generation(corpus_version)
+        l1.put(SQLiteHelper._l1_key(prompt_hash), (response, expires_at))
+
     @staticmethod
     def initialize_db():
-        conn = sqlite3.connect(SQLiteHelper.DB_PATH)
-        cursor = conn.cursor()
+        """Create/migrate the schema once per process; later calls are free."""
+        db_path = os.path.abspath(SQLiteHelper.DB_PATH)
+        if db_path in SQLiteHelper._initialized:
+            return
+        with SQLiteHelper._init_lock:
+            if db_path in SQLiteHelper._initialized:
+                return
+            with SQLiteHelper.pool().transaction(write=True) as cursor:
+                SQLiteHelper._create_schema(cursor)
+            SQLiteHelper._initialized.add(db_path)
+
+    @staticmethod
+    def _create_schema(cursor):
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS prompt_cache (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -22,31 +93,269 @@ class SQLiteHelper:
                 timestamp TEXT
             )
         """)
-        conn.commit()
-        conn.close()
+        columns = {row[1] for row in
+                   cursor.execute("PRAGMA table_info(prompt_cache)")}
+        # Columns added after the original schema
+        for name, ddl in [
+            ("normalized_prompt", "TEXT"),
+            ("corpus_version", "TEXT"),
+            ("config_key", "TEXT"),
+            ("last_access", "REAL NOT NULL DEFAULT 0"),
+            ("expires_at", "REAL"),
+            ("size_bytes", "INTEGER NOT NULL DEFAULT 0"),
+        ]:
+            if name not in columns:
+                cursor.execute(
+                    f"ALTER TABLE prompt_cache ADD COLUMN {name} {ddl}"
+                )
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_prompt_cache_last_access
+            ON prompt_cache (last_access)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_prompt_cache_expires_at
+            ON prompt_cache (expires_at)
+        """)
+        # MinHash LSH buckets for the near-duplicate tier
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_signatures (
+                prompt_hash TEXT,
+                band INTEGER,
+                bucket TEXT,
+                PRIMARY KEY (prompt_hash, band)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_prompt_signatures_bucket
+            ON prompt_signatures (band, bucket)
+        """)
+        # Rows cached before answers were scoped to a corpus and config
+        # can never match a scoped key again; drop them
+        legacy = [row[0] for row in cursor.execute(
+            "SELECT prompt_hash FROM prompt_cache "
+            "WHERE normalized_prompt IS NULL OR corpus_version IS NULL"
+        )]
+        SQLiteHelper._delete(cursor, legacy)
+        # Row and byte totals kept by triggers, so checking the eviction
+        # caps on every write does not scan the table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS prompt_cache_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                row_count INTEGER NOT NULL,
+                byte_count INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO prompt_cache_totals
+            SELECT 1, COUNT(*), COALESCE(SUM(size_bytes), 0)
+            FROM prompt_cache
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS prompt_cache_totals_insert
+            AFTER INSERT ON prompt_cache BEGIN
+                UPDATE prompt_cache_totals
+                SET row_count = row_count + 1,
+                    byte_count = byte_count + NEW.size_bytes;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS prompt_cache_totals_delete
+            AFTER DELETE ON prompt_cache BEGIN
+                UPDATE prompt_cache_totals
+                SET row_count = row_count - 1,
+                    byte_count = byte_count - OLD.size_bytes;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS prompt_cache_totals_update
+            AFTER UPDATE OF size_bytes ON prompt_cache BEGIN
+                UPDATE prompt_cache_totals
+                SET byte_count = byte_count + NEW.size_bytes
+                                 - OLD.size_bytes;
+            END
+        """)
 
     @staticmethod
-    def hash_prompt(prompt: str) -> str:
-        return hashlib.md5(prompt.encode()).hexdigest()
+    def _save_signature(cursor, prompt_hash: str, prompt: str):
+        bands = PromptNormalizer.band_keys(
+            PromptNormalizer.signature(PromptNormalizer.shingles(prompt))
+        )
+        cursor.executemany("""
+            INSERT OR IGNORE INTO prompt_signatures (prompt_hash, band, bucket)
+            VALUES (?, ?, ?)
+        """, [(prompt_hash, band, bucket) for band, bucket in enumerate(bands)])
 
     @staticmethod
-    def save_prompt_response(prompt: str, response: str):
-        prompt_hash = SQLiteHelper.hash_prompt(prompt)
-        conn = sqlite3.connect(SQLiteHelper.DB_PATH)
-        cursor = conn.cursor()
+    def hash_prompt(prompt: str, corpus_version: str = "",
+                    config_key: str = "") -> str:
+        """Cache key; answers are only valid for one corpus and config."""
+        key = f"{prompt}\0{corpus_version}\0{config_key}"
+        return hashlib.md5(key.encode()).hexdigest()
+
+    @staticmethod
+    def save_prompt_response(prompt: str, response: str,
+                             corpus_version: str = "", config_key: str = "",
+                             ttl_seconds=DEFAULT_TTL_SECONDS):
+        prompt_hash = SQLiteHelper.hash_prompt(prompt, corpus_version,
+                                               config_key)
+        normalized = PromptNormalizer.normalize(prompt)
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        SQLiteHelper.initialize_db()
+        with SQLiteHelper._touch_lock:
+            touches = list(SQLiteHelper._pending_touches.items())
+            SQLiteHelper._pending_touches.clear()
+        with SQLiteHelper.pool().transaction(write=True) as cursor:
+            SQLiteHelper._upsert(cursor, prompt_hash, prompt, response,
+                                 normalized, corpus_version, config_key,
+                                 now, expires_at)
+            SQLiteHelper._save_signature(cursor, prompt_hash, prompt)
+            # Apply L1 hits first so hot entries are not evicted as stale
+            cursor.executemany(
+                "UPDATE prompt_cache SET last_access = MAX(last_access, ?) "
+                "WHERE prompt_hash = ?",
+                [(at, touched) for touched, at in touches]
+            )
+            SQLiteHelper._evict(cursor, now)
+        # Write-through: the answer is served from memory from now on
+        SQLiteHelper._l1_put(prompt_hash, corpus_version, response,
+                             expires_at)
+
+    @staticmethod
+    def _upsert(cursor, prompt_hash, prompt, response, normalized,
+                corpus_version, config_key, now, expires_at):
+        # Upsert so a regenerated answer replaces the stored one
         cursor.execute("""
-            INSERT OR IGNORE INTO prompt_cache (prompt_hash, prompt, response, timestamp)
-            VALUES (?, ?, ?, ?)
-        """, (prompt_hash, prompt, response, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+            INSERT INTO prompt_cache
+                (prompt_hash, prompt, response, timestamp, normalized_prompt,
+                 corpus_version, config_key, last_access, expires_at,
+                 size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(prompt_hash) DO UPDATE SET
+                response = excluded.response,
+                timestamp = excluded.timestamp,
+                last_access = excluded.last_access,
+                expires_at = excluded.expires_at,
+                size_bytes = excluded.size_bytes
+        """, (prompt_hash, prompt, response, datetime.now().isoformat(),
+              normalized, corpus_version, config_key, now, expires_at,
+              len(prompt.encode()) + len(response.encode())))
 
     @staticmethod
-    def get_response(prompt: str):
-        prompt_hash = SQLiteHelper.hash_prompt(prompt)
-        conn = sqlite3.connect(SQLiteHelper.DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT response FROM prompt_cache WHERE prompt_hash = ?", (prompt_hash,))
-        result = cursor.fetchone()
-        conn.close()
-        return result[0] if result else None
+    def _evict(cursor, now: float):
+        """Drop expired rows, then least recently used rows over the caps.
+        Both checks use an index or the trigger-kept totals; only an
+        exceeded cap walks the table."""
+        SQLiteHelper._delete(cursor, [row[0] for row in cursor.execute(
+            "SELECT prompt_hash FROM prompt_cache WHERE expires_at <= ?",
+            (now,)
+        )])
+        count, total = cursor.execute(
+            "SELECT row_count, byte_count FROM prompt_cache_totals"
+        ).fetchone()
+        if count <= SQLiteHelper.MAX_ROWS and total <= SQLiteHelper.MAX_BYTES:
+            return
+        # Walk from most to least recent, keeping rows within both caps
+        SQLiteHelper._delete(cursor, [row[0] for row in cursor.execute("""
+            SELECT prompt_hash FROM (
+                SELECT prompt_hash,
+                       ROW_NUMBER() OVER w AS position,
+                       SUM(size_bytes) OVER w AS running_bytes
+                FROM prompt_cache
+                WINDOW w AS (ORDER BY last_access DESC, id DESC)
+            )
+            WHERE position > ? OR running_bytes > ?
+        """, (SQLiteHelper.MAX_ROWS, SQLiteHelper.MAX_BYTES))])
+
+    @staticmethod
+    def _delete(cursor, prompt_hashes):
+        rows = [(h,) for h in prompt_hashes]
+        cursor.executemany(
+            "DELETE FROM prompt_cache WHERE prompt_hash = ?", rows
+        )
+        cursor.executemany(
+            "DELETE FROM prompt_signatures WHERE prompt_hash = ?", rows
+        )
+
+    @staticmethod
+    def get_response(prompt: str, corpus_version: str = "",
+                     config_key: str = ""):
+        prompt_hash = SQLiteHelper.hash_prompt(prompt, corpus_version,
+                                               config_key)
+        now = time.time()
+        cached = SQLiteHelper._l1_get(prompt_hash, corpus_version, now)
+        if cached is not None:
+            return cached
+
+        SQLiteHelper.initialize_db()
+        with SQLiteHelper.pool().connection() as conn:
+            result = conn.execute(
+                "SELECT response, expires_at FROM prompt_cache "
+                "WHERE prompt_hash = ?", (prompt_hash,)
+            ).fetchone()
+        if result and result[1] is not None and result[1] <= now:
+            with SQLiteHelper.pool().transaction(write=True) as cursor:
+                SQLiteHelper._delete(cursor, [prompt_hash])
+            result = None
+        elif result:
+            SQLiteHelper._touch(prompt_hash, now)
+            SQLiteHelper._l1_put(prompt_hash, corpus_version, *result)
+            return result[0]
+        if SQLiteHelper.SIMILARITY_THRESHOLD is None:
+            return None
+        similar = SQLiteHelper.get_similar_response(
+            prompt, SQLiteHelper.SIMILARITY_THRESHOLD,
+            corpus_version, config_key
+        )
+        if similar is not None:
+            # Remember the near-duplicate under this exact prompt as well
+            SQLiteHelper._l1_put(prompt_hash, corpus_version, *similar)
+            return similar[0]
+        return None
+
+    @staticmethod
+    def _touch(prompt_hash: str, now: float):
+        with SQLiteHelper.pool().transaction(write=True) as cursor:
+            cursor.execute(
+                "UPDATE prompt_cache SET last_access = ? "
+                "WHERE prompt_hash = ?", (now, prompt_hash)
+            )
+
+    @staticmethod
+    def get_similar_response(prompt: str, threshold: float,
+                             corpus_version: str = "", config_key: str = ""):
+        """Return (answer, expires_at) of the most similar cached prompt."""
+        shingles = PromptNormalizer.shingles(prompt)
+        if not shingles:
+            return None
+        bands = PromptNormalizer.band_keys(PromptNormalizer.signature(shingles))
+        now = time.time()
+        SQLiteHelper.initialize_db()
+        placeholders = " OR ".join(["(s.band = ? AND s.bucket = ?)"] * len(bands))
+        with SQLiteHelper.pool().connection() as conn:
+            candidates = conn.execute(f"""
+            SELECT DISTINCT c.prompt_hash, c.normalized_prompt, c.response,
+                            c.expires_at
+            FROM prompt_signatures s
+            JOIN prompt_cache c ON c.prompt_hash = s.prompt_hash
+            WHERE ({placeholders})
+              AND c.corpus_version = ? AND c.config_key = ?
+              AND (c.expires_at IS NULL OR c.expires_at > ?)
+            """, [value for band, bucket in enumerate(bands)
+                  for value in (band, bucket)]
+                 + [corpus_version, config_key, now]).fetchall()
+
+        best_score, best_hash, best_entry = 0.0, None, None
+        for prompt_hash, normalized, response, expires_at in candidates:
+            # Verify LSH candidates with the exact Jaccard similarity
+            score = PromptNormalizer.jaccard(
+                shingles, PromptNormalizer.shingles(normalized or "")
+            )
+            if score > best_score:
+                best_score, best_hash, best_entry = (
+                    score, prompt_hash, (response, expires_at)
+                )
+        if best_score < threshold:
+            return None
+        SQLiteHelper._touch(best_hash, now)
+        return best_entry
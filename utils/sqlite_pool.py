@@ -0,0 +1,97 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class SQLitePool:
+    """Process-wide pool of tuned, long-lived SQLite connections.
+
+    Streamlit runs every session (and every rerun) on its own thread, so
+    connections are pooled rather than thread-local: a connection is
+    borrowed for one unit of work and handed back, keeping its prepared
+    statement cache warm. All connections run in WAL mode so readers
+    never block the single writer.
+    """
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",        # fsync at checkpoints only
+        "PRAGMA mmap_size=268435456",       # 256 MiB
+        "PRAGMA cache_size=-16000",         # 16 MiB page cache
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    _pools: Dict[str, "SQLitePool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path: str, max_idle: int = 8,
+                 cached_statements: int = 256):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(
+            maxsize=max_idle
+        )
+
+    @classmethod
+    def for_path(cls, db_path: str) -> "SQLitePool":
+        """Return the shared pool for `db_path`, creating it once."""
+        key = os.path.abspath(db_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = cls(db_path)
+            return pool
+
+    def _open(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly below
+        conn = sqlite3.connect(
+            self.db_path, timeout=5.0, isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self, write: bool = False) -> Iterator[sqlite3.Cursor]:
+        """Run a unit of work; writers take the lock up front (IMMEDIATE)
+        so concurrent sessions queue on busy_timeout instead of failing
+        with `database is locked` on a read-to-write upgrade."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn.cursor()
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,64 @@
+import re
+import unicodedata
+from typing import List
+
+
+class TextTokenizer:
+    """Tokenizes mixed CJK/Latin text for keyword search."""
+    CJK_RANGES = (
+        "぀-ヿ"    # hiragana, katakana
+        "㐀-䶿"    # CJK extension A
+        "一-鿿"    # CJK unified ideographs
+        "가-힯"    # hangul syllables
+        "豈-﫿"    # CJK compatibility ideographs
+    )
+    # Latin words/numbers, or runs of CJK characters
+    TOKEN_PATTERN = re.compile(f"[a-z0-9]+|[{CJK_RANGES}]+")
+    CJK_PATTERN = re.compile(f"[{CJK_RANGES}]")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Fold full-width characters and case."""
+        return unicodedata.normalize("NFKC", text).lower()
+
+    @staticmethod
+    def stem(token: str) -> str:
+        """Light English stemming so plurals match ("aliases" ~ "alias")."""
+        if len(token) > 4 and token.endswith("ies"):
+            return token[:-3] + "y"
+        if len(token) > 4 and token.endswith(("sses", "xes", "ches",
+                                              "shes", "zzes")):
+            return token[:-2]
+        # "-ses" plurals and "-se" singulars meet on the "-s" stem:
+        # aliases/alias, cases/case, releases/release
+        if len(token) > 4 and token.endswith("ses"):
+            token = token[:-2]
+        elif len(token) > 3 and token.endswith("se"):
+            token = token[:-1]
+        # "status", "this" and "class" are not plurals
+        if len(token) > 3 and token.endswith("s") and \
+                not token.endswith(("ss", "is", "us")):
+            token = token[:-1]
+        return token
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split text into Latin word tokens and CJK unigrams + bigrams.
+
+        Chinese has no word delimiters, so each CJK run is indexed both per
+        character and per adjacent pair; bigrams keep multi-character terms
+        such as "人資" ranking above their single characters.
+        """
+        tokens = []
+        for match in TextTokenizer.TOKEN_PATTERN.finditer(
+            TextTokenizer.normalize(text)
+        ):
+            token = match.group(0)
+            if TextTokenizer.CJK_PATTERN.match(token):
+                tokens.extend(token)
+                tokens.extend(
+                    token[i:i + 2] for i in range(len(token) - 1)
+                )
+            else:
+                tokens.append(TextTokenizer.stem(token))
+        return tokens
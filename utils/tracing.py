@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List, Optional
+import streamlit as st  # type: ignore
+
+
+@dataclass
+class Span:
+    """One timed step; `start_ms` is relative to the start of its trace."""
+    name: str
+    start_ms: float
+    duration_ms: float = 0.0
+    depth: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Trace:
+    """All spans of one request (a chat answer, a page run)."""
+    trace_id: str
+    name: str
+    started_at: float
+    duration_ms: float = 0.0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+    error: Optional[str] = None
+    # perf_counter at the start and current span nesting, while running
+    t0: float = field(default=0.0, repr=False)
+    depth: int = field(default=0, repr=False)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("current_trace",
+                                                   default=None)
+
+
+class Tracer:
+    """Context-manager spans timed with `time.perf_counter`.
+
+    `trace` opens the root of a request; `span` inside it records a child
+    step (nesting depth is kept for the waterfall). A span opened with no
+    trace active starts its own trace, so instrumented helpers work
+    anywhere. The active trace lives in a ContextVar, so each thread
+    (e.g. each background job) traces independently. Finished traces go
+    to a rotating JSONL log and to an in-memory list of the most recent.
+    """
+    LOG_PATH = "data/logs/traces.jsonl"
+
+    def __init__(self, log_path: Optional[str] = LOG_PATH,
+                 max_bytes: int = 5_000_000, backup_count: int = 3,
+                 keep: int = 50):
+        self.log_path = log_path
+        self._recent: Deque[Trace] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._logger = (Tracer.rotating_logger(log_path, max_bytes,
+                                               backup_count)
+                        if log_path else None)
+
+    @staticmethod
+    @st.cache_resource
+    def shared() -> "Tracer":
+        """Process-wide tracer shared by every Streamlit session."""
+        return Tracer()
+
+    @staticmethod
+    def rotating_logger(log_path: str, max_bytes: int = 5_000_000,
+                        backup_count: int = 3) -> logging.Logger:
+        """Logger writing one raw line per record to `log_path`, rotated
+        at `max_bytes`. One handler per file, however often it is asked for."""
+        logger = logging.getLogger(f"{__name__}.{os.path.abspath(log_path)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes,
+                                          backupCount=backup_count,
+                                          encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        return logger
+
+    @staticmethod
+    def current() -> Optional[Trace]:
+        return _current.get()
+
+    @contextmanager
+    def trace(self, name: str, **attrs):
+        """Root of a request; inside another trace this is just a span.
+        Yields the Trace (or Span); callers may add to its `attrs`."""
+        if _current.get() is not None:
+            with self.span(name, **attrs) as span:
+                yield span
+            return
+        trace = Trace(uuid.uuid4().hex[:12], name, time.time(),
+                      attrs=dict(attrs), t0=time.perf_counter())
+        token = _current.set(trace)
+        try:
+            yield trace
+        except Exception as exc:
+            trace.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            trace.duration_ms = (time.perf_counter() - trace.t0) * 1000
+            _current.reset(token)
+            self._record(trace)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time one step of the active trace. Yields the Span."""
+        trace = _current.get()
+        if trace is None:
+            with self.trace(name, **attrs) as root:
+                yield root
+            return
+        start = time.perf_counter()
+        span = Span(name, (start - trace.t0) * 1000, depth=trace.depth,
+                    attrs=dict(attrs))
+        trace.spans.append(span)
+        trace.depth += 1
+        try:
+            yield span
+        except Exception as exc:
+            span.attrs["error"] = type(exc).__name__
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            trace.depth -= 1
+
+    @staticmethod
+    def traced(name: Optional[str] = None):
+        """Decorator: run the function inside a span of the shared tracer."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with Tracer.shared().span(name or fn.__name__):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def recent(self, limit: int = 10) -> List[Trace]:
+        """The last `limit` finished traces, newest first."""
+        with self._lock:
+            return list(self._recent)[::-1][:limit]
+
+    def _record(self, trace: Trace) -> None:
+        with self._lock:
+            self._recent.append(trace)
+        if self._logger is None:
+            return
+        record = asdict(trace)
+        del record["t0"], record["depth"]
+        record["spans"] = [{**span, "start_ms": round(span["start_ms"], 3),
+                            "duration_ms": round(span["duration_ms"], 3)}
+                           for span in record["spans"]]
+        record["duration_ms"] = round(trace.duration_ms, 3)
+        try:
+            self._logger.info(json.dumps(record, ensure_ascii=False,
+                                         default=str))
+        except Exception:
+            # Tracing must never break answering
+            pass
+
+    @staticmethod
+    def waterfall(trace: Trace, width: int = 24) -> str:
+        """Plain-text waterfall: one bar per span on the trace timeline."""
+        total = max(trace.duration_ms, 1e-6)
+        label_width = max([len(trace.name)] + [len(s.name) + 2 * s.depth
+                                                for s in trace.spans])
+        lines = [f"{trace.name:<{label_width}} |{'█' * width}| "
+                 f"{trace.duration_ms:8.1f} ms"]
+        for span in trace.spans:
+            offset = min(width - 1, int(span.start_ms / total * width))
+            length = max(1, round(span.duration_ms / total * width))
+            length = min(length, width - offset)
+            bar = " " * offset + "█" * length
+            label = "  " * span.depth + span.name
+            lines.append(f"{label:<{label_width}} |{bar:<{width}}| "
+                         f"{span.duration_ms:8.1f} ms")
+        return "\n".join(lines)
@@ -1,5 +1,7 @@
 import streamlit as st  # type: ignore
 
+from utils.tracing import Tracer
+
 
 class UIHelper:
     @staticmethod
@@ -29,6 +31,23 @@ class UIHelper:
                 st.page_link("pages/loading_visualization.py",
                              label="Loading Mia", icon="📈")
 
+            UIHelper.performance_panel()
+
+    @staticmethod
+    def performance_panel(limit: int = 5):
+        """Optional waterfalls of the last `limit` traced requests."""
+        if not st.toggle("Performance panel", key="perf_panel"):
+            return
+        traces = Tracer.shared().recent(limit)
+        if not traces:
+            st.caption("No requests traced yet.")
+        for trace in traces:
+            title = f"{trace.name} · {trace.duration_ms:.0f} ms"
+            if trace.error:
+                title += " · ⚠️"
+            with st.expander(title):
+                st.code(Tracer.waterfall(trace), language=None)
+
     @staticmethod
     def save_lang():
         st.session_state['lang_setting'] = st.session_state.get(